@@ -9,7 +9,6 @@ import re
 import shutil
 import tarfile
 from path import path
-from tempfile import mkdtemp
 
 from django.conf import settings
 from django.contrib.auth.decorators import login_required
@@ -30,6 +29,7 @@ from opaque_keys.edx.locator import LibraryLocator
 from xmodule.modulestore.xml_importer import import_course_from_xml, import_library_from_xml
 from xmodule.modulestore.xml_exporter import export_course_to_xml, export_library_to_xml
 from xmodule.modulestore import COURSE_ROOT, LIBRARY_ROOT
+from xmodule.tarfs import TarWriterFS
 
 from student.auth import has_course_author_access
 
@@ -356,21 +356,24 @@ def create_export_tarball(course_module, course_key, context):
     """
     Generates the export tarball, or returns None if there was an error.
 
+    The course is written straight into the tarball as it is exported, and its
+    assets are streamed into it from the contentstore, so no temporary copy of
+    the course is written to disk.
+
     Updates the context with any error information if applicable.
     """
     name = course_module.url_name
     export_file = NamedTemporaryFile(prefix=name + '.', suffix=".tar.gz")
-    root_dir = path(mkdtemp())
 
     try:
-        if isinstance(course_key, LibraryLocator):
-            export_library_to_xml(modulestore(), contentstore(), course_key, root_dir, name)
-        else:
-            export_course_to_xml(modulestore(), contentstore(), course_module.id, root_dir, name)
-
         logging.debug(u'tar file being generated at %s', export_file.name)
-        with tarfile.open(name=export_file.name, mode='w:gz') as tar_file:
-            tar_file.add(root_dir / name, arcname=name)
+        with tarfile.open(fileobj=export_file, mode='w|gz') as tar_file:
+            if isinstance(course_key, LibraryLocator):
+                export_library_to_xml(modulestore(), contentstore(), course_key, TarWriterFS(tar_file), name)
+            else:
+                export_course_to_xml(modulestore(), contentstore(), course_module.id, TarWriterFS(tar_file), name)
+        export_file.flush()
+        export_file.seek(0)
 
     except SerializationError as exc:
         log.exception(u'There was an error exporting %s', course_key)
@@ -404,8 +407,6 @@ def create_export_tarball(course_module, course_key, context):
             'unit': None,
             'raw_err_msg': str(exc)})
         raise
-    finally:
-        shutil.rmtree(root_dir / name)
 
     return export_file
 
@@ -10,10 +10,12 @@ import shutil
 import tarfile
 import tempfile
 from path import path
+from StringIO import StringIO
 from uuid import uuid4
 
 from django.test.utils import override_settings
 from django.conf import settings
+from xmodule.contentstore.content import StaticContent
 from xmodule.contentstore.django import contentstore
 from xmodule.modulestore.xml_exporter import export_library_to_xml
 from xmodule.modulestore.xml_importer import import_library_from_xml
@@ -363,6 +365,22 @@ class ExportTestCase(CourseTestCase):
         resp = self.client.get(self.url + '?_accept=application/x-tgz')
         self._verify_export_succeeded(resp)
 
+    def test_export_targz_contents(self):
+        """
+        The tarball has the course and its assets, which are written straight into it.
+        """
+        asset_key = self.course.id.make_asset_key('asset', 'sample.txt')
+        contentstore().save(StaticContent(asset_key, 'sample.txt', 'text/plain', 'sample asset'))
+
+        resp = self.client.get(self.url, HTTP_ACCEPT='application/x-tgz')
+        self._verify_export_succeeded(resp)
+
+        name = self.course.url_name
+        with tarfile.open(fileobj=StringIO(resp.content), mode='r:gz') as tar_file:
+            self.assertIn(name + '/course.xml', tar_file.getnames())
+            self.assertIn(name + '/policies/assets.json', tar_file.getnames())
+            self.assertEqual(tar_file.extractfile(name + '/static/sample.txt').read(), 'sample asset')
+
     def _verify_export_succeeded(self, resp):
         """ Export success helper method. """
         self.assertEquals(resp.status_code, 200)
@@ -0,0 +1,293 @@
+"""
+A local, size bounded, on-disk cache of large assets.
+
+Assets too large for the content cache (memcached) would otherwise be read out
+of GridFS on every request, including every byte range a browser requests
+while playing a video or paging through a PDF. Instead, the first request for
+such an asset has it copied to disk in the background, and later requests are
+served from there.
+
+Cached files are keyed by the asset's location and content digest, so a
+re-uploaded asset is never served stale. When the cache grows beyond its size
+limit, the least recently served files are removed.
+"""
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+import time
+
+from django.conf import settings
+
+from xmodule.contentstore.content import STREAM_DATA_CHUNK_SIZE
+
+log = logging.getLogger(__name__)
+
+# Read cached files in larger chunks than gridfs streams, since they're local
+DISK_READ_CHUNK_SIZE = 64 * STREAM_DATA_CHUNK_SIZE
+
+# How many seconds the size of a cache directory, as known by this process, is
+# trusted before the directory is scanned again: other processes add files too
+SIZE_RESCAN_INTERVAL = 600
+
+# Eviction removes files until the cache is this fraction of its size limit, so
+# that the files added next don't each need another scan of the directory
+EVICTION_TARGET_RATIO = 0.9
+
+# The size of each cache directory, as (total bytes, time it was last scanned)
+_directory_sizes = {}
+_directory_sizes_lock = threading.Lock()
+
+# The locations of the assets being cached by a background thread of this process
+_adding_locations = set()
+_adding_locations_lock = threading.Lock()
+
+
+def asset_disk_cache():
+    """
+    Return the AssetDiskCache configured by settings.STATIC_CONTENT_DISK_CACHE_DIR,
+    or None if it isn't configured.
+    """
+    directory = getattr(settings, 'STATIC_CONTENT_DISK_CACHE_DIR', None)
+    if not directory:
+        return None
+    return AssetDiskCache(directory, settings.STATIC_CONTENT_DISK_CACHE_MAX_BYTES)
+
+
+def content_version(content):
+    """
+    Return a string which changes whenever the data of `content` does.
+    """
+    digest = getattr(content, 'content_digest', None)
+    if digest:
+        return digest
+    return u'{}-{}'.format(content.last_modified_at.isoformat(), content.length)
+
+
+class DiskCachedContent(object):
+    """
+    An asset whose data is read from a cached file. It has the same interface
+    as `StaticContentStream` as far as the StaticContentServer is concerned.
+    """
+    def __init__(self, content, path):
+        self.location = content.location
+        self.content_type = content.content_type
+        self.length = content.length
+        self.last_modified_at = content.last_modified_at
+        self.locked = content.locked
+        self.content_digest = getattr(content, 'content_digest', None)
+        self.path = path
+
+    def stream_data(self):
+        """
+        Yield the whole file, chunk by chunk.
+        """
+        return self.stream_data_in_range(0, self.length - 1)
+
+    def stream_data_in_range(self, first_byte, last_byte):
+        """
+        Yield the bytes between first_byte and last_byte (included), chunk by chunk.
+        """
+        with open(self.path, 'rb') as cached_file:
+            cached_file.seek(first_byte)
+            remaining = last_byte - first_byte + 1
+            while remaining > 0:
+                chunk = cached_file.read(min(DISK_READ_CHUNK_SIZE, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                yield chunk
+
+
+class AssetDiskCache(object):
+    """
+    Stores assets' data as files under `directory`, using at most (roughly)
+    `max_bytes` of disk space.
+
+    Each asset gets its own subdirectory, named after a hash of its location,
+    holding one file per version of its data. Writes go through a temporary
+    file which is renamed into place, so concurrent processes never see a
+    partly written file.
+    """
+    def __init__(self, directory, max_bytes):
+        self.directory = directory
+        self.max_bytes = max_bytes
+
+    def _asset_directory(self, location):
+        """
+        Return the directory holding the cached versions of the asset at `location`.
+        """
+        return os.path.join(self.directory, hashlib.sha1(unicode(location).encode('utf-8')).hexdigest())
+
+    def path_for(self, content):
+        """
+        Return the path at which the data of `content` is cached.
+        """
+        version = hashlib.sha1(content_version(content).encode('utf-8')).hexdigest()
+        return os.path.join(self._asset_directory(content.location), version)
+
+    def get(self, content):
+        """
+        Return a DiskCachedContent reading the data of `content` from disk, or
+        None if it isn't cached.
+        """
+        path = self.path_for(content)
+        try:
+            # Record that the file was used, for eviction
+            os.utime(path, None)
+        except OSError:
+            return None
+        return DiskCachedContent(content, path)
+
+    def add(self, content):
+        """
+        Copy the data of the stream `content` to disk, and return a
+        DiskCachedContent reading it from there. Return None if the data
+        couldn't be cached.
+        """
+        if content.length is None or content.length > self.max_bytes:
+            return None
+
+        path = self.path_for(content)
+        asset_directory = os.path.dirname(path)
+        try:
+            if not os.path.isdir(asset_directory):
+                os.makedirs(asset_directory)
+
+            handle, temp_path = tempfile.mkstemp(dir=asset_directory, prefix='.')
+            try:
+                with os.fdopen(handle, 'wb') as temp_file:
+                    for chunk in content.stream_data():
+                        temp_file.write(chunk)
+                os.rename(temp_path, path)
+            except Exception:
+                os.remove(temp_path)
+                raise
+        except (IOError, OSError):
+            log.exception(u"Unable to cache %s on disk", unicode(content.location))
+            return None
+
+        self._remove_other_versions(path)
+        known_size = self._record_added(content.length)
+        if known_size is None or known_size > self.max_bytes:
+            self.evict()
+        return DiskCachedContent(content, path)
+
+    def get_or_add(self, content):
+        """
+        Return a DiskCachedContent for `content`, caching it first if need be.
+        Return None if it can't be cached.
+        """
+        return self.get(content) or self.add(content)
+
+    def add_in_background(self, location, open_stream):
+        """
+        Cache, from a background thread, the asset at `location` as read from
+        the stream returned by `open_stream()`, unless this process is already
+        caching it.
+
+        The request which missed the cache is served from its own stream
+        meanwhile, rather than waiting for the whole asset to be copied. Return
+        the thread, or None if none was started.
+        """
+        key = unicode(location)
+        with _adding_locations_lock:
+            if key in _adding_locations:
+                return None
+            _adding_locations.add(key)
+
+        def add():
+            """
+            Cache the asset, and let it be cached again if this fails.
+            """
+            try:
+                self.add(open_stream())
+            except Exception:  # pylint: disable=broad-except
+                log.exception(u"Unable to cache %s on disk", key)
+            finally:
+                with _adding_locations_lock:
+                    _adding_locations.discard(key)
+
+        thread = threading.Thread(target=add, name='asset-disk-cache')
+        thread.daemon = True
+        thread.start()
+        return thread
+
+    def _remove_other_versions(self, path):
+        """
+        Remove the cached files of the other versions of the asset cached at `path`.
+        """
+        asset_directory, filename = os.path.split(path)
+        for other_filename in os.listdir(asset_directory):
+            if other_filename != filename and not other_filename.startswith('.'):
+                self._remove(os.path.join(asset_directory, other_filename))
+
+    def _remove(self, path):
+        """
+        Remove the file at `path`, if it still exists.
+        """
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def _record_added(self, size):
+        """
+        Add `size` bytes to the known size of the cache, and return it. Return
+        None if the size isn't known, or was scanned too long ago to be trusted.
+        """
+        with _directory_sizes_lock:
+            total_bytes, scanned_at = _directory_sizes.get(self.directory, (None, 0))
+            if total_bytes is None or time.time() - scanned_at >= SIZE_RESCAN_INTERVAL:
+                return None
+            total_bytes += size
+            _directory_sizes[self.directory] = (total_bytes, scanned_at)
+            return total_bytes
+
+    def _scan(self):
+        """
+        Return the (last use, size, path) of every cached file, and their total
+        size, which becomes the known size of the cache.
+        """
+        entries = []
+        total_bytes = 0
+        for asset_directory, __, filenames in os.walk(self.directory):
+            for filename in filenames:
+                if filename.startswith('.'):
+                    # Being written by someone
+                    continue
+                path = os.path.join(asset_directory, filename)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+                total_bytes += stat.st_size
+
+        self._set_known_size(total_bytes)
+        return entries, total_bytes
+
+    def _set_known_size(self, total_bytes):
+        """
+        Record `total_bytes` as the size of the cache, as just scanned.
+        """
+        with _directory_sizes_lock:
+            _directory_sizes[self.directory] = (total_bytes, time.time())
+
+    def evict(self):
+        """
+        Scan the cache, and remove the least recently served files until it
+        fits, with some room to spare, in max_bytes.
+        """
+        entries, total_bytes = self._scan()
+        if total_bytes <= self.max_bytes:
+            return
+
+        target_bytes = self.max_bytes * EVICTION_TARGET_RATIO
+        for __, size, path in sorted(entries):
+            if total_bytes <= target_bytes:
+                break
+            self._remove(path)
+            total_bytes -= size
+        self._set_known_size(total_bytes)
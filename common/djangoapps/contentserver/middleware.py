@@ -7,6 +7,7 @@ import logging
 from django.http import (
     HttpResponse, HttpResponseNotModified, HttpResponseForbidden
 )
+from django.utils.http import parse_etags, quote_etag
 from student.models import CourseEnrollment
 
 from xmodule.assetstore.assetmgr import AssetManager
@@ -15,6 +16,7 @@ from xmodule.modulestore import InvalidLocationError
 from opaque_keys import InvalidKeyError
 from opaque_keys.edx.locator import AssetLocator
 from cache_toolbox.core import get_cached_content, set_cached_content
+from contentserver.disk_cache import asset_disk_cache
 from xmodule.modulestore.exceptions import ItemNotFoundError
 from xmodule.exceptions import NotFoundError
 
@@ -59,6 +61,18 @@ class StaticContentServer(object):
                         # since we've queried as a stream, let's read in the stream into memory to set in cache
                         content = content.copy_to_in_mem()
                         set_cached_content(content)
+                    else:
+                        # larger assets are kept on local disk, if configured, so that their data
+                        # (and every byte range of it) is read from GridFS only once
+                        disk_cache = asset_disk_cache()
+                        if disk_cache is not None:
+                            cached_content = disk_cache.get(content)
+                            if cached_content is not None:
+                                content = cached_content
+                            else:
+                                # copied from a stream of its own, so this request is served from
+                                # `content` right away rather than after the whole asset is copied
+                                disk_cache.add_in_background(loc, lambda: AssetManager.find(loc, as_stream=True))
             else:
                 # NOP here, but we may wish to add a "cache-hit" counter in the future
                 pass
@@ -88,6 +102,13 @@ class StaticContentServer(object):
                 if if_modified_since == last_modified_at_str:
                     return HttpResponseNotModified()
 
+            # likewise if the client has the current version of the content, as identified by its digest
+            content_digest = getattr(content, 'content_digest', None)
+            if content_digest and 'HTTP_IF_NONE_MATCH' in request.META:
+                if_none_match = parse_etags(request.META['HTTP_IF_NONE_MATCH'])
+                if content_digest in if_none_match or '*' in if_none_match:
+                    return HttpResponseNotModified()
+
             # *** File streaming within a byte range ***
             # If a Range is provided, parse Range attribute of the request
             # Add Content-Range in the response if Range is structurally correct
@@ -145,6 +166,8 @@ class StaticContentServer(object):
             response['Accept-Ranges'] = 'bytes'
             response['Content-Type'] = content.content_type
             response['Last-Modified'] = last_modified_at_str
+            if content_digest:
+                response['ETag'] = quote_etag(content_digest)
 
             return response
 
@@ -2,14 +2,20 @@
 Tests for StaticContentServer
 """
 import copy
+import datetime
 import ddt
 import logging
+import os
+import shutil
+import tempfile
 import unittest
 from uuid import uuid4
+from pytz import UTC
 
 from django.conf import settings
 from django.test.client import Client
 from django.test.utils import override_settings
+from mock import patch
 
 from xmodule.contentstore.django import contentstore
 from xmodule.modulestore.django import modulestore
@@ -17,6 +23,7 @@ from xmodule.modulestore.tests.django_utils import ModuleStoreTestCase
 from xmodule.modulestore import ModuleStoreEnum
 from xmodule.modulestore.xml_importer import import_course_from_xml
 
+from contentserver.disk_cache import AssetDiskCache
 from contentserver.middleware import parse_range_header
 from student.models import CourseEnrollment
 
@@ -192,6 +199,98 @@ class ContentStoreToyCourseTest(ModuleStoreTestCase):
         )
         self.assertEqual(resp.status_code, 416)
 
+    def test_etag(self):
+        """
+        Test that the content digest is sent as the ETag, and a matching If-None-Match
+        outputs 304 Not Modified.
+        """
+        resp = self.client.get(self.url_unlocked)
+        self.assertIn('ETag', resp)
+
+        resp = self.client.get(self.url_unlocked, HTTP_IF_NONE_MATCH=resp['ETag'])
+        self.assertEqual(resp.status_code, 304)
+
+        resp = self.client.get(self.url_unlocked, HTTP_IF_NONE_MATCH='"not-the-digest"')
+        self.assertEqual(resp.status_code, 200)
+
+
+class FakeStream(object):
+    """
+    The parts of StaticContentStream used by AssetDiskCache.
+    """
+    def __init__(self, data, digest='digest', location='asset-v1:edX+toy+2012_Fall+type@asset+block@video.mp4'):
+        self.location = location
+        self.content_type = 'video/mp4'
+        self.data = data
+        self.length = len(data)
+        self.last_modified_at = datetime.datetime(2015, 1, 1, tzinfo=UTC)
+        self.locked = False
+        self.content_digest = digest
+        self.stream_calls = 0
+
+    def stream_data(self):
+        self.stream_calls += 1
+        for index in range(0, len(self.data), 10):
+            yield self.data[index:index + 10]
+
+
+class AssetDiskCacheTestCase(unittest.TestCase):
+    """
+    Tests for AssetDiskCache.
+    """
+    def setUp(self):
+        super(AssetDiskCacheTestCase, self).setUp()
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.cache = AssetDiskCache(self.directory, 100)
+
+    def test_read_from_disk(self):
+        content = FakeStream('0123456789' * 5)
+        self.assertIsNone(self.cache.get(content))
+        cached = self.cache.get_or_add(content)
+        self.assertEqual(''.join(cached.stream_data()), content.data)
+        self.assertEqual(''.join(cached.stream_data_in_range(5, 24)), content.data[5:25])
+
+        self.assertEqual(''.join(self.cache.get_or_add(content).stream_data()), content.data)
+        self.assertEqual(content.stream_calls, 1)
+
+    def test_new_version_replaces_old(self):
+        old_path = self.cache.add(FakeStream('a' * 10, digest='old')).path
+        new_path = self.cache.add(FakeStream('b' * 10, digest='new')).path
+        self.assertNotEqual(old_path, new_path)
+        self.assertFalse(os.path.exists(old_path))
+        self.assertTrue(os.path.exists(new_path))
+
+    def test_least_recently_used_evicted(self):
+        first = FakeStream('a' * 40, location='first')
+        second = FakeStream('b' * 40, location='second')
+        first_path = self.cache.add(first).path
+        second_path = self.cache.add(second).path
+        # Make the first file the least recently used one
+        os.utime(first_path, (0, 0))
+
+        self.cache.add(FakeStream('c' * 40, location='third'))
+        self.assertFalse(os.path.exists(first_path))
+        self.assertTrue(os.path.exists(second_path))
+
+    def test_too_large(self):
+        self.assertIsNone(self.cache.add(FakeStream('a' * 101)))
+
+    def test_directory_scanned_when_full(self):
+        with patch.object(self.cache, '_scan', wraps=self.cache._scan) as scan:
+            # The size of the cache is unknown to begin with
+            self.cache.add(FakeStream('a' * 40, location='first'))
+            self.assertEqual(scan.call_count, 1)
+            self.cache.add(FakeStream('b' * 40, location='second'))
+            self.assertEqual(scan.call_count, 1)
+            self.cache.add(FakeStream('c' * 40, location='third'))
+            self.assertEqual(scan.call_count, 2)
+
+    def test_add_in_background(self):
+        content = FakeStream('0123456789' * 5)
+        self.cache.add_in_background(content.location, lambda: content).join()
+        self.assertEqual(''.join(self.cache.get(content).stream_data()), content.data)
+
 
 @ddt.ddt
 class ParseRangeHeaderTestCase(unittest.TestCase):
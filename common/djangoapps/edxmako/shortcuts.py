@@ -20,6 +20,7 @@ from microsite_configuration import microsite
 
 from edxmako import lookup_template
 from edxmako.middleware import get_template_request_context
+from xmodule import profiling
 from django.conf import settings
 from django.core.urlresolvers import reverse
 log = logging.getLogger(__name__)
@@ -131,7 +132,8 @@ def render_to_string(template_name, dictionary, context=None, namespace='main'):
 
     # fetch and render template
     template = lookup_template(namespace, template_name)
-    return template.render_unicode(**context_dictionary)
+    with profiling.profiled('mako.render'):
+        return template.render_unicode(**context_dictionary)
 
 
 def render_to_response(template_name, dictionary=None, context_instance=None, namespace='main', **kwargs):
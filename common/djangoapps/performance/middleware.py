@@ -0,0 +1,108 @@
+"""
+Middleware profiling the hot paths of requests (modulestore, FieldDataCache and SQL
+queries, sandboxed code, template rendering), enabled by the ENABLE_REQUEST_PROFILER
+feature.
+
+A sample of the requests (settings.REQUEST_PROFILER_SAMPLE_RATE) is profiled, as
+well as the requests of staff users which have the X-Edx-Profile header. The counters
+and timings of each profiled request are logged as a JSON record to the "perflog"
+logger, and returned in the X-Edx-Request-Profile header of the header-triggered ones.
+"""
+import json
+import logging
+import random
+import time
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+from xmodule import profiling
+
+perflog = logging.getLogger("perflog")
+
+# The request header which asks for a request to be profiled
+PROFILE_REQUEST_HEADER = 'HTTP_X_EDX_PROFILE'
+
+# The response header summarizing the profile of a request
+PROFILE_RESPONSE_HEADER = 'X-Edx-Request-Profile'
+
+
+class RequestProfilerMiddleware(object):
+    """
+    Profile a sample of the requests, and those which ask for it.
+
+    Must come after the authentication middleware, to know who asks for a profile.
+    """
+    def __init__(self):
+        if not settings.FEATURES.get('ENABLE_REQUEST_PROFILER'):
+            raise MiddlewareNotUsed()
+
+    def process_request(self, request):
+        """
+        Start profiling the request if it asks for it or is sampled.
+        """
+        user = getattr(request, 'user', None)
+        requested = PROFILE_REQUEST_HEADER in request.META and user is not None and user.is_staff
+        if not requested and random.random() >= getattr(settings, 'REQUEST_PROFILER_SAMPLE_RATE', 0.0):
+            return
+
+        request.profile_requested = requested
+        # The SQL queries are only recorded by the debug cursors
+        request.profiled_sql = {}
+        for connection in connections.all():
+            request.profiled_sql[connection.alias] = (connection.use_debug_cursor, len(connection.queries))
+            connection.use_debug_cursor = True
+        profiling.start_profile()
+
+    def process_response(self, request, response):
+        """
+        Stop profiling the request, log its profile and summarize it in a header if it was asked for.
+        """
+        profile = profiling.stop_profile()
+        if profile is None or not hasattr(request, 'profiled_sql'):
+            return response
+
+        for connection in connections.all():
+            if connection.alias not in request.profiled_sql:
+                continue
+            use_debug_cursor, first_query = request.profiled_sql[connection.alias]
+            connection.use_debug_cursor = use_debug_cursor
+            queries = connection.queries[first_query:]
+            if queries:
+                profile.record(
+                    u'sql.{}'.format(connection.alias),
+                    sum(float(query['time']) for query in queries),
+                    len(queries),
+                )
+
+        elapsed = profile.elapsed()
+        summary = profile.summary()
+        perflog.info(json.dumps({
+            'event_source': 'server',
+            'event': 'request_profile',
+            'path': request.path,
+            'method': request.method,
+            'status': response.status_code,
+            'ms': round(elapsed * 1000, 3),
+            'requested': request.profile_requested,
+            'profile': summary,
+            'time': time.time(),
+        }, sort_keys=True))
+
+        if request.profile_requested:
+            response[PROFILE_RESPONSE_HEADER] = format_profile_header(elapsed, summary)
+        return response
+
+
+def format_profile_header(seconds, summary):
+    """
+    Return the header value summarizing the profile `summary` of a request which took `seconds`,
+    as "total=<ms>; <name>=<count>/<ms>; ...".
+    """
+    return '; '.join(
+        ['total={:.1f}'.format(seconds * 1000)] + [
+            '{}={}/{:.1f}'.format(name, summary[name]['count'], summary[name]['ms'])
+            for name in sorted(summary)
+        ]
+    )
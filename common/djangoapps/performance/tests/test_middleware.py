@@ -0,0 +1,83 @@
+"""Tests of the request profiler middleware."""
+import json
+import logging
+from StringIO import StringIO
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import HttpResponse
+from django.test import TestCase
+from django.test.client import RequestFactory
+from django.test.utils import override_settings
+from mock import Mock, patch
+
+from performance.middleware import RequestProfilerMiddleware, PROFILE_RESPONSE_HEADER, format_profile_header
+from xmodule import profiling
+
+
+@patch.dict(settings.FEATURES, {'ENABLE_REQUEST_PROFILER': True})
+class RequestProfilerMiddlewareTest(TestCase):
+    """
+    Tests of which requests are profiled, and of how their profiles are reported.
+    """
+    def setUp(self):
+        super(RequestProfilerMiddlewareTest, self).setUp()
+        self.middleware = RequestProfilerMiddleware()
+        self.request_factory = RequestFactory()
+        self.stream = StringIO()
+        self.handler = logging.StreamHandler(self.stream)
+        self.log = logging.getLogger("perflog")
+        self.log.setLevel(logging.INFO)
+        self.log.addHandler(self.handler)
+        self.addCleanup(self.log.removeHandler, self.handler)
+        self.addCleanup(self.handler.close)
+        self.addCleanup(profiling.stop_profile)
+
+    def _request(self, is_staff=False, **extra):
+        """
+        Pass a request through the middleware, recording a profiled call, and return the response.
+        """
+        request = self.request_factory.get('/courses', **extra)
+        request.user = Mock(is_staff=is_staff)
+        self.middleware.process_request(request)
+        profiling.record('mongo.find', 0.25)
+        return self.middleware.process_response(request, HttpResponse())
+
+    def test_disabled(self):
+        with patch.dict(settings.FEATURES, {'ENABLE_REQUEST_PROFILER': False}):
+            with self.assertRaises(MiddlewareNotUsed):
+                RequestProfilerMiddleware()
+
+    def test_not_profiled(self):
+        response = self._request(is_staff=True)
+        self.assertNotIn(PROFILE_RESPONSE_HEADER, response)
+        self.assertEqual(self.stream.getvalue(), '')
+
+    def test_header_ignored_for_students(self):
+        response = self._request(HTTP_X_EDX_PROFILE='1')
+        self.assertNotIn(PROFILE_RESPONSE_HEADER, response)
+        self.assertEqual(self.stream.getvalue(), '')
+
+    def test_header_requested(self):
+        response = self._request(is_staff=True, HTTP_X_EDX_PROFILE='1')
+        self.assertIn('mongo.find=1/250.0', response[PROFILE_RESPONSE_HEADER])
+        logged = json.loads(self.stream.getvalue().strip())
+        self.assertEqual(logged['path'], '/courses')
+        self.assertEqual(logged['status'], 200)
+        self.assertTrue(logged['requested'])
+        self.assertEqual(logged['profile']['mongo.find'], {'count': 1, 'ms': 250})
+        self.assertIsNone(profiling.current_profile())
+
+    @override_settings(REQUEST_PROFILER_SAMPLE_RATE=1.0)
+    def test_sampled(self):
+        response = self._request()
+        self.assertNotIn(PROFILE_RESPONSE_HEADER, response)
+        logged = json.loads(self.stream.getvalue().strip())
+        self.assertFalse(logged['requested'])
+        self.assertEqual(logged['profile']['mongo.find']['count'], 1)
+
+    def test_format_profile_header(self):
+        self.assertEqual(
+            format_profile_header(0.5, {'sql.default': {'count': 3, 'ms': 2.5}, 'mako.render': {'count': 1, 'ms': 10}}),
+            'total=500.0; mako.render=1/10.0; sql.default=3/2.5'
+        )
@@ -1,5 +1,7 @@
+from collections import OrderedDict
 import logging
 import re
+import threading
 
 from staticfiles.storage import staticfiles_storage
 from staticfiles import finders
@@ -13,6 +15,48 @@ from opaque_keys.edx.locator import AssetLocator
 
 log = logging.getLogger(__name__)
 
+# How many compiled url patterns are kept around
+URL_PATTERN_CACHE_SIZE = 1000
+
+# How many rewritten static urls `replace_static_urls` keeps around
+STATIC_URL_CACHE_SIZE = 10000
+
+_url_patterns = OrderedDict()  # pylint: disable=invalid-name
+_url_patterns_lock = threading.Lock()  # pylint: disable=invalid-name
+
+_static_urls = OrderedDict()  # pylint: disable=invalid-name
+_static_urls_lock = threading.Lock()  # pylint: disable=invalid-name
+
+
+def _get_or_compute(cache, lock, max_size, key, compute):
+    """
+    Return the value of `key` in the OrderedDict `cache`, or compute it with
+    `compute()` if it isn't there, keeping only the `max_size` most recently
+    used values.
+    """
+    with lock:
+        value = cache.pop(key, None)
+        if value is not None:
+            # Re-insert it, to mark it as the most recently used.
+            cache[key] = value
+            return value
+
+    value = compute()
+
+    with lock:
+        cache[key] = value
+        while len(cache) > max_size:
+            cache.popitem(last=False)
+    return value
+
+
+def clear_static_url_cache():
+    """
+    Forget the static urls which `replace_static_urls` has rewritten.
+    """
+    with _static_urls_lock:
+        _static_urls.clear()
+
 
 def _url_replace_regex(prefix):
     """
@@ -30,6 +74,16 @@ def _url_replace_regex(prefix):
         """.format(prefix=prefix)
 
 
+def _compiled_url_replace_regex(prefix):
+    """
+    Return the compiled `_url_replace_regex` of `prefix`, which is only compiled once.
+    """
+    return _get_or_compute(
+        _url_patterns, _url_patterns_lock, URL_PATTERN_CACHE_SIZE, prefix,
+        lambda: re.compile(_url_replace_regex(prefix))
+    )
+
+
 def try_staticfiles_lookup(path):
     """
     Try to lookup a path in staticfiles_storage.  If it fails, return
@@ -71,7 +125,7 @@ def replace_jump_to_id_urls(text, course_id, jump_to_id_base_url):
         rest = match.group('rest')
         return "".join([quote, jump_to_id_base_url + rest, quote])
 
-    return re.sub(_url_replace_regex('/jump_to_id/'), replace_jump_to_id_url, text)
+    return _compiled_url_replace_regex('/jump_to_id/').sub(replace_jump_to_id_url, text)
 
 
 def replace_course_urls(text, course_key):
@@ -91,7 +145,7 @@ def replace_course_urls(text, course_key):
         rest = match.group('rest')
         return "".join([quote, '/courses/' + course_id + '/', rest, quote])
 
-    return re.sub(_url_replace_regex('/course/'), replace_course_url, text)
+    return _compiled_url_replace_regex('/course/').sub(replace_course_url, text)
 
 
 def process_static_urls(text, replacement_function, data_dir=None):
@@ -110,14 +164,10 @@ def process_static_urls(text, replacement_function, data_dir=None):
         rest = match.group('rest')
         return replacement_function(original, prefix, quote, rest)
 
-    return re.sub(
-        _url_replace_regex(u'(?:{static_url}|/static/)(?!{data_dir})'.format(
-            static_url=settings.STATIC_URL,
-            data_dir=data_dir
-        )),
-        wrap_part_extraction,
-        text
-    )
+    return _compiled_url_replace_regex(u'(?:{static_url}|/static/)(?!{data_dir})'.format(
+        static_url=settings.STATIC_URL,
+        data_dir=data_dir
+    )).sub(wrap_part_extraction, text)
 
 
 def make_static_urls_absolute(request, html):
@@ -161,45 +211,60 @@ def replace_static_urls(text, data_directory=None, course_id=None, static_asset_
         # In debug mode, if we can find the url as is,
         if settings.DEBUG and finders.find(rest, True):
             return original
-        # if we're running with a MongoBacked store course_namespace is not None, then use studio style urls
-        elif (not static_asset_path) \
-                and course_id \
-                and modulestore().get_modulestore_type(course_id) != ModuleStoreEnum.Type.xml:
-            # first look in the static file pipeline and see if we are trying to reference
-            # a piece of static content which is in the edx-platform repo (e.g. JS associated with an xmodule)
-
-            exists_in_staticfiles_storage = False
-            try:
-                exists_in_staticfiles_storage = staticfiles_storage.exists(rest)
-            except Exception as err:
-                log.warning("staticfiles_storage couldn't find path {0}: {1}".format(
-                    rest, str(err)))
-
-            if exists_in_staticfiles_storage:
-                url = staticfiles_storage.url(rest)
-            else:
-                # if not, then assume it's courseware specific content and then look in the
-                # Mongo-backed database
-                url = StaticContent.convert_legacy_static_url_with_course_id(rest, course_id)
 
-                if AssetLocator.CANONICAL_NAMESPACE in url:
-                    url = url.replace('block@', 'block/', 1)
+        # The rewritten urls only depend on the static file pipeline and on the modulestore
+        # of the course, so each of them is only looked up once.
+        url = _get_or_compute(
+            _static_urls, _static_urls_lock, STATIC_URL_CACHE_SIZE,
+            (course_id, static_asset_path, data_directory, prefix, rest),
+            lambda: _lookup_static_url(prefix, rest, data_directory, course_id, static_asset_path)
+        )
+        return "".join([quote, url, quote])
 
-        # Otherwise, look the file up in staticfiles_storage, and append the data directory if needed
+    return process_static_urls(text, replace_static_url, data_dir=static_asset_path or data_directory)
+
+
+def _lookup_static_url(prefix, rest, data_directory, course_id, static_asset_path):
+    """
+    Return the url which the static url `prefix` + `rest` is replaced with by `replace_static_urls`.
+    """
+    # if we're running with a MongoBacked store course_namespace is not None, then use studio style urls
+    if (not static_asset_path) \
+            and course_id \
+            and modulestore().get_modulestore_type(course_id) != ModuleStoreEnum.Type.xml:
+        # first look in the static file pipeline and see if we are trying to reference
+        # a piece of static content which is in the edx-platform repo (e.g. JS associated with an xmodule)
+
+        exists_in_staticfiles_storage = False
+        try:
+            exists_in_staticfiles_storage = staticfiles_storage.exists(rest)
+        except Exception as err:
+            log.warning("staticfiles_storage couldn't find path {0}: {1}".format(
+                rest, str(err)))
+
+        if exists_in_staticfiles_storage:
+            url = staticfiles_storage.url(rest)
         else:
-            course_path = "/".join((static_asset_path or data_directory, rest))
-
-            try:
-                if staticfiles_storage.exists(rest):
-                    url = staticfiles_storage.url(rest)
-                else:
-                    url = staticfiles_storage.url(course_path)
-            # And if that fails, assume that it's course content, and add manually data directory
-            except Exception as err:
-                log.warning("staticfiles_storage couldn't find path {0}: {1}".format(
-                    rest, str(err)))
-                url = "".join([prefix, course_path])
+            # if not, then assume it's courseware specific content and then look in the
+            # Mongo-backed database
+            url = StaticContent.convert_legacy_static_url_with_course_id(rest, course_id)
 
-        return "".join([quote, url, quote])
+            if AssetLocator.CANONICAL_NAMESPACE in url:
+                url = url.replace('block@', 'block/', 1)
 
-    return process_static_urls(text, replace_static_url, data_dir=static_asset_path or data_directory)
+    # Otherwise, look the file up in staticfiles_storage, and append the data directory if needed
+    else:
+        course_path = "/".join((static_asset_path or data_directory, rest))
+
+        try:
+            if staticfiles_storage.exists(rest):
+                url = staticfiles_storage.url(rest)
+            else:
+                url = staticfiles_storage.url(course_path)
+        # And if that fails, assume that it's course content, and add manually data directory
+        except Exception as err:
+            log.warning("staticfiles_storage couldn't find path {0}: {1}".format(
+                rest, str(err)))
+            url = "".join([prefix, course_path])
+
+    return url
@@ -1,7 +1,8 @@
 import re
 
-from nose.tools import assert_equals, assert_true, assert_false  # pylint: disable=no-name-in-module
+from nose.tools import assert_equals, assert_true, assert_false, with_setup  # pylint: disable=no-name-in-module
 from static_replace import (
+    clear_static_url_cache,
     replace_static_urls,
     replace_course_urls,
     _url_replace_regex,
@@ -19,6 +20,7 @@ COURSE_KEY = SlashSeparatedCourseKey('org', 'course', 'run')
 STATIC_SOURCE = '"/static/file.png"'
 
 
+@with_setup(clear_static_url_cache)
 def test_multi_replace():
     course_source = '"/course/file.png"'
 
@@ -63,6 +65,7 @@ def test_static_urls(mock_request):
     assert_equals(result, '\"http:///static/file.png\"')
 
 
+@with_setup(clear_static_url_cache)
 @patch('static_replace.staticfiles_storage')
 def test_storage_url_exists(mock_storage):
     mock_storage.exists.return_value = True
@@ -73,6 +76,7 @@ def test_storage_url_exists(mock_storage):
     mock_storage.url.called_once_with('data_dir/file.png')
 
 
+@with_setup(clear_static_url_cache)
 @patch('static_replace.staticfiles_storage')
 def test_storage_url_not_exists(mock_storage):
     mock_storage.exists.return_value = False
@@ -83,6 +87,7 @@ def test_storage_url_not_exists(mock_storage):
     mock_storage.url.called_once_with('file.png')
 
 
+@with_setup(clear_static_url_cache)
 @patch('static_replace.StaticContent')
 @patch('static_replace.modulestore')
 def test_mongo_filestore(mock_modulestore, mock_static_content):
@@ -102,6 +107,7 @@ def test_mongo_filestore(mock_modulestore, mock_static_content):
     mock_static_content.convert_legacy_static_url_with_course_id.assert_called_once_with('file.png', COURSE_KEY)
 
 
+@with_setup(clear_static_url_cache)
 @patch('static_replace.settings')
 @patch('static_replace.modulestore')
 @patch('static_replace.staticfiles_storage')
@@ -116,6 +122,21 @@ def test_data_dir_fallback(mock_storage, mock_modulestore, mock_settings):
     assert_equals('"/static/data_dir/file.png"', replace_static_urls(STATIC_SOURCE, DATA_DIRECTORY))
 
 
+@with_setup(clear_static_url_cache)
+@patch('static_replace.staticfiles_storage')
+def test_storage_looked_up_once(mock_storage):
+    mock_storage.exists.return_value = True
+    mock_storage.url.return_value = '/static/file.png'
+
+    for __ in range(2):
+        assert_equals('"/static/file.png"', replace_static_urls(STATIC_SOURCE, DATA_DIRECTORY))
+    mock_storage.exists.assert_called_once_with('file.png')
+
+    # Another data directory is looked up again
+    replace_static_urls(STATIC_SOURCE, 'other_dir')
+    assert_equals(mock_storage.exists.call_count, 2)
+
+
 def test_raw_static_check():
     """
     Make sure replace_static_urls leaves alone things that end in '.raw'
@@ -127,6 +148,7 @@ def test_raw_static_check():
     assert_equals(path, replace_static_urls(path, text))
 
 
+@with_setup(clear_static_url_cache)
 @patch('static_replace.staticfiles_storage')
 @patch('static_replace.modulestore')
 def test_static_url_with_query(mock_modulestore, mock_storage):
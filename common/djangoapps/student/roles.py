@@ -5,15 +5,21 @@ adding users, removing users, and listing members
 
 from abc import ABCMeta, abstractmethod
 
+from crum import get_current_request
 from django.contrib.auth.models import User
 import logging
 
+from request_cache.middleware import RequestCache
 from student.models import CourseAccessRole
 from xmodule_django.models import CourseKeyField
 
 
 log = logging.getLogger(__name__)
 
+# The RoleCaches of the users whose roles were checked while handling a request are kept
+# in its request cache under this key
+ROLE_CACHES_CACHE_KEY = 'student.roles.role_caches'
+
 # A list of registered access roles.
 REGISTERED_ACCESS_ROLES = {}
 
@@ -43,6 +49,30 @@ class RoleCache(object):
             CourseAccessRole.objects.filter(user=user).all()
         )
 
+    @classmethod
+    def for_user(cls, user):
+        """
+        Return the RoleCache of user. While handling a request, all the User objects
+        of a user share one, so the user's roles are only queried once per request.
+        """
+        if get_current_request() is None:
+            return cls(user)
+
+        role_caches = RequestCache.get_request_cache().data.setdefault(ROLE_CACHES_CACHE_KEY, {})
+        if user.id not in role_caches:
+            role_caches[user.id] = cls(user)
+        return role_caches[user.id]
+
+    @staticmethod
+    def invalidate(user):
+        """
+        Forget the cached roles of user, after they changed.
+        """
+        # pylint: disable=protected-access
+        if hasattr(user, '_roles'):
+            del user._roles
+        RequestCache.get_request_cache().data.get(ROLE_CACHES_CACHE_KEY, {}).pop(user.id, None)
+
     def has_role(self, role, course_id, org):
         """
         Return whether this RoleCache contains a role with the specified role, course_id, and org
@@ -141,7 +171,7 @@ class RoleBase(AccessRole):
         if not hasattr(user, '_roles'):
             # Cache a list of tuples identifying the particular roles that a user has
             # Stored as tuples, rather than django models, to make it cheaper to construct objects for comparison
-            user._roles = RoleCache(user)
+            user._roles = RoleCache.for_user(user)
 
         return user._roles.has_role(self._role_name, self.course_key, self.org)
 
@@ -156,8 +186,7 @@ class RoleBase(AccessRole):
             if user.is_authenticated and user.is_active and not self.has_user(user):
                 entry = CourseAccessRole(user=user, role=self._role_name, course_id=self.course_key, org=self.org)
                 entry.save()
-                if hasattr(user, '_roles'):
-                    del user._roles
+                RoleCache.invalidate(user)
 
     def remove_users(self, *users):
         """
@@ -168,8 +197,7 @@ class RoleBase(AccessRole):
         )
         entries.delete()
         for user in users:
-            if hasattr(user, '_roles'):
-                del user._roles
+            RoleCache.invalidate(user)
 
     def users_with_role(self):
         """
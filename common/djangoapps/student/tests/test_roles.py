@@ -2,7 +2,10 @@
 Tests of student.roles
 """
 import ddt
+from django.contrib.auth.models import User
 from django.test import TestCase
+from mock import Mock, patch
+from request_cache.middleware import RequestCache
 
 from courseware.tests.factories import UserFactory, StaffFactory, InstructorFactory
 from student.tests.factories import AnonymousUserFactory
@@ -193,3 +196,18 @@ class RoleCacheTestCase(TestCase):
     def test_empty_cache(self, role, target):
         cache = RoleCache(self.user)
         self.assertFalse(cache.has_role(*target))
+
+    @patch('student.roles.get_current_request', Mock(return_value=Mock()))
+    def test_shared_during_request(self):
+        self.addCleanup(RequestCache().clear_request_cache)
+        self.assertFalse(CourseStaffRole(self.IN_KEY).has_user(self.user))
+
+        # Other objects of the same user reuse the roles queried during the request
+        same_user = User.objects.get(id=self.user.id)
+        with self.assertNumQueries(0):
+            self.assertFalse(CourseStaffRole(self.IN_KEY).has_user(same_user))
+            self.assertFalse(CourseInstructorRole(self.IN_KEY).has_user(same_user))
+
+        # Until they change
+        CourseStaffRole(self.IN_KEY).add_users(self.user)
+        self.assertTrue(CourseStaffRole(self.IN_KEY).has_user(User.objects.get(id=self.user.id)))
@@ -0,0 +1,201 @@
+"""
+Event tracker backend that sends events to another backend in batches, from
+a background thread, so that requests don't wait for events to be stored.
+
+Configure it by wrapping the configuration of the backend to send to::
+
+  TRACKING_BACKENDS = {
+      'mongo': {
+          'ENGINE': 'track.backends.buffered.BufferedBackend',
+          'OPTIONS': {
+              'backend': {
+                  'ENGINE': 'track.backends.mongodb.MongoBackend',
+                  'OPTIONS': {...},
+              },
+              'batch_size': 100,
+          }
+      }
+  }
+
+"""
+
+from __future__ import absolute_import
+
+import atexit
+import logging
+import os
+import Queue
+import threading
+import time
+
+from dogapi import dog_stats_api
+
+from track.backends import BaseBackend
+
+
+log = logging.getLogger(__name__)
+
+
+class BufferedBackend(BaseBackend):
+    """
+    Queues events in memory and sends them to the wrapped backend in batches.
+
+    Events are sent when `batch_size` of them are waiting, or when the oldest
+    has waited `flush_interval` seconds. When `max_queue_size` events are
+    already waiting, `send` waits up to `block_timeout` seconds for room in the
+    queue, then drops the event. Whatever is still queued when the process
+    exits is sent before it does, and the batch being sent is given up to
+    `exit_timeout` seconds to finish.
+    """
+    def __init__(self, backend, max_queue_size=10000, batch_size=100, flush_interval=1.0, block_timeout=0,
+                 exit_timeout=5.0, **options):
+        """
+        :Parameters:
+
+          - `backend`: the configuration (`ENGINE` and `OPTIONS`) of the backend to send events to
+          - `max_queue_size`: how many events may wait to be sent
+          - `batch_size`: how many events are sent at once
+          - `flush_interval`: how many seconds an event waits, at most, to be sent
+          - `block_timeout`: how many seconds `send` waits for room in a full queue
+          - `exit_timeout`: how many seconds the process waits, when it exits, for the batch being sent
+
+        """
+        super(BufferedBackend, self).__init__(**options)
+
+        # Imported here since the tracker instantiates its backends when it's imported
+        from track.tracker import _instantiate_backend_from_name
+        self.backend = _instantiate_backend_from_name(backend['ENGINE'], backend.get('OPTIONS', {}))
+
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.block_timeout = block_timeout
+        self.exit_timeout = exit_timeout
+        self.queue = Queue.Queue(maxsize=max_queue_size)
+
+        self.sent = 0
+        self.dropped = 0
+        self.failed = 0
+        self._stats_lock = threading.Lock()
+
+        self._send_lock = threading.Lock()
+        self._thread = None
+        self._thread_pid = None
+        self._thread_lock = threading.Lock()
+
+        atexit.register(self.flush, timeout=self.exit_timeout)
+
+    def send(self, event):
+        """Queue the event to be sent."""
+        self._ensure_thread()
+        try:
+            if self.block_timeout:
+                self.queue.put(event, timeout=self.block_timeout)
+            else:
+                self.queue.put_nowait(event)
+        except Queue.Full:
+            self._count('dropped', 1)
+            dog_stats_api.increment('track.buffered.dropped')
+
+    def _ensure_thread(self):
+        """
+        Start the thread which sends the queued events, if it isn't running in this process.
+
+        Threads don't survive a fork, so a process forked after the backend was
+        created needs its own.
+        """
+        if self._thread is not None and self._thread_pid == os.getpid() and self._thread.is_alive():
+            return
+
+        with self._thread_lock:
+            if self._thread is None or self._thread_pid != os.getpid() or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='track-buffered-backend')
+                self._thread.daemon = True
+                self._thread_pid = os.getpid()
+                self._thread.start()
+
+    def _run(self):
+        """Send the queued events, batch by batch, forever."""
+        while True:
+            batch = self._next_batch()
+            if batch:
+                self._send_batch(batch)
+
+    def _next_batch(self):
+        """
+        Wait for queued events, and return them once `batch_size` are waiting or
+        `flush_interval` has passed since the first was taken.
+        """
+        batch = [self.queue.get()]
+        deadline = time.time() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self.queue.get(timeout=remaining))
+            except Queue.Empty:
+                break
+        return batch
+
+    def _count(self, counter, number):
+        """Add `number` to the counter of events named `counter`."""
+        with self._stats_lock:
+            setattr(self, counter, getattr(self, counter) + number)
+
+    def _send_batch(self, batch):
+        """
+        Send a batch of events taken from the queue to the wrapped backend, and
+        mark them done in the queue.
+        """
+        with self._send_lock:
+            try:
+                with dog_stats_api.timer('track.buffered.send_batch'):
+                    self.backend.send_batch(batch)
+            except Exception:  # pylint: disable=broad-except
+                # The wrapped backends log their own errors; this is whatever slipped through.
+                log.exception('Error sending a batch of %d events', len(batch))
+                self._count('failed', len(batch))
+                dog_stats_api.increment('track.buffered.failed', len(batch))
+            else:
+                self._count('sent', len(batch))
+            finally:
+                for __ in batch:
+                    self.queue.task_done()
+
+    def flush(self, timeout=0):
+        """
+        Send every queued event now, from the calling thread, then wait up to
+        `timeout` seconds for the batch the background thread already took
+        from the queue to be sent.
+        """
+        while True:
+            batch = []
+            try:
+                while len(batch) < self.batch_size:
+                    batch.append(self.queue.get_nowait())
+            except Queue.Empty:
+                pass
+            if not batch:
+                break
+            self._send_batch(batch)
+
+        # The queue counts the events taken from it until they are marked done
+        deadline = time.time() + timeout
+        with self.queue.all_tasks_done:
+            while self.queue.unfinished_tasks:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    if timeout:
+                        log.warning('%d tracking events were not sent in time', self.queue.unfinished_tasks)
+                    break
+                self.queue.all_tasks_done.wait(remaining)
+
+    def stats(self):
+        """Return counters of what happened to the events given to this backend."""
+        with self._stats_lock:
+            return {
+                'queued': self.queue.qsize(),
+                'sent': self.sent,
+                'dropped': self.dropped,
+                'failed': self.failed,
+            }
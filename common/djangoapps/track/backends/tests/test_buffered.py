@@ -0,0 +1,101 @@
+from __future__ import absolute_import
+
+import time
+
+from django.test import TestCase
+
+from track.backends import BaseBackend
+from track.backends.buffered import BufferedBackend
+
+
+class InMemoryBackend(BaseBackend):
+    """A backend keeping the batches it is sent, for inspection."""
+    def __init__(self, fail=False, **options):
+        super(InMemoryBackend, self).__init__(**options)
+        self.fail = fail
+        self.batches = []
+
+    def send(self, event):
+        self.send_batch([event])
+
+    def send_batch(self, events):
+        if self.fail:
+            raise Exception("Unable to store events")
+        self.batches.append(list(events))
+
+
+class TestBufferedBackend(TestCase):
+    def make_backend(self, fail=False, **options):
+        """Return a BufferedBackend wrapping an InMemoryBackend."""
+        return BufferedBackend(
+            backend={
+                'ENGINE': 'track.backends.tests.test_buffered.InMemoryBackend',
+                'OPTIONS': {'fail': fail},
+            },
+            **options
+        )
+
+    def wait_for(self, condition, timeout=5):
+        """Wait until `condition()` is true, failing the test after `timeout` seconds."""
+        deadline = time.time() + timeout
+        while not condition():
+            if time.time() > deadline:
+                self.fail("Timed out waiting for the background thread")
+            time.sleep(0.01)
+
+    def test_batches_by_size(self):
+        backend = self.make_backend(batch_size=3, flush_interval=60)
+        for i in range(6):
+            backend.send({'test': i})
+
+        self.wait_for(lambda: backend.stats()['sent'] == 6)
+        self.assertEqual(backend.backend.batches, [
+            [{'test': 0}, {'test': 1}, {'test': 2}],
+            [{'test': 3}, {'test': 4}, {'test': 5}],
+        ])
+
+    def test_batches_by_time(self):
+        backend = self.make_backend(batch_size=100, flush_interval=0.05)
+        backend.send({'test': 1})
+
+        self.wait_for(lambda: backend.stats()['sent'] == 1)
+        self.assertEqual(backend.backend.batches, [[{'test': 1}]])
+
+    def test_flush(self):
+        backend = self.make_backend(batch_size=2)
+        # Without the background thread, events stay queued until flushed
+        for i in range(3):
+            backend.queue.put({'test': i})
+
+        backend.flush()
+
+        self.assertEqual(backend.backend.batches, [[{'test': 0}, {'test': 1}], [{'test': 2}]])
+        self.assertEqual(backend.stats(), {'queued': 0, 'sent': 3, 'dropped': 0, 'failed': 0})
+
+    def test_drops_when_full(self):
+        backend = self.make_backend(max_queue_size=2)
+        # Pretend the background thread is running, but stuck
+        backend._ensure_thread = lambda: None  # pylint: disable=protected-access
+        for i in range(5):
+            backend.send({'test': i})
+
+        self.assertEqual(backend.stats(), {'queued': 2, 'sent': 0, 'dropped': 3, 'failed': 0})
+
+    def test_failed_batches(self):
+        backend = self.make_backend(fail=True)
+        backend.queue.put({'test': 1})
+
+        backend.flush()
+
+        self.assertEqual(backend.stats(), {'queued': 0, 'sent': 0, 'dropped': 0, 'failed': 1})
+
+    def test_flush_waits_for_batch_being_sent(self):
+        backend = self.make_backend(batch_size=100, flush_interval=0.2)
+        backend.send({'test': 1})
+        # The background thread took the event, and waits for more before sending it
+        self.wait_for(lambda: backend.stats()['queued'] == 0)
+
+        backend.flush(timeout=5)
+
+        self.assertEqual(backend.backend.batches, [[{'test': 1}]])
+        self.assertEqual(backend.stats()['sent'], 1)
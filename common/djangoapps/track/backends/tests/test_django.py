@@ -24,3 +24,13 @@ class TestDjangoBackend(TestCase):
 
         # Check if time is stored in UTC
         self.assertEqual(str(results[0].time), '2013-01-01 17:01:00+00:00')
+
+    def test_django_backend_batch(self):
+        events = [
+            {'username': 'test1', 'time': '2013-01-01T12:01:00-05:00'},
+            {'username': 'test2', 'time': '2013-01-01T12:02:00-05:00'},
+        ]
+        self.backend.send_batch(events)
+
+        usernames = sorted(log.username for log in TrackingLog.objects.all())
+        self.assertEqual(usernames, ['test1', 'test2'])
@@ -1,5 +1,9 @@
 import re
 from django.conf import settings
+from django.core.cache import cache, get_cache, InvalidCacheBackendError
+
+from capa.safe_exec import SafeExecResultCache
+from xmodule import profiling
 
 # We'll make assets named this be importable by Python code in the sandbox.
 PYTHON_LIB_ZIP = "python_lib.zip"
@@ -38,3 +42,37 @@ def get_python_lib_zip(contentstore, course_id):
         return zip_lib.data
     else:
         return None
+
+
+_SAFE_EXEC_CACHE = None
+
+
+class ProfiledSafeExecResultCache(SafeExecResultCache):
+    """
+    A SafeExecResultCache which also reports its hits, and the code it executes
+    on misses, to the profile of the current request.
+    """
+    def record(self, slug, hit, exec_seconds=0.0):
+        super(ProfiledSafeExecResultCache, self).record(slug, hit, exec_seconds)
+        if hit:
+            profiling.record('safe_exec.cache_hit')
+        else:
+            profiling.record('safe_exec.exec', exec_seconds)
+
+
+def safe_exec_cache():
+    """
+    Return the process-wide cache of safe_exec results.
+
+    Results are shared between processes through the 'safe_exec' cache if one
+    is configured, else through the default cache, and the most recently used
+    ones are also kept in process, up to settings.SAFE_EXEC_CACHE_MAX_BYTES.
+    """
+    global _SAFE_EXEC_CACHE  # pylint: disable=global-statement
+    if _SAFE_EXEC_CACHE is None:
+        try:
+            backend = get_cache('safe_exec')
+        except InvalidCacheBackendError:
+            backend = cache
+        _SAFE_EXEC_CACHE = ProfiledSafeExecResultCache(backend, max_bytes=settings.SAFE_EXEC_CACHE_MAX_BYTES)
+    return _SAFE_EXEC_CACHE
@@ -7,6 +7,9 @@ Uses pyparsing to parse. Main function as of now is evaluator().
 import math
 import operator
 import numbers
+import threading
+from collections import OrderedDict
+
 import numpy
 import scipy.constants
 import functions
@@ -228,34 +231,235 @@ def evaluator(variables, functions, math_expr, case_sensitive=False):
     if math_expr.strip() == "":
         return float('nan')
 
-    # Parse the tree.
-    math_interpreter = ParseAugmenter(math_expr, case_sensitive)
-    math_interpreter.parse_algebra()
+    return compile_expression(math_expr, case_sensitive).evaluate(variables, functions)
 
-    # Get our variables together.
-    all_variables, all_functions = add_defaults(variables, functions, case_sensitive)
 
-    # ...and check them
-    math_interpreter.check_variables(all_variables, all_functions)
+def evaluate_samples(variables_list, functions, math_expr, case_sensitive=False):
+    """
+    Evaluate an expression once for each dictionary of variables in
+    `variables_list`; return the list of results.
 
-    # Create a recursion to evaluate the tree.
-    if case_sensitive:
-        casify = lambda x: x
-    else:
-        casify = lambda x: x.lower()  # Lowercase for case insens.
-
-    evaluate_actions = {
-        'number': eval_number,
-        'variable': lambda x: all_variables[casify(x[0])],
-        'function': lambda x: all_functions[casify(x[0])](x[1]),
-        'atom': eval_atom,
-        'power': eval_power,
-        'parallel': eval_parallel,
-        'product': eval_product,
-        'sum': eval_sum
-    }
-
-    return math_interpreter.reduce_tree(evaluate_actions)
+    Equivalent to calling `evaluator` on each sample, but the expression is
+    parsed only once, and when possible all the samples are computed together
+    with numpy arrays.
+    """
+    if math_expr.strip() == "":
+        return [float('nan')] * len(variables_list)
+
+    return compile_expression(math_expr, case_sensitive).evaluate_samples(variables_list, functions)
+
+
+# How many parsed expressions `compile_expression` keeps around
+COMPILED_EXPRESSION_CACHE_SIZE = 1024
+
+_compiled_expressions = OrderedDict()  # pylint: disable=invalid-name
+_compiled_expressions_lock = threading.Lock()  # pylint: disable=invalid-name
+
+
+def compile_expression(math_expr, case_sensitive=False):
+    """
+    Parse `math_expr` and return a `CompiledExpression`, which can be
+    evaluated any number of times.
+
+    The most recently used expressions are cached, so that evaluating the same
+    answer over and over only parses it once. Expressions which fail to parse
+    aren't cached.
+    """
+    key = (math_expr, case_sensitive)
+    with _compiled_expressions_lock:
+        compiled = _compiled_expressions.pop(key, None)
+        if compiled is not None:
+            # Re-insert it, to mark it as the most recently used.
+            _compiled_expressions[key] = compiled
+            return compiled
+
+    compiled = CompiledExpression(math_expr, case_sensitive)
+
+    with _compiled_expressions_lock:
+        _compiled_expressions[key] = compiled
+        while len(_compiled_expressions) > COMPILED_EXPRESSION_CACHE_SIZE:
+            _compiled_expressions.popitem(last=False)
+    return compiled
+
+
+# Functions which give the same results on numpy arrays as they would on each
+# of the arrays' elements.
+VECTORIZED_FUNCTIONS = set(
+    func for func in DEFAULT_FUNCTIONS.values()
+    if isinstance(func, numpy.ufunc) or getattr(func, '__module__', None) == functions.__name__
+)
+
+
+def _is_value(token):
+    """
+    Return whether `token` is a value, rather than an operator or parenthesis.
+    """
+    return not isinstance(token, basestring)
+
+
+def eval_atom_array(parse_result):
+    """
+    Like `eval_atom`, but for values which may be numpy arrays.
+    """
+    return next(k for k in parse_result if _is_value(k))
+
+
+def eval_power_array(parse_result):
+    """
+    Like `eval_power`, but for values which may be numpy arrays.
+    """
+    return reduce(lambda a, b: b ** a, reversed([k for k in parse_result if _is_value(k)]))
+
+
+def eval_parallel_array(parse_result):
+    """
+    Like `eval_parallel`, but for values which may be numpy arrays.
+
+    A zero input raises a FloatingPointError, rather than returning NaN, so the
+    caller can fall back to evaluating the samples one at a time.
+    """
+    if len(parse_result) == 1:
+        return parse_result[0]
+    return 1. / sum(1. / e for e in parse_result if _is_value(e))
+
+
+def eval_sum_array(parse_result):
+    """
+    Like `eval_sum`, but for values which may be numpy arrays.
+    """
+    total = 0.0
+    current_op = operator.add
+    for token in parse_result:
+        if not _is_value(token):
+            current_op = operator.sub if token == '-' else operator.add
+        else:
+            total = current_op(total, token)
+    return total
+
+
+def eval_product_array(parse_result):
+    """
+    Like `eval_product`, but for values which may be numpy arrays.
+    """
+    prod = 1.0
+    current_op = operator.mul
+    for token in parse_result:
+        if not _is_value(token):
+            current_op = operator.truediv if token == '/' else operator.mul
+        else:
+            prod = current_op(prod, token)
+    return prod
+
+
+class CompiledExpression(object):
+    """
+    A parsed math expression, which can be evaluated with different variables.
+
+    Instances are shared through `compile_expression`, so they must not be
+    modified once created.
+    """
+    def __init__(self, math_expr, case_sensitive=False):
+        self.math_expr = math_expr
+        self.case_sensitive = case_sensitive
+        self.math_interpreter = ParseAugmenter(math_expr, case_sensitive)
+        self.math_interpreter.parse_algebra()
+
+    def casify(self, name):
+        """
+        Return the name under which `name` is looked up.
+        """
+        return name if self.case_sensitive else name.lower()
+
+    def _defaults(self, variables, functions):
+        """
+        Return all the variables and functions available to the expression,
+        having checked that it doesn't use any others.
+        """
+        all_variables, all_functions = add_defaults(variables, functions, self.case_sensitive)
+        self.math_interpreter.check_variables(all_variables, all_functions)
+        return all_variables, all_functions
+
+    def evaluate(self, variables, functions):
+        """
+        Evaluate the expression with the given variables and functions.
+        """
+        all_variables, all_functions = self._defaults(variables, functions)
+
+        casify = self.casify
+        evaluate_actions = {
+            'number': eval_number,
+            'variable': lambda x: all_variables[casify(x[0])],
+            'function': lambda x: all_functions[casify(x[0])](x[1]),
+            'atom': eval_atom,
+            'power': eval_power,
+            'parallel': eval_parallel,
+            'product': eval_product,
+            'sum': eval_sum
+        }
+
+        return self.math_interpreter.reduce_tree(evaluate_actions)
+
+    def evaluate_samples(self, variables_list, functions):
+        """
+        Evaluate the expression once for each dictionary of variables in
+        `variables_list`, and return the list of results.
+
+        The samples are computed in one pass over numpy arrays when the
+        expression only uses vectorized functions. If that pass fails, or hits
+        a floating point error (whose handling differs between numpy arrays and
+        python numbers), the samples are evaluated one at a time instead, so
+        that the results and errors are the same as `evaluate`'s.
+        """
+        if not variables_list:
+            return []
+
+        try:
+            results = self._evaluate_vectorized(variables_list, functions)
+        except UndefinedVariable:
+            raise
+        except Exception:  # pylint: disable=broad-except
+            results = None
+
+        if results is None:
+            results = [self.evaluate(variables, functions) for variables in variables_list]
+        return results
+
+    def _evaluate_vectorized(self, variables_list, functions):
+        """
+        Evaluate the expression for all of `variables_list` at once. Return None
+        if the expression can't be evaluated that way.
+        """
+        all_variables, all_functions = self._defaults(variables_list[0], functions)
+
+        casify = self.casify
+        used_functions = [all_functions[casify(name)] for name in self.math_interpreter.functions_used]
+        if not all(func in VECTORIZED_FUNCTIONS for func in used_functions):
+            return None
+
+        names = set(variables_list[0])
+        if any(set(variables) != names for variables in variables_list):
+            return None
+        for name in names:
+            all_variables[casify(name)] = numpy.array([variables[name] for variables in variables_list])
+
+        evaluate_actions = {
+            'number': eval_number,
+            'variable': lambda x: all_variables[casify(x[0])],
+            'function': lambda x: all_functions[casify(x[0])](x[1]),
+            'atom': eval_atom_array,
+            'power': eval_power_array,
+            'parallel': eval_parallel_array,
+            'product': eval_product_array,
+            'sum': eval_sum_array
+        }
+
+        with numpy.errstate(all='raise'):
+            result = self.math_interpreter.reduce_tree(evaluate_actions)
+
+        if numpy.ndim(result) == 0:
+            # The expression doesn't depend on any of the sampled variables.
+            return [result] * len(variables_list)
+        return list(result)
 
 
 class ParseAugmenter(object):
@@ -3,6 +3,7 @@ Unit tests for calc.py
 """
 
 import unittest
+from mock import patch
 import numpy
 import calc
 from pyparsing import ParseException
@@ -559,3 +560,58 @@ class EvaluatorTest(unittest.TestCase):
             calc.evaluator({'r1': 5}, {}, "r1+r2")
         with self.assertRaisesRegexp(calc.UndefinedVariable, 'r1 r3'):
             calc.evaluator(variables, {}, "r1*r3", case_sensitive=True)
+
+
+class CompiledExpressionTest(unittest.TestCase):
+    """
+    Test `calc.compile_expression` and `calc.evaluate_samples`.
+    """
+    def test_compiled_once(self):
+        first = calc.compile_expression('x^2 + sin(x)')
+        self.assertIs(first, calc.compile_expression('x^2 + sin(x)'))
+        self.assertIsNot(first, calc.compile_expression('x^2 + sin(x)', case_sensitive=True))
+        self.assertAlmostEqual(first.evaluate({'x': 2.0}, {}), 4 + numpy.sin(2.0))
+
+    def test_cache_bounded(self):
+        with patch('calc.calc.COMPILED_EXPRESSION_CACHE_SIZE', 2):
+            first = calc.compile_expression('1+1')
+            calc.compile_expression('2+2')
+            calc.compile_expression('3+3')
+            self.assertIsNot(first, calc.compile_expression('1+1'))
+
+    def test_parse_error_not_cached(self):
+        with self.assertRaises(ParseException):
+            calc.compile_expression('5+(3')
+        self.assertNotIn(('5+(3', False), calc.calc._compiled_expressions)  # pylint: disable=protected-access
+
+    def assert_samples_match(self, math_expr, variables_list, functions=None):
+        """
+        Check that `evaluate_samples` gives the same results as `evaluator` on each sample.
+        """
+        functions = functions or {}
+        results = calc.evaluate_samples(variables_list, functions, math_expr)
+        self.assertEqual(len(results), len(variables_list))
+        for variables, result in zip(variables_list, results):
+            expected = calc.evaluator(variables, functions, math_expr)
+            if numpy.isnan(expected):
+                self.assertTrue(numpy.isnan(result))
+            else:
+                self.assertAlmostEqual(expected, result)
+
+    def test_samples(self):
+        samples = [{'x': 0.5 + index, 'y': 2.0 - index} for index in range(5)]
+        self.assert_samples_match('x^2 + 3*y - sin(x)/exp(y)', samples)
+        self.assert_samples_match('x || y', samples)
+        self.assert_samples_match('-x + (y*i)^2', samples)
+        self.assert_samples_match('42', samples)
+        self.assert_samples_match('sqrt(y)', samples)
+        self.assert_samples_match('arccot(y)', samples)
+        self.assert_samples_match('fact(3) * x', samples)
+        self.assert_samples_match('f(x)', samples, {'f': lambda x: x if x > 1 else 0})
+
+    def test_samples_errors(self):
+        with self.assertRaises(ZeroDivisionError):
+            calc.evaluate_samples([{'x': 1.0}, {'x': 0.0}], {}, '1/x')
+        with self.assertRaisesRegexp(calc.UndefinedVariable, 'y'):
+            calc.evaluate_samples([{'x': 1.0}], {}, 'x+y')
+        self.assertEqual(calc.evaluate_samples([], {}, 'x'), [])
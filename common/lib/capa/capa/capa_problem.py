@@ -13,12 +13,16 @@ Main module which shows problems (of "capa" type).
 This is used by capa_module.
 """
 
+from collections import OrderedDict
 from copy import deepcopy
 from datetime import datetime
+import hashlib
 import logging
 import os.path
 import re
+import threading
 
+from codejail.safe_exec import json_safe
 from lxml import etree
 from pytz import UTC
 from xml.sax.saxutils import unescape
@@ -58,6 +62,61 @@ html_problem_semantics = [
 
 log = logging.getLogger(__name__)
 
+# How many parsed problems `parse_problem_text` keeps around
+PROBLEM_TEMPLATE_CACHE_SIZE = 500
+
+# How many results of problem scripts `LoncapaProblem._extract_context` keeps around
+SCRIPT_CONTEXT_CACHE_SIZE = 2000
+
+_problem_templates = OrderedDict()  # pylint: disable=invalid-name
+_problem_templates_lock = threading.Lock()  # pylint: disable=invalid-name
+
+_script_contexts = OrderedDict()  # pylint: disable=invalid-name
+_script_contexts_lock = threading.Lock()  # pylint: disable=invalid-name
+
+
+def _lru_get(cache, lock, key):
+    """
+    Return the value of `key` in the OrderedDict `cache`, marking it as the most
+    recently used, or None if it isn't there.
+    """
+    with lock:
+        value = cache.pop(key, None)
+        if value is not None:
+            cache[key] = value
+        return value
+
+
+def _lru_set(cache, lock, key, value, max_size):
+    """
+    Store `value` under `key` in the OrderedDict `cache`, dropping the least
+    recently used values beyond `max_size`.
+    """
+    with lock:
+        cache[key] = value
+        while len(cache) > max_size:
+            cache.popitem(last=False)
+
+
+def parse_problem_text(problem_text):
+    """
+    Return the problem XML `problem_text`, with startouttext and endouttext
+    converted to <text></text>, and a new element tree parsed from it.
+
+    The most recently used problems are cached, so that the same problem is only
+    parsed once for all the students who load it: the cached tree is copied, which
+    is much faster than parsing it again. Problems which fail to parse aren't cached.
+    """
+    template = _lru_get(_problem_templates, _problem_templates_lock, problem_text)
+    if template is None:
+        converted_text = re.sub(r"startouttext\s*/", "text", problem_text)
+        converted_text = re.sub(r"endouttext\s*/", "/text", converted_text)
+        template = (converted_text, etree.XML(converted_text))
+        _lru_set(_problem_templates, _problem_templates_lock, problem_text, template, PROBLEM_TEMPLATE_CACHE_SIZE)
+
+    converted_text, tree = template
+    return converted_text, deepcopy(tree)
+
 #-----------------------------------------------------------------------------
 # main class for this module
 
@@ -155,13 +214,9 @@ class LoncapaProblem(object):
         self.done = state.get('done', False)
         self.input_state = state.get('input_state', {})
 
-        # Convert startouttext and endouttext to proper <text></text>
-        problem_text = re.sub(r"startouttext\s*/", "text", problem_text)
-        problem_text = re.sub(r"endouttext\s*/", "/text", problem_text)
-        self.problem_text = problem_text
-
+        # Convert startouttext and endouttext to proper <text></text>, and
         # parse problem XML file into an element tree
-        self.tree = etree.XML(problem_text)
+        self.problem_text, self.tree = parse_problem_text(problem_text)
 
         # handle any <include file="foo"> tags
         self._process_includes()
@@ -655,21 +710,50 @@ class LoncapaProblem(object):
                 extra_files.append(("python_lib.zip", zip_lib))
                 python_path.append("python_lib.zip")
 
-            try:
-                safe_exec(
-                    all_code,
-                    context,
-                    random_seed=self.seed,
-                    python_path=python_path,
-                    extra_files=extra_files,
-                    cache=self.capa_system.cache,
-                    slug=self.problem_id,
-                    unsafely=self.capa_system.can_execute_unsafe_code(),
+            # Only scripts which use the student's id are given it, so that the results
+            # of the others can be cached for every student with the same seed.
+            if 'anonymous_student_id' in all_code:
+                script_globals = context
+            else:
+                script_globals = {'seed': self.seed}
+
+            # The results of those are also kept in process, where they are found
+            # without hashing, decompressing and decoding them again. Like those of
+            # the shared cache, they are only kept when a shared cache is given.
+            context_key = None
+            cached_globals = None
+            if self.capa_system.cache is not None and script_globals is not context:
+                context_key = (
+                    all_code, self.seed, tuple(python_path),
+                    hashlib.md5(zip_lib).hexdigest() if zip_lib is not None else None,
                 )
-            except Exception as err:
-                log.exception("Error while execing script code: " + all_code)
-                msg = "Error while executing script code: %s" % str(err).replace('<', '&lt;')
-                raise responsetypes.LoncapaProblemError(msg)
+                cached_globals = _lru_get(_script_contexts, _script_contexts_lock, context_key)
+
+            if cached_globals is not None:
+                # Responses can change the context, so every problem gets its own copy.
+                script_globals = deepcopy(cached_globals)
+            else:
+                try:
+                    safe_exec(
+                        all_code,
+                        script_globals,
+                        random_seed=self.seed,
+                        python_path=python_path,
+                        extra_files=extra_files,
+                        cache=self.capa_system.cache,
+                        slug=self.problem_id,
+                        unsafely=self.capa_system.can_execute_unsafe_code(),
+                    )
+                except Exception as err:
+                    log.exception("Error while execing script code: " + all_code)
+                    msg = "Error while executing script code: %s" % str(err).replace('<', '&lt;')
+                    raise responsetypes.LoncapaProblemError(msg)
+                if context_key is not None:
+                    _lru_set(
+                        _script_contexts, _script_contexts_lock, context_key,
+                        json_safe(script_globals), SCRIPT_CONTEXT_CACHE_SIZE
+                    )
+            context.update(script_globals)
 
         # Store code source in context, along with the Python path needed to run it correctly.
         context['script_code'] = all_code
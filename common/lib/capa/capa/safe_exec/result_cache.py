@@ -0,0 +1,144 @@
+"""
+A cache for the results of safe_exec.
+
+The results of running a problem's code only depend on the code, the globals
+it is run with and the random seed, so they can be shared between all the
+students (and all the processes) who run the same problem with the same seed.
+"""
+from collections import defaultdict, OrderedDict
+import json
+import logging
+import threading
+import zlib
+
+log = logging.getLogger(__name__)
+
+# By default, hold up to 64MB of (compressed) results in each process
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+
+def serialize_result(result):
+    """
+    Return the compact form of a safe_exec result, a pair of the exception
+    message (or None) and the json-safe globals dictionary.
+    """
+    return zlib.compress(json.dumps(result, separators=(',', ':')))
+
+
+def deserialize_result(data):
+    """
+    Return the safe_exec result serialized by `serialize_result`.
+    """
+    emsg, globals_dict = json.loads(zlib.decompress(data))
+    return emsg, globals_dict
+
+
+def empty_stats():
+    """
+    Return the counters of a slug which hasn't used the cache yet.
+    """
+    return {'hits': 0, 'misses': 0, 'exec_seconds': 0.0}
+
+
+class SafeExecResultCache(object):
+    """
+    A cache of safe_exec results, to pass as the `cache` argument of safe_exec.
+
+    Results are kept in an in-process LRU cache holding at most `max_bytes` of
+    serialized results and, if `backend` is given, in that shared cache too
+    (any object with the django cache `get`/`set` interface).
+
+    safe_exec reports each use of the cache to `record`, so that its hits,
+    misses and the time spent executing code on misses can be seen per problem
+    with `stats`.
+    """
+    def __init__(self, backend=None, max_bytes=DEFAULT_MAX_BYTES):
+        self.backend = backend
+        self.max_bytes = max_bytes
+
+        self._lock = threading.Lock()
+        # key -> serialized result, from least to most recently used
+        self._results = OrderedDict()
+        self.current_bytes = 0
+
+        # slug -> {'hits': int, 'misses': int, 'exec_seconds': float}
+        self._stats = defaultdict(empty_stats)
+
+    def get(self, key):
+        """
+        Return the result cached under `key`, or None.
+        """
+        with self._lock:
+            data = self._results.pop(key, None)
+            if data is not None:
+                # Re-insert it, to mark it as the most recently used.
+                self._results[key] = data
+
+        if data is None and self.backend is not None:
+            try:
+                data = self.backend.get(key)
+            except Exception:  # pylint: disable=broad-except
+                log.exception("Unable to read safe_exec result %s from the shared cache", key)
+                data = None
+            if data is not None:
+                self._store_locally(key, data)
+
+        if data is None:
+            return None
+        return deserialize_result(data)
+
+    def set(self, key, result):
+        """
+        Cache the safe_exec `result` under `key`.
+        """
+        data = serialize_result(result)
+        if self.backend is not None:
+            try:
+                self.backend.set(key, data)
+            except Exception:  # pylint: disable=broad-except
+                log.exception("Unable to write safe_exec result %s to the shared cache", key)
+        self._store_locally(key, data)
+
+    def _store_locally(self, key, data):
+        """
+        Keep `data` in process, evicting the least recently used results to stay under max_bytes.
+        """
+        if len(data) > self.max_bytes:
+            return
+
+        with self._lock:
+            previous = self._results.pop(key, None)
+            if previous is not None:
+                self.current_bytes -= len(previous)
+            self._results[key] = data
+            self.current_bytes += len(data)
+
+            while self.current_bytes > self.max_bytes:
+                __, evicted = self._results.popitem(last=False)
+                self.current_bytes -= len(evicted)
+
+    def record(self, slug, hit, exec_seconds=0.0):
+        """
+        Record a cache hit or miss for the code identified by `slug`, and the
+        time it took to execute the code on a miss.
+        """
+        with self._lock:
+            stats = self._stats[slug]
+            if hit:
+                stats['hits'] += 1
+            else:
+                stats['misses'] += 1
+                stats['exec_seconds'] += exec_seconds
+
+    def stats(self, slug=None):
+        """
+        Return the hit/miss counters of `slug`, or a dict of every slug's counters if no slug is given.
+        """
+        with self._lock:
+            if slug is not None:
+                return dict(self._stats.get(slug) or empty_stats())
+            return {name: dict(stats) for name, stats in self._stats.iteritems()}
+
+    def __len__(self):
+        with self._lock:
+            return len(self._results)
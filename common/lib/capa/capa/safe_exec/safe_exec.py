@@ -4,9 +4,12 @@ from codejail.safe_exec import safe_exec as codejail_safe_exec
 from codejail.safe_exec import not_safe_exec as codejail_not_safe_exec
 from codejail.safe_exec import json_safe, SafeExecException
 from . import lazymod
+from .sandbox_pool import SandboxPool
 from dogapi import dog_stats_api
 
 import hashlib
+import json
+import time
 
 # Establish the Python environment for Capa.
 # Capa assumes float-friendly division always.
@@ -47,6 +50,26 @@ for name, modname in ASSUMED_IMPORTS:
 LAZY_IMPORTS = "".join(LAZY_IMPORTS)
 
 
+# The pool of warm sandboxes used to run code, if one has been configured.
+SANDBOX_POOL = None
+
+
+def configure_sandbox_pool(size, **kwargs):
+    """
+    Run sandboxed code in a pool of at most `size` warm sandbox processes.
+
+    Code which needs extra files (like a course's python_lib.zip) is still run
+    in a fresh sandbox.  The keyword arguments are those of `SandboxPool`.
+    A size of 0 stops using a pool.
+    """
+    global SANDBOX_POOL  # pylint: disable=global-statement
+    if size:
+        kwargs.setdefault('preload_modules', [modname for __, modname in ASSUMED_IMPORTS])
+        SANDBOX_POOL = SandboxPool(size, **kwargs)
+    else:
+        SANDBOX_POOL = None
+
+
 def update_hash(hasher, obj):
     """
     Update a `hashlib` hasher with a nested object.
@@ -70,6 +93,31 @@ def update_hash(hasher, obj):
         hasher.update(repr(obj))
 
 
+def cache_key(code, safe_globals, random_seed):
+    """
+    Return the key under which the result of running `code` with the json-safe
+    globals `safe_globals` and `random_seed` is cached.
+
+    The globals are hashed through their canonical (sorted) JSON form, which
+    identifies them just as `update_hash` would, but much faster.
+    """
+    md5er = hashlib.md5()
+    md5er.update(repr(code))
+    md5er.update(json.dumps(safe_globals, sort_keys=True, separators=(',', ':')))
+    return "safe_exec.%r.%s" % (random_seed, md5er.hexdigest())
+
+
+def record_cache_use(cache, slug, hit, exec_seconds=0.0):
+    """
+    Report a hit or miss of the safe_exec cache, to datadog and to the cache
+    itself if it keeps statistics (like `SafeExecResultCache`).
+    """
+    dog_stats_api.increment('capa.safe_exec.cache', tags=['result:{}'.format('hit' if hit else 'miss')])
+    record = getattr(cache, 'record', None)
+    if record is not None:
+        record(slug, hit, exec_seconds)
+
+
 @dog_stats_api.timed('capa.safe_exec.time')
 def safe_exec(
     code,
@@ -99,7 +147,8 @@ def safe_exec(
 
     `cache` is an object with .get(key) and .set(key, value) methods.  It will be used
     to cache the execution, taking into account the code, the values of the globals,
-    and the random seed.
+    and the random seed.  If it also has a .record(slug, hit, exec_seconds) method,
+    that is called on every cache hit and miss.
 
     `slug` is an arbitrary string, a description that's meaningful to the
     caller, that will be used in log messages.
@@ -108,14 +157,11 @@ def safe_exec(
 
     """
     # Check the cache for a previous result.
-    if cache:
-        safe_globals = json_safe(globals_dict)
-        md5er = hashlib.md5()
-        md5er.update(repr(code))
-        update_hash(md5er, safe_globals)
-        key = "safe_exec.%r.%s" % (random_seed, md5er.hexdigest())
+    if cache is not None:
+        key = cache_key(code, json_safe(globals_dict), random_seed)
         cached = cache.get(key)
         if cached is not None:
+            record_cache_use(cache, slug, hit=True)
             # We have a cached result.  The result is a pair: the exception
             # message, if any, else None; and the resulting globals dictionary.
             emsg, cleaned_results = cached
@@ -130,10 +176,13 @@ def safe_exec(
     # Decide which code executor to use.
     if unsafely:
         exec_fn = codejail_not_safe_exec
+    elif SANDBOX_POOL is not None and SANDBOX_POOL.is_available() and not python_path and not extra_files:
+        exec_fn = SANDBOX_POOL.safe_exec
     else:
         exec_fn = codejail_safe_exec
 
     # Run the code!  Results are side effects in globals_dict.
+    start = time.time()
     try:
         exec_fn(
             code_prolog + LAZY_IMPORTS + code, globals_dict,
@@ -146,7 +195,8 @@ def safe_exec(
 
     # Put the result back in the cache.  This is complicated by the fact that
     # the globals dict might not be entirely serializable.
-    if cache:
+    if cache is not None:
+        record_cache_use(cache, slug, hit=False, exec_seconds=time.time() - start)
         cleaned_results = json_safe(globals_dict)
         cache.set(key, (emsg, cleaned_results))
 
@@ -0,0 +1,401 @@
+"""
+A pool of warm sandboxed Python processes for running problem code.
+
+codejail starts a new sandboxed interpreter for every execution, which then
+has to import numpy, scipy and the rest of the assumed imports before it can
+run any of the problem's code.  Most of the time spent checking a
+Python-graded problem goes there.
+
+Each worker of a `SandboxPool` is a sandboxed interpreter (started with the
+same command line, user and limits as codejail's) which imports those modules
+once, then forks a template process.  The template never handles a request:
+it only forks a child for each execution, so every execution starts from the
+same clean, warm state.  The child starts a session of its own and sets
+codejail's CPU and memory limits, and a limit of no further processes, before
+reading the code it runs; when an execution times out, its whole process
+group is killed.  Workers are replaced after a number of executions, and at
+most `size` of them run at once.
+"""
+import json
+import logging
+import os
+import resource
+import select
+import subprocess
+import threading
+import time
+
+from codejail import jail_code
+from codejail.safe_exec import json_safe, SafeExecException
+
+log = logging.getLogger(__name__)
+
+# The program each worker runs.  It reads one JSON request per line from
+# stdin, has the template fork a child to run it, and writes one JSON response
+# per line.  Code and results go between the worker and the child through
+# pipes, as a length line followed by that many bytes of JSON.
+WORKER_CODE = r"""
+import json, os, resource, select, signal, sys, time, traceback
+
+def json_safe(d):
+    ok_types = (type(None), int, long, float, str, unicode, list, tuple, dict)
+    safe = {}
+    for key, value in d.iteritems():
+        if key == "__builtins__" or not isinstance(value, ok_types):
+            continue
+        try:
+            safe[key] = json.loads(json.dumps(value))
+        except Exception:
+            continue
+    return safe
+
+def read_line(fd):
+    # One byte at a time, so that nothing after the line is read
+    chars = []
+    while True:
+        char = os.read(fd, 1)
+        if not char or char == "\n":
+            return "".join(chars)
+        chars.append(char)
+
+def read_all(fd):
+    chunks = []
+    while select.select([fd], [], [], 0)[0]:
+        chunk = os.read(fd, 65536)
+        if not chunk:
+            break
+        chunks.append(chunk)
+    return "".join(chunks)
+
+def kill_group(pgid):
+    try:
+        os.killpg(pgid, signal.SIGKILL)
+    except OSError:
+        pass
+
+def run(config, ready_fd, request_fd, result_fd):
+    # Nothing the code starts outlives the execution: it can't start
+    # processes, and its process group is killed when the execution ends.
+    os.setsid()
+    resource.setrlimit(resource.RLIMIT_NPROC, (0, 0))
+    if config["cpu"]:
+        resource.setrlimit(resource.RLIMIT_CPU, (config["cpu"], config["cpu"]))
+    if config["vmem"]:
+        resource.setrlimit(resource.RLIMIT_AS, (config["vmem"], config["vmem"]))
+    resource.setrlimit(resource.RLIMIT_FSIZE, (0, 0))
+    os.write(ready_fd, "x")
+    os.close(ready_fd)
+
+    length = int(read_line(request_fd))
+    chunks = []
+    while length > 0:
+        chunk = os.read(request_fd, length)
+        if not chunk:
+            return
+        chunks.append(chunk)
+        length -= len(chunk)
+    request = json.loads("".join(chunks))
+
+    globals_dict = request["globals"]
+    try:
+        exec compile(request["code"], "jailed_code", "exec") in globals_dict
+    except Exception:
+        response = {"error": traceback.format_exc(), "globals": {}}
+    else:
+        response = {"error": None, "globals": json_safe(globals_dict)}
+    message = json.dumps(response)
+    message = "%d\n%s" % (len(message), message)
+    while message:
+        message = message[os.write(result_fd, message):]
+
+def template(config, control_fd, pids_fd, request_fd, result_fd):
+    # For each byte read from control_fd, fork a child to run an execution,
+    # and report its process id once it is limited (negated if it died before
+    # that), then "done" once it has exited.
+    while os.read(control_fd, 1):
+        ready_r, ready_w = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            os.close(ready_r)
+            os.close(control_fd)
+            os.close(pids_fd)
+            try:
+                run(config, ready_w, request_fd, result_fd)
+            finally:
+                os._exit(0)
+        os.close(ready_w)
+        ready = os.read(ready_r, 1)
+        os.close(ready_r)
+        os.write(pids_fd, "%d\n" % (pid if ready else -pid))
+        os.waitpid(pid, 0)
+        kill_group(pid)
+        os.write(pids_fd, "done\n")
+
+def execute(request, control_fd, pids_fd, request_fd, request_w, result_fd):
+    deadline = time.time() + request["timeout"]
+    os.write(control_fd, "x")
+    pid = int(read_line(pids_fd))
+
+    message = json.dumps({"code": request["code"], "globals": request["globals"]})
+    message = "%d\n%s" % (len(message), message)
+    if pid < 0:
+        message = ""
+    chunks = []
+    done = timed_out = False
+    while not done:
+        remaining = deadline - time.time()
+        if remaining <= 0:
+            timed_out = True
+            break
+        writing = [request_w] if message else []
+        readable, writable = select.select([result_fd, pids_fd], writing, [], remaining)[:2]
+        if writable:
+            # No more than PIPE_BUF bytes, so that the write doesn't block
+            message = message[os.write(request_w, message[:4096]):]
+        if result_fd in readable:
+            chunks.append(os.read(result_fd, 65536))
+        if pids_fd in readable:
+            done = True
+
+    if not done:
+        # The child hasn't been reaped, so its process group can't be a new one
+        kill_group(abs(pid))
+    read_line(pids_fd)
+    chunks.append(read_all(result_fd))
+    read_all(request_fd)
+
+    if timed_out:
+        return {"error": "Timed out after %s seconds" % request["timeout"], "globals": {}}
+    length, __, body = "".join(chunks).partition("\n")
+    if not length.isdigit() or int(length) != len(body):
+        return {"error": "The sandboxed process died", "globals": {}}
+    return json.loads(body)
+
+def main():
+    config = json.loads(sys.argv[1])
+    requests = os.fdopen(os.dup(0), "r")
+    responses = os.fdopen(os.dup(1), "w")
+    devnull = os.open(os.devnull, os.O_RDWR)
+    for fd in (0, 1):
+        os.dup2(devnull, fd)
+
+    for name in config["preload"]:
+        try:
+            __import__(name)
+        except Exception:
+            pass
+
+    control_r, control_w = os.pipe()
+    pids_r, pids_w = os.pipe()
+    request_r, request_w = os.pipe()
+    result_r, result_w = os.pipe()
+    if os.fork() == 0:
+        requests.close()
+        responses.close()
+        for fd in (control_w, pids_r, request_w, result_r):
+            os.close(fd)
+        try:
+            template(config, control_r, pids_w, request_r, result_w)
+        finally:
+            os._exit(0)
+    for fd in (control_r, pids_w, result_w):
+        os.close(fd)
+
+    while True:
+        line = requests.readline()
+        if not line:
+            break
+        request = json.loads(line)
+        response = execute(request, control_w, pids_r, request_r, request_w, result_r)
+        response["nonce"] = request["nonce"]
+        responses.write(json.dumps(response) + "\n")
+        responses.flush()
+
+main()
+"""
+
+
+class SandboxWorker(object):
+    """
+    One warm sandboxed interpreter, and the number of executions it has run.
+    """
+    def __init__(self, preload_modules):
+        command = jail_code.COMMANDS['python']
+        cmd = []
+        if command['user']:
+            cmd.extend(['sudo', '-u', command['user']])
+        cmd.extend(command['cmdline_start'])
+        config = {
+            'preload': preload_modules,
+            'cpu': jail_code.LIMITS.get('CPU') or 0,
+            'vmem': jail_code.LIMITS.get('VMEM') or 0,
+        }
+        cmd.extend(['-c', WORKER_CODE, json.dumps(config)])
+
+        self.process = subprocess.Popen(
+            cmd,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            preexec_fn=set_worker_limits,
+            env={},
+            cwd='/',
+            close_fds=True,
+        )
+        self.executions = 0
+
+    def execute(self, code, globals_dict, timeout):
+        """
+        Run `code` with `globals_dict`, and return the response of the worker.
+
+        Raises SafeExecException if the worker doesn't answer properly in time;
+        the worker is then unusable.
+        """
+        nonce = os.urandom(16).encode('hex')
+        request = {'code': code, 'globals': globals_dict, 'timeout': timeout, 'nonce': nonce}
+        self.executions += 1
+        try:
+            self.process.stdin.write(json.dumps(request) + '\n')
+            self.process.stdin.flush()
+            # Give the worker a little longer than the execution's own timeout
+            ready = select.select([self.process.stdout], [], [], timeout + 1)[0]
+            if not ready:
+                raise SafeExecException("Couldn't execute jailed code: the sandbox didn't respond")
+            response = json.loads(self.process.stdout.readline())
+        except (IOError, OSError, ValueError):
+            raise SafeExecException("Couldn't execute jailed code: the sandbox failed")
+
+        if response.get('nonce') != nonce:
+            raise SafeExecException("Couldn't execute jailed code: the sandbox answered out of turn")
+        return response
+
+    def is_alive(self):
+        """
+        Return whether the worker process is still running.
+        """
+        return self.process.poll() is None
+
+    def stop(self):
+        """
+        Stop the worker process.
+        """
+        try:
+            self.process.stdin.close()
+            self.process.terminate()
+            self.process.wait()
+        except (IOError, OSError):
+            pass
+
+
+def set_worker_limits():
+    """
+    Apply codejail's limits to a worker, in a session of its own.
+
+    The CPU limit and the limit of no further processes are set by each
+    execution's child instead: the worker runs for many executions, and has
+    to fork.
+    """
+    os.setsid()
+    # No writing files, and no core dumps.
+    resource.setrlimit(resource.RLIMIT_FSIZE, (0, 0))
+    resource.setrlimit(resource.RLIMIT_CORE, (0, 0))
+    vmem = jail_code.LIMITS.get('VMEM')
+    if vmem:
+        resource.setrlimit(resource.RLIMIT_AS, (vmem, vmem))
+
+
+class SandboxPool(object):
+    """
+    A bounded pool of warm sandbox workers, with the interface of codejail's safe_exec.
+
+    Arguments:
+        size (int): the most workers which run at once.
+        max_executions (int): how many executions a worker runs before it is replaced.
+        timeout (float): the wall clock seconds an execution may take. Defaults to
+            codejail's REALTIME limit.
+        max_waiting (int): how many executions may wait for a free worker. Any more are
+            refused with a SafeExecException rather than queued.
+        preload_modules (list): the modules workers import when they start.
+    """
+    def __init__(self, size, max_executions=100, timeout=None, max_waiting=10, preload_modules=()):
+        self.size = size
+        self.max_executions = max_executions
+        self.timeout = timeout
+        self.max_waiting = max_waiting
+        self.preload_modules = list(preload_modules)
+
+        self._lock = threading.Lock()
+        self._idle = []
+        self._slots = threading.Semaphore(size)
+        self._waiting = 0
+
+    @classmethod
+    def is_available(cls):
+        """
+        Return whether codejail is configured to run sandboxed Python, which the workers need.
+        """
+        return jail_code.is_configured('python')
+
+    def _acquire(self):
+        """
+        Return an idle worker, starting one if need be, waiting for one to be free if
+        `size` workers are busy.
+        """
+        with self._lock:
+            if self._waiting >= self.max_waiting:
+                raise SafeExecException("Couldn't execute jailed code: too many executions are waiting")
+            self._waiting += 1
+        try:
+            self._slots.acquire()
+        finally:
+            with self._lock:
+                self._waiting -= 1
+
+        with self._lock:
+            while self._idle:
+                worker = self._idle.pop()
+                if worker.is_alive():
+                    return worker
+                worker.stop()
+        try:
+            return SandboxWorker(self.preload_modules)
+        except Exception:
+            self._slots.release()
+            raise
+
+    def _release(self, worker, healthy):
+        """
+        Return `worker` to the pool, or stop it if it is unhealthy or has run enough executions.
+        """
+        if healthy and worker.executions < self.max_executions:
+            with self._lock:
+                self._idle.append(worker)
+        else:
+            worker.stop()
+        self._slots.release()
+
+    def safe_exec(self, code, globals_dict, python_path=None, extra_files=None, slug=None):
+        """
+        Run `code` in a sandbox worker, like `codejail.safe_exec.safe_exec`.
+
+        Code needing `python_path` or `extra_files` must be run by codejail
+        itself, which sets up the files in a fresh sandbox directory.
+        """
+        assert not python_path and not extra_files, "Pooled sandboxes can't add files"
+
+        timeout = self.timeout or jail_code.LIMITS.get('REALTIME') or 3
+
+        safe_globals = json_safe(globals_dict)
+        worker = self._acquire()
+        healthy = False
+        start = time.time()
+        try:
+            response = worker.execute(code, safe_globals, timeout)
+            healthy = True
+        finally:
+            self._release(worker, healthy)
+            log.debug("Pooled execution of %s took %.3fs", slug, time.time() - start)
+
+        if response['error']:
+            raise SafeExecException("Couldn't execute jailed code: {}".format(response['error']))
+        globals_dict.update(response['globals'])
+
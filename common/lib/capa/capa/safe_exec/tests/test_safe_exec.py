@@ -7,9 +7,11 @@ import random
 import textwrap
 import unittest
 
+from mock import Mock
 from nose.plugins.skip import SkipTest
 
-from capa.safe_exec import safe_exec, update_hash
+from capa.safe_exec import safe_exec, update_hash, configure_sandbox_pool, SafeExecResultCache
+from capa.safe_exec.result_cache import serialize_result
 from codejail.safe_exec import SafeExecException
 from codejail.jail_code import is_configured
 
@@ -90,6 +92,54 @@ class TestSafeOrNot(unittest.TestCase):
         self.assertEqual(g['files'], os.listdir('/'))
 
 
+class TestSandboxPool(unittest.TestCase):
+    """Test running code in a pool of warm sandboxes."""
+
+    def setUp(self):
+        super(TestSandboxPool, self).setUp()
+        # The pool runs the sandboxed Python that CodeJail is configured with.
+        if not is_configured("python"):
+            raise SkipTest
+        configure_sandbox_pool(1, max_executions=2)
+        self.addCleanup(configure_sandbox_pool, 0)
+
+    def test_set_values(self):
+        g = {'b': 2}
+        safe_exec("a = b * int(math.pi)", g)
+        self.assertEqual(g['a'], 6)
+
+    def test_executions_are_isolated(self):
+        g = {}
+        safe_exec("import math; math.pi = 3; a = math.pi", g)
+        self.assertEqual(g['a'], 3)
+        safe_exec("import math; a = math.pi", g)
+        self.assertAlmostEqual(g['a'], 3.14159, places=4)
+
+    def test_raising_exceptions(self):
+        for __ in range(3):
+            with self.assertRaises(SafeExecException) as cm:
+                safe_exec("1/0", {})
+            self.assertIn("ZeroDivisionError", cm.exception.message)
+
+    def test_cant_do_something_forbidden(self):
+        with self.assertRaises(SafeExecException) as cm:
+            safe_exec("import os; files = os.listdir('/')", {})
+        self.assertIn("OSError", cm.exception.message)
+
+    def test_cant_start_processes(self):
+        with self.assertRaises(SafeExecException) as cm:
+            safe_exec("import os; os.fork()", {})
+        self.assertIn("OSError", cm.exception.message)
+
+    def test_runaway_code_stopped(self):
+        with self.assertRaises(SafeExecException):
+            safe_exec("while True: pass", {})
+        # The pool still works
+        g = {}
+        safe_exec("a = 17", g)
+        self.assertEqual(g['a'], 17)
+
+
 class DictCache(object):
     """A cache implementation over a simple dict, for testing."""
 
@@ -177,6 +227,64 @@ class TestSafeExecCaching(unittest.TestCase):
                 self.fail("Tried executing code with non-ASCII unicode: {0}".format(code))
 
 
+class TestSafeExecResultCache(unittest.TestCase):
+    """Test SafeExecResultCache, and its use by safe_exec."""
+
+    def test_results_cached(self):
+        backend = {}
+        cache = SafeExecResultCache(DictCache(backend))
+        g = {}
+        safe_exec("a = int(math.pi)", g, cache=cache, slug='pi')
+        self.assertEqual(g['a'], 3)
+        self.assertEqual(len(backend), 1)
+
+        # Fiddle with the shared cache, then try it again in another process.
+        backend[backend.keys()[0]] = serialize_result((None, {'a': 17}))
+        other_cache = SafeExecResultCache(DictCache(backend))
+        g = {}
+        safe_exec("a = int(math.pi)", g, cache=other_cache, slug='pi')
+        self.assertEqual(g['a'], 17)
+
+        self.assertEqual(cache.stats('pi')['misses'], 1)
+        self.assertEqual(other_cache.stats('pi')['hits'], 1)
+        self.assertEqual(other_cache.stats('pi')['misses'], 0)
+
+    def test_exceptions_cached(self):
+        cache = SafeExecResultCache()
+        for __ in range(2):
+            with self.assertRaisesRegexp(SafeExecException, "ZeroDivisionError"):
+                safe_exec("1/0", {}, cache=cache, slug='zero')
+        self.assertEqual(cache.stats('zero')['hits'], 1)
+        self.assertEqual(cache.stats('zero')['misses'], 1)
+
+    def test_empty_cache_used(self):
+        # An empty cache has no length, but is still a cache
+        cache = SafeExecResultCache()
+        self.assertEqual(len(cache), 0)
+        safe_exec("a = 1", {}, cache=cache, slug='one')
+        self.assertEqual(len(cache), 1)
+        self.assertEqual(cache.stats('one')['misses'], 1)
+
+    def test_lru_eviction(self):
+        cache = SafeExecResultCache(max_bytes=60)
+        cache.set('first', (None, {'a': 1}))
+        cache.set('second', (None, {'b': 2}))
+        # Use the first, so the second is evicted next
+        self.assertEqual(cache.get('first'), (None, {'a': 1}))
+        cache.set('third', (None, {'c': 3}))
+        self.assertLessEqual(cache.current_bytes, 60)
+        self.assertIsNone(cache.get('second'))
+        self.assertEqual(cache.get('first'), (None, {'a': 1}))
+
+    def test_broken_backend(self):
+        backend = Mock()
+        backend.get.side_effect = Exception
+        backend.set.side_effect = Exception
+        cache = SafeExecResultCache(backend)
+        cache.set('key', ("oops", {}))
+        self.assertEqual(cache.get('key'), ("oops", {}))
+
+
 class TestUpdateHash(unittest.TestCase):
     """Test the safe_exec.update_hash function to be sure it canonicalizes properly."""
 
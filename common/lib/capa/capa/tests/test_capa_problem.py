@@ -0,0 +1,94 @@
+"""
+Tests of the caches which LoncapaProblem is built from.
+"""
+import textwrap
+import unittest
+
+import mock
+
+from capa import capa_problem
+from capa.capa_problem import parse_problem_text
+from capa.safe_exec import safe_exec, SafeExecResultCache
+from xmodule.tests.helpers import DictCache
+from . import test_capa_system, new_loncapa_problem
+
+
+class ProblemCacheTest(unittest.TestCase):
+    """
+    Tests of the parsed problem and script context caches.
+    """
+    def setUp(self):
+        super(ProblemCacheTest, self).setUp()
+        capa_problem._script_contexts.clear()  # pylint: disable=protected-access
+
+    def test_parsed_trees_not_shared(self):
+        xml_str = "<problem><startouttext/>Some text<endouttext/></problem>"
+        first_text, first_tree = parse_problem_text(xml_str)
+        second_text, second_tree = parse_problem_text(xml_str)
+
+        self.assertEqual(first_text, "<problem><text>Some text</text></problem>")
+        self.assertEqual(first_text, second_text)
+        self.assertIsNot(first_tree, second_tree)
+
+        # Changing a problem's tree doesn't change those of the next problems
+        first_tree.set('changed', 'yes')
+        self.assertIsNone(parse_problem_text(xml_str)[1].get('changed'))
+
+    def test_script_context_cached_per_seed(self):
+        xml_str = textwrap.dedent("""
+            <problem>
+                <script type="loncapa/python">
+                    import random
+                    values = [random.randint(0, 1000) for _ in range(3)]
+                </script>
+            </problem>
+        """)
+        capa_system = test_capa_system()
+        capa_system.cache = DictCache()
+
+        with mock.patch('capa.capa_problem.safe_exec', side_effect=safe_exec) as mock_safe_exec:
+            first = new_loncapa_problem(xml_str, capa_system=capa_system, seed=1)
+            second = new_loncapa_problem(xml_str, capa_system=capa_system, seed=1)
+            self.assertEqual(mock_safe_exec.call_count, 1)
+            self.assertEqual(first.context['values'], second.context['values'])
+
+            # Each problem has its own copy of the context
+            first.context['values'].append(-1)
+            self.assertNotEqual(first.context['values'], second.context['values'])
+
+            # Another seed runs the script again
+            new_loncapa_problem(xml_str, capa_system=capa_system, seed=2)
+            self.assertEqual(mock_safe_exec.call_count, 2)
+
+    def test_context_cached_with_empty_result_cache(self):
+        # An empty SafeExecResultCache has no length, but is still a cache
+        xml_str = textwrap.dedent("""
+            <problem>
+                <script type="loncapa/python">
+                    value = 17
+                </script>
+            </problem>
+        """)
+        capa_system = test_capa_system()
+        capa_system.cache = SafeExecResultCache(max_bytes=0)
+
+        with mock.patch('capa.capa_problem.safe_exec', side_effect=safe_exec) as mock_safe_exec:
+            new_loncapa_problem(xml_str, capa_system=capa_system, seed=1)
+            new_loncapa_problem(xml_str, capa_system=capa_system, seed=1)
+            self.assertEqual(mock_safe_exec.call_count, 1)
+
+    def test_student_scripts_not_cached(self):
+        xml_str = textwrap.dedent("""
+            <problem>
+                <script type="loncapa/python">
+                    greeting = "Hello " + anonymous_student_id
+                </script>
+            </problem>
+        """)
+        capa_system = test_capa_system()
+        capa_system.cache = DictCache()
+
+        with mock.patch('capa.capa_problem.safe_exec', side_effect=safe_exec) as mock_safe_exec:
+            new_loncapa_problem(xml_str, capa_system=capa_system, seed=3)
+            new_loncapa_problem(xml_str, capa_system=capa_system, seed=3)
+            self.assertEqual(mock_safe_exec.call_count, 2)
@@ -3,7 +3,7 @@ import logging
 from lxml import etree
 from pkg_resources import resource_string
 
-from xmodule.x_module import XModule
+from xmodule.x_module import XModule, STUDENT_VIEW
 from xmodule.raw_module import RawDescriptor
 from xblock.fields import Scope, String
 import textwrap
@@ -157,6 +157,12 @@ class AnnotatableModule(AnnotatableFields, XModule):
 
         return self.system.render_template('annotatable.html', context)
 
+    def has_user_independent_view(self, view_name):
+        """
+        The student view only renders the annotated content, which is the same for everyone.
+        """
+        return view_name == STUDENT_VIEW
+
 
 class AnnotatableDescriptor(AnnotatableFields, RawDescriptor):
     module_class = AnnotatableModule
@@ -23,6 +23,7 @@ from capa.responsetypes import StudentInputError, \
 from capa.util import convert_files_to_filenames
 from .progress import Progress
 from xmodule.exceptions import NotFoundError
+from xmodule import profiling
 from xblock.fields import Scope, String, Boolean, Dict, Integer, Float
 from .fields import Timedelta, Date
 from django.utils.timezone import UTC
@@ -289,6 +290,7 @@ class CapaMixin(CapaFields):
             # number of possibilities, cap the number of different random seeds.
             self.seed %= MAX_RANDOMIZATION_BINS
 
+    @profiling.profiled_function('capa.new_lcp')
     def new_lcp(self, state, text=None):
         """
         Generate a new Loncapa Problem
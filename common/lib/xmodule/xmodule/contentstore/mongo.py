@@ -8,7 +8,7 @@ import logging
 
 from .content import StaticContent, ContentStore, StaticContentStream
 from xmodule.exceptions import NotFoundError
-from fs.osfs import OSFS
+from fs.path import pathjoin
 import os
 import json
 from bson.son import SON
@@ -102,7 +102,8 @@ class MongoContentStore(ContentStore):
                     location, fp.displayname, fp.content_type, fp, last_modified_at=fp.uploadDate,
                     thumbnail_location=thumbnail_location,
                     import_path=getattr(fp, 'import_path', None),
-                    length=fp.length, locked=getattr(fp, 'locked', False)
+                    length=fp.length, locked=getattr(fp, 'locked', False),
+                    content_digest=getattr(fp, 'md5', None)
                 )
             else:
                 with self.fs.get(content_id) as fp:
@@ -116,7 +117,8 @@ class MongoContentStore(ContentStore):
                         location, fp.displayname, fp.content_type, fp.read(), last_modified_at=fp.uploadDate,
                         thumbnail_location=thumbnail_location,
                         import_path=getattr(fp, 'import_path', None),
-                        length=fp.length, locked=getattr(fp, 'locked', False)
+                        length=fp.length, locked=getattr(fp, 'locked', False),
+                        content_digest=getattr(fp, 'md5', None)
                     )
         except NoFile:
             if throw_on_not_found:
@@ -124,50 +126,55 @@ class MongoContentStore(ContentStore):
             else:
                 return None
 
-    def export(self, location, output_directory):
-        content = self.find(location)
-
-        if content.import_path is not None:
-            output_directory = output_directory + '/' + os.path.dirname(content.import_path)
-
-        if not os.path.exists(output_directory):
-            os.makedirs(output_directory)
+    def export_to_fs(self, location, output_fs):
+        """
+        Export the asset at location into output_fs (a pyfilesystem FS), in the directory
+        of its import path. The asset is read from GridFS chunk by chunk as it is written,
+        so it is never held in memory.
+        """
+        content_id, __ = self.asset_db_key(location)
+        try:
+            fp = self.fs.get(content_id)
+        except NoFile:
+            raise NotFoundError(content_id)
 
-        disk_fs = OSFS(output_directory)
+        with fp:
+            import_path = getattr(fp, 'import_path', None)
+            directory = os.path.dirname(import_path) if import_path is not None else ''
+            if directory:
+                output_fs.makedir(directory, recursive=True, allow_recreate=True)
+            output_fs.setcontents(pathjoin(directory, fp.displayname), fp)
 
-        with disk_fs.open(content.name, 'wb') as asset_file:
-            asset_file.write(content.data)
+    @staticmethod
+    def _get_assets_policy(assets):
+        """
+        Return the policy of the given assets (as returned by get_all_content_for_course),
+        which is exported with them to keep the attributes their files don't have.
+        """
+        policy = {}
+        for asset in assets:
+            for attr, value in asset.iteritems():
+                if attr not in ['_id', 'md5', 'uploadDate', 'length', 'chunkSize', 'asset_key']:
+                    policy.setdefault(asset['asset_key'].name, {})[attr] = value
+        return policy
 
-    def export_all_for_course(self, course_key, output_directory, assets_policy_file):
+    def export_all_for_course_to_fs(self, course_key, static_fs, policies_fs):
         """
-        Export all of this course's assets to the output_directory. Export all of the assets'
-        attributes to the policy file.
+        Export all of this course's assets into static_fs, streaming each one from GridFS,
+        and all of the assets' attributes into the assets.json file of policies_fs.
 
         Args:
             course_key (CourseKey): the :class:`CourseKey` identifying the course
-            output_directory: the directory under which to put all the asset files
-            assets_policy_file: the filename for the policy file which should be in the same
-                directory as the other policy files.
+            static_fs: the pyfilesystem FS under which to put all the asset files
+            policies_fs: the pyfilesystem FS of the course's other policy files
         """
-        policy = {}
         assets, __ = self.get_all_content_for_course(course_key)
 
         for asset in assets:
-            # TODO: On 6/19/14, I had to put a try/except around this
-            # to export a course. The course failed on JSON files in
-            # the /static/ directory placed in it with an import.
-            #
-            # If this hasn't been looked at in a while, remove this comment.
-            #
-            # When debugging course exports, this might be a good place
-            # to look. -- pmitros
-            self.export(asset['asset_key'], output_directory)
-            for attr, value in asset.iteritems():
-                if attr not in ['_id', 'md5', 'uploadDate', 'length', 'chunkSize', 'asset_key']:
-                    policy.setdefault(asset['asset_key'].name, {})[attr] = value
+            self.export_to_fs(asset['asset_key'], static_fs)
 
-        with open(assets_policy_file, 'w') as f:
-            json.dump(policy, f, sort_keys=True, indent=4)
+        with policies_fs.open('assets.json', 'w') as f:
+            json.dump(self._get_assets_policy(assets), f, sort_keys=True, indent=4)
 
     def get_all_content_thumbnails_for_course(self, course_key):
         return self._get_all_content_for_course(course_key, get_thumbnails=True)[0]
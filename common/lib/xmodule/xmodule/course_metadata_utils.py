@@ -0,0 +1,127 @@
+"""
+Functions computing information about a course from its metadata.
+
+CourseDescriptor uses them, and so do the summaries of courses which are kept
+outside of the modulestore (such as CourseOverview), so that both give the
+same answers without the summaries having to load the course.
+"""
+from datetime import datetime
+from math import exp
+
+import dateutil.parser
+from django.utils.timezone import UTC
+
+from .fields import Date
+
+DEFAULT_START_DATE = datetime(2030, 1, 1, tzinfo=UTC())
+
+
+def has_course_started(start_date):
+    """
+    Returns whether the course with the given start date has started.
+    """
+    return datetime.now(UTC()) > start_date
+
+
+def has_course_ended(end_date):
+    """
+    Returns whether the course with the given end date has ended. A course
+    without an end date never ends.
+    """
+    return datetime.now(UTC()) > end_date if end_date is not None else False
+
+
+def course_start_date_is_default(start, advertised_start):
+    """
+    Returns whether the start date of a course is still the default one, i.e.
+    start hasn't been modified and advertised_start hasn't been set.
+    """
+    return advertised_start is None and start == DEFAULT_START_DATE
+
+
+def course_sorting_dates(start, advertised_start, announcement):
+    """
+    Returns the announcement date, the (advertised, if it is a date) start date
+    and the current date, which are used to tell how new a course is.
+    """
+    try:
+        start = dateutil.parser.parse(advertised_start)
+        if start.tzinfo is None:
+            start = start.replace(tzinfo=UTC())
+    except (ValueError, AttributeError):
+        pass
+
+    return announcement, start, datetime.now(UTC())
+
+
+def course_sorting_score(start, advertised_start, announcement):
+    """
+    Returns a number that can be used to sort courses according to how "new"
+    they are, the lowest first. Courses which have an announcement date come
+    before the ones that don't, and recent dates before older ones.
+    """
+    announcement, start, now = course_sorting_dates(start, advertised_start, announcement)
+    scale = 300.0  # about a year
+    if announcement:
+        days = (now - announcement).days
+        score = -exp(-days / scale)
+    else:
+        days = (now - start).days
+        score = exp(days / scale)
+    return score
+
+
+def _add_timezone_string(date_time):
+    """
+    Adds 'UTC' string to the end of start/end date and time texts.
+    """
+    return date_time + u" UTC"
+
+
+def course_start_datetime_text(start_date, advertised_start, format_string, ugettext, strftime):
+    """
+    Returns the text of a course's start date and time in UTC, preferring
+    advertised_start to start_date.
+
+    ugettext and strftime are those of the i18n service to translate and
+    format the text with.
+    """
+    def try_parse_iso_8601(text):
+        try:
+            result = Date().from_json(text)
+            if result is None:
+                result = text.title()
+            else:
+                result = strftime(result, format_string)
+                if format_string == "DATE_TIME":
+                    result = _add_timezone_string(result)
+        except ValueError:
+            result = text.title()
+
+        return result
+
+    if isinstance(advertised_start, basestring):
+        return try_parse_iso_8601(advertised_start)
+    elif course_start_date_is_default(start_date, advertised_start):
+        # Translators: TBD stands for 'To Be Determined' and is used when a course
+        # does not yet have an announced start date.
+        return ugettext('TBD')
+    else:
+        when = advertised_start or start_date
+
+        if format_string == "DATE_TIME":
+            return _add_timezone_string(strftime(when, format_string))
+
+        return strftime(when, format_string)
+
+
+def course_end_datetime_text(end_date, format_string, strftime):
+    """
+    Returns the text of a course's end date or date and time, or an empty
+    string if the course has no end date.
+    """
+    if end_date is None:
+        return ''
+    else:
+        date_time = strftime(end_date, format_string)
+        return date_time if format_string == "SHORT_DATE" else _add_timezone_string(date_time)
@@ -16,7 +16,7 @@ from xmodule.editing_module import EditingDescriptor
 from xmodule.edxnotes_utils import edxnotes
 from xmodule.html_checker import check_html
 from xmodule.stringify import stringify_children
-from xmodule.x_module import XModule, DEPRECATION_VSCOMPAT_EVENT
+from xmodule.x_module import XModule, DEPRECATION_VSCOMPAT_EVENT, STUDENT_VIEW
 from xmodule.xml_module import XmlDescriptor, name_to_pathname
 from xblock.core import XBlock
 from xblock.fields import Scope, String, Boolean, List
@@ -78,6 +78,12 @@ class HtmlModuleMixin(HtmlFields, XModule):
             return self.data.replace("%%USER_ID%%", self.system.anonymous_student_id)
         return self.data
 
+    def has_user_independent_view(self, view_name):
+        """
+        The student view is the same for everyone unless it shows the student's anonymous id.
+        """
+        return view_name == STUDENT_VIEW and "%%USER_ID%%" not in self.data
+
 
 @edxnotes
 class HtmlModule(HtmlModuleMixin):
@@ -22,7 +22,7 @@ from abc import ABCMeta, abstractmethod
 from contracts import contract, new_contract
 from xblock.plugin import default_select
 
-from .exceptions import InvalidLocationError, InsufficientSpecificationError
+from .exceptions import InvalidLocationError, InsufficientSpecificationError, ItemNotFoundError
 from xmodule.errortracker import make_error_tracker
 from xmodule.assetstore import AssetMetadata
 from opaque_keys.edx.keys import CourseKey, UsageKey, AssetKey
@@ -872,6 +872,14 @@ class ModuleStoreRead(ModuleStoreAssetBase):
         '''
         pass
 
+    @abstractmethod
+    def get_courses_by_keys(self, course_keys, depth=0, **kwargs):
+        '''
+        Look for several courses by their ids (:class:`CourseKey`) at once.
+        Returns a dict mapping each of the ids to its course descriptor, or to None if not found.
+        '''
+        pass
+
     @abstractmethod
     def has_course(self, course_id, ignore_case=False, **kwargs):
         '''
@@ -1139,6 +1147,20 @@ class ModuleStoreReadBase(BulkOperationsMixin, ModuleStoreRead):
                 return course
         return None
 
+    def get_courses_by_keys(self, course_keys, depth=0, **kwargs):
+        """
+        See ModuleStoreRead.get_courses_by_keys
+
+        Default impl--one get_course per key
+        """
+        courses = {}
+        for course_key in course_keys:
+            try:
+                courses[course_key] = self.get_course(course_key, depth=depth, **kwargs)
+            except ItemNotFoundError:
+                courses[course_key] = None
+        return courses
+
     def has_course(self, course_id, ignore_case=False, **kwargs):
         """
         Returns the course_id of the course if it was found, else None
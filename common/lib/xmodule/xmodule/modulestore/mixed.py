@@ -6,6 +6,7 @@ In this way, courses can be served up both - say - XMLModuleStore or MongoModule
 """
 
 import logging
+from collections import defaultdict
 from contextlib import contextmanager
 import itertools
 import functools
@@ -328,6 +329,47 @@ class MixedModuleStore(ModuleStoreDraftAndPublished, ModuleStoreWriteBase):
         except ItemNotFoundError:
             return None
 
+    @strip_key
+    def get_courses_by_keys(self, course_keys, depth=0, **kwargs):
+        """
+        returns a dict mapping each of the course_keys to its course module, or to None if
+        no such course exists. Each modulestore is asked for all of its courses at once.
+
+        :param course_keys: a list of CourseKeys
+        """
+        courses = {}
+        keys_by_store = defaultdict(list)
+        unmapped_keys = []
+        for course_key in course_keys:
+            assert isinstance(course_key, CourseKey)
+            store = self.mappings.get(self._clean_locator_for_mapping(course_key))
+            if store is None:
+                unmapped_keys.append(course_key)
+            else:
+                keys_by_store[store].append(course_key)
+
+        for store, store_keys in keys_by_store.iteritems():
+            courses.update(store.get_courses_by_keys(store_keys, depth=depth, **kwargs))
+
+        # Rather than asking each store whether it has each course, as _get_modulestore_for_courselike does,
+        # ask each store in turn for the courses which the previous ones didn't have
+        for store in self.modulestores:
+            if not unmapped_keys:
+                break
+            found = store.get_courses_by_keys(unmapped_keys, depth=depth, **kwargs)
+            missing_keys = []
+            for course_key in unmapped_keys:
+                course = found.get(course_key)
+                if course is None:
+                    missing_keys.append(course_key)
+                else:
+                    self.mappings[self._clean_locator_for_mapping(course_key)] = store
+                    courses[course_key] = course
+            unmapped_keys = missing_keys
+
+        courses.update(dict.fromkeys(unmapped_keys))
+        return courses
+
     @strip_key
     @contract(library_key='LibraryLocator')
     def get_library(self, library_key, depth=0, **kwargs):
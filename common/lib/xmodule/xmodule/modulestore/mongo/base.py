@@ -15,8 +15,9 @@ structure:
 import pymongo
 import sys
 import logging
-import copy
 import re
+import time
+from contextlib import contextmanager
 from uuid import uuid4
 
 from bson.son import SON
@@ -43,6 +44,7 @@ from xmodule.error_module import ErrorDescriptor
 from xmodule.errortracker import null_error_tracker, exc_info_to_str
 from xmodule.exceptions import HeartbeatFailure
 from xmodule.mako_module import MakoDescriptorSystem
+from xmodule.profiling import ProfiledCollection
 from xmodule.modulestore import ModuleStoreWriteBase, ModuleStoreEnum, BulkOperationsMixin, BulkOpsRecord
 from xmodule.modulestore.draft_and_published import ModuleStoreDraftAndPublished, DIRECT_ONLY_CATEGORIES
 from xmodule.modulestore.edit_info import EditInfoRuntimeMixin
@@ -77,6 +79,11 @@ _OSFS_INSTANCE = {}
 
 _DETACHED_CATEGORIES = [name for name, __ in XBlock.load_tagged_classes("detached")]
 
+# How long, in seconds, a process may hold the lock on computing a course's
+# metadata inheritance tree, and how long others wait for it to be done
+METADATA_INHERITANCE_LOCK_TIMEOUT = 60
+METADATA_INHERITANCE_LOCK_WAIT = 5
+
 
 class MongoRevisionKey(object):
     """
@@ -520,6 +527,125 @@ class ParentLocationCache(dict):
             del self[key]
 
 
+class MetadataInheritanceTree(object):
+    """
+    The inheritable metadata of the blocks of a course, indexed by location url.
+
+    Rather than a copy of its inherited metadata for every block, it keeps the
+    inheritable metadata each container sets itself and the parent of every
+    block, and merges the metadata of a block's ancestors when the block is
+    looked up. Changing a container's metadata or children is then a matter of
+    replacing its own entries, without copying anything down its subtree.
+
+    `get` returns the same dicts as the plain dict the tree used to be: the
+    metadata a block inherits (plus its own, for containers), with its parent
+    url under 'parent', keyed by `branch`.
+    """
+    def __init__(self, root, branch):
+        self.root = root
+        self.branch = branch
+        # container url -> the inheritable metadata the container sets
+        self.metadata = {}
+        # container url -> the urls of its children
+        self.children = {}
+        # block url -> the url of its parent
+        self.parents = {}
+        # block url -> the merged metadata of the block and its ancestors, built by `get`
+        self._merged = {}
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_merged'] = {}
+        return state
+
+    def __len__(self):
+        return len(self.parents)
+
+    def __contains__(self, url):
+        return self._merged_metadata(url) is not None and url != self.root
+
+    def keys(self):
+        """
+        Return the urls of the blocks in the tree, other than the root.
+        """
+        return [url for url in self.parents if url != self.root]
+
+    def get(self, url, default=None):
+        """
+        Return what `url` inherits, or `default` if it isn't a descendant of the course.
+        """
+        if url == self.root:
+            return default
+        merged = self._merged_metadata(url)
+        if merged is None:
+            return default
+        metadata = dict(merged)
+        metadata['parent'] = {self.branch: self.parents[url]}
+        return metadata
+
+    def _merged_metadata(self, url):
+        """
+        Return the metadata `url` and its ancestors set, or None if `url` doesn't descend from the root.
+        """
+        merged = self._merged.get(url)
+        if merged is not None:
+            return merged
+
+        # Walk up to the closest ancestor whose metadata is already merged
+        ancestors = []
+        current = url
+        while current not in self._merged:
+            if current in ancestors:
+                # A cycle: it can't descend from the root
+                return None
+            ancestors.append(current)
+            if current == self.root:
+                merged = {}
+                break
+            current = self.parents.get(current)
+            if current is None:
+                return None
+        else:
+            merged = self._merged[current]
+
+        # ...and merge back down
+        for ancestor in reversed(ancestors):
+            merged = dict(merged)
+            merged.update(self.metadata.get(ancestor, {}))
+            self._merged[ancestor] = merged
+        return merged
+
+    def update_container(self, url, metadata, children):
+        """
+        Record the inheritable `metadata` the container at `url` now sets, and its `children`.
+
+        As when the tree is computed from both the draft and published versions
+        of the blocks, children are only ever added here: a child that is gone
+        from every version is removed by `remove`.
+        """
+        old_children = self.children.get(url, [])
+        self.children[url] = old_children + [child for child in children if child not in old_children]
+        for child in children:
+            if child not in old_children or child not in self.parents:
+                self.parents[child] = url
+        self.metadata[url] = dict(metadata)
+        self._merged.clear()
+
+    def remove(self, urls):
+        """
+        Remove the blocks at `urls`, which don't exist anymore, from the tree.
+        """
+        removed = set(urls)
+        for url in removed:
+            self.parents.pop(url, None)
+            self.metadata.pop(url, None)
+            self.children.pop(url, None)
+        for container, children in self.children.iteritems():
+            if any(child in removed for child in children):
+                self.children[container] = [child for child in children if child not in removed]
+        self._merged.clear()
+
+
 class MongoModuleStore(ModuleStoreDraftAndPublished, ModuleStoreWriteBase, MongoBulkOpsMixin):
     """
     A Mongodb backed ModuleStore
@@ -565,7 +691,7 @@ class MongoModuleStore(ModuleStoreDraftAndPublished, ModuleStoreWriteBase, Mongo
                 ),
                 wait_time=retry_wait_time
             )
-            self.collection = self.database[collection]
+            self.collection = ProfiledCollection(self.database[collection], 'mongo')
 
             # Collection which stores asset metadata.
             if asset_collection is None:
@@ -718,38 +844,26 @@ class MongoModuleStore(ModuleStoreDraftAndPublished, ModuleStoreWriteBase, Mongo
             if location.category == 'course':
                 root = location_url
 
-        # now traverse the tree and compute down the inherited metadata
-        metadata_to_inherit = {}
-
-        def _compute_inherited_metadata(url):
-            """
-            Helper method for computing inherited metadata for a specific location url
-            """
-            my_metadata = results_by_url[url].get('metadata', {})
-
-            # go through all the children and recurse, but only if we have
-            # in the result set. Remember results will not contain leaf nodes
-            for child in results_by_url[url].get('definition', {}).get('children', []):
-                if child in results_by_url:
-                    new_child_metadata = copy.deepcopy(my_metadata)
-                    new_child_metadata.update(results_by_url[child].get('metadata', {}))
-                    results_by_url[child]['metadata'] = new_child_metadata
-                    metadata_to_inherit[child] = new_child_metadata
-                    _compute_inherited_metadata(child)
-                else:
-                    # this is likely a leaf node, so let's record what metadata we need to inherit
-                    metadata_to_inherit[child] = my_metadata.copy()
-                # WARNING: 'parent' is not part of inherited metadata, but
-                # we're piggybacking on this recursive traversal to grab
-                # and cache the child's parent, as a performance optimization.
-                # The 'parent' key will be popped out of the dictionary during
+        # now traverse the tree, recording each container's metadata and each block's parent.
+        # Remember results will not contain leaf nodes
+        tree = MetadataInheritanceTree(root, self.get_branch_setting())
+        to_visit = [root] if root is not None else []
+        while to_visit:
+            url = to_visit.pop()
+            if url in tree.metadata:
+                continue
+            children = list(results_by_url[url].get('definition', {}).get('children', []))
+            tree.metadata[url] = results_by_url[url].get('metadata', {})
+            tree.children[url] = children
+            for child in children:
+                # WARNING: 'parent' is not part of inherited metadata, but the
+                # tree returns it, as a performance optimization for
                 # CachingDescriptorSystem.load_item
-                metadata_to_inherit[child].setdefault('parent', {})[self.get_branch_setting()] = url
-
-        if root is not None:
-            _compute_inherited_metadata(root)
+                tree.parents[child] = url
+                if child in results_by_url:
+                    to_visit.append(child)
 
-        return metadata_to_inherit
+        return tree
 
     def _get_cached_metadata_inheritance_tree(self, course_id, force_refresh=False):
         '''
@@ -774,15 +888,25 @@ class MongoModuleStore(ModuleStoreDraftAndPublished, ModuleStoreWriteBase, Mongo
 
         if not tree:
             # if not in subsystem, or we are on force refresh, then we have to compute
-            tree = self._compute_metadata_inheritance_tree(course_id)
-
-            # now write out computed tree to caching subsystem (e.g. memcached), if available
-            if self.metadata_inheritance_cache_subsystem is not None:
-                self.metadata_inheritance_cache_subsystem.set(unicode(course_id), tree)
+            if force_refresh:
+                # The tree has to reflect the edit which was just made, so it is
+                # computed even if another process is computing it too.
+                with self._metadata_inheritance_lock(course_id, wait=METADATA_INHERITANCE_LOCK_WAIT):
+                    tree = self._compute_and_cache_metadata_inheritance_tree(course_id)
+            else:
+                tree = self._compute_metadata_inheritance_tree_once(course_id)
 
         # now populate a request_cache, if available. NOTE, we are outside of the
         # scope of the above if: statement so that after a memcache hit, it'll get
         # put into the request_cache
+        self._request_cache_metadata_inheritance_tree(course_id, tree)
+
+        return tree
+
+    def _request_cache_metadata_inheritance_tree(self, course_id, tree):
+        """
+        Keep `tree` in the request cache, if available.
+        """
         if self.request_cache is not None:
             # we can't assume the 'metadatat_inheritance' part of the request cache dict has been
             # defined
@@ -790,20 +914,143 @@ class MongoModuleStore(ModuleStoreDraftAndPublished, ModuleStoreWriteBase, Mongo
                 self.request_cache.data['metadata_inheritance'] = {}
             self.request_cache.data['metadata_inheritance'][unicode(course_id)] = tree
 
+    def _compute_and_cache_metadata_inheritance_tree(self, course_id):
+        """
+        Compute the metadata inheritance tree of the course, and write it to the caching subsystem.
+        """
+        tree = self._compute_metadata_inheritance_tree(course_id)
+
+        # now write out computed tree to caching subsystem (e.g. memcached), if available
+        if self.metadata_inheritance_cache_subsystem is not None:
+            self.metadata_inheritance_cache_subsystem.set(unicode(course_id), tree)
+        return tree
+
+    def _compute_metadata_inheritance_tree_once(self, course_id):
+        """
+        Compute and cache the metadata inheritance tree of the course, unless
+        another process is already doing so, in which case wait for its result.
+
+        This keeps the processes which all miss the cache at once (after the
+        tree was evicted, say) from all computing it.
+        """
+        deadline = time.time() + METADATA_INHERITANCE_LOCK_WAIT
+        while True:
+            with self._metadata_inheritance_lock(course_id) as acquired:
+                if acquired or time.time() >= deadline:
+                    return self._compute_and_cache_metadata_inheritance_tree(course_id)
+            time.sleep(0.1)
+            tree = self.metadata_inheritance_cache_subsystem.get(unicode(course_id), {})
+            if tree:
+                return tree
+
+    @contextmanager
+    def _metadata_inheritance_lock(self, course_id, wait=0):
+        """
+        Hold the lock on computing and updating the cached metadata inheritance
+        tree of the course within the block, waiting up to `wait` seconds for
+        it. Yields whether the lock was acquired.
+
+        The lock lives in the caching subsystem; without one (or one which can't
+        `add`), there's nothing to share, so the lock is always acquired.
+        """
+        cache = self.metadata_inheritance_cache_subsystem
+        if cache is None or not hasattr(cache, 'add'):
+            yield True
+            return
+
+        key = u'{}-lock'.format(course_id)
+        deadline = time.time() + wait
+        acquired = cache.add(key, True, METADATA_INHERITANCE_LOCK_TIMEOUT)
+        while not acquired and time.time() < deadline:
+            time.sleep(0.1)
+            acquired = cache.add(key, True, METADATA_INHERITANCE_LOCK_TIMEOUT)
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                cache.delete(key)
+
+    def _update_cached_metadata_inheritance_tree(self, course_id, xblock=None, deleted_locations=None):
+        """
+        Apply the changes made by saving `xblock`, or deleting the blocks at
+        `deleted_locations`, to the cached metadata inheritance tree of the course.
+
+        Returns the updated tree, or None if it has to be computed instead: when
+        there's no tree cached for the current branch, or another process is
+        changing it.
+        """
+        tree = None
+        if self.request_cache is not None:
+            tree = self.request_cache.data.get('metadata_inheritance', {}).get(unicode(course_id))
+        if tree is None and self.metadata_inheritance_cache_subsystem is not None:
+            tree = self.metadata_inheritance_cache_subsystem.get(unicode(course_id))
+        if not isinstance(tree, MetadataInheritanceTree) or tree.branch != self.get_branch_setting():
+            return None
+
+        if xblock is not None and not xblock.has_children:
+            # Only containers' metadata is inherited: the tree is unchanged
+            return tree
+
+        with self._metadata_inheritance_lock(course_id, wait=METADATA_INHERITANCE_LOCK_WAIT) as acquired:
+            if not acquired:
+                return None
+            if self.metadata_inheritance_cache_subsystem is not None:
+                # Apply the changes on top of the changes of other processes
+                tree = self.metadata_inheritance_cache_subsystem.get(unicode(course_id), tree)
+                if not isinstance(tree, MetadataInheritanceTree) or tree.branch != self.get_branch_setting():
+                    return None
+
+            if xblock is not None:
+                metadata = self._serialize_scope(xblock, Scope.settings)
+                tree.update_container(
+                    unicode(as_published(xblock.location)),
+                    {name: value for name, value in metadata.iteritems() if name in InheritanceMixin.fields},
+                    self._serialize_scope(xblock, Scope.children).get('children', []),
+                )
+            if deleted_locations:
+                tree.remove(self._removed_block_urls(course_id, deleted_locations))
+
+            if self.metadata_inheritance_cache_subsystem is not None:
+                self.metadata_inheritance_cache_subsystem.set(unicode(course_id), tree)
+
+        self._request_cache_metadata_inheritance_tree(course_id, tree)
         return tree
 
-    def refresh_cached_metadata_inheritance_tree(self, course_id, runtime=None):
+    def _removed_block_urls(self, course_id, locations):
+        """
+        Return the urls of the blocks at `locations` of which no version is left.
+        """
+        urls = set(unicode(as_published(location)) for location in locations)
+        query = SON([
+            ('_id.tag', 'i4x'),
+            ('_id.org', course_id.org),
+            ('_id.course', course_id.course),
+            ('_id.name', {'$in': list(set(location.name for location in locations))}),
+        ])
+        for result in self.collection.find(query, {'_id': 1}):
+            urls.discard(unicode(as_published(Location._from_deprecated_son(result['_id'], course_id.run))))
+        return urls
+
+    def refresh_cached_metadata_inheritance_tree(self, course_id, runtime=None, xblock=None, deleted_locations=None):
         """
         Refresh the cached metadata inheritance tree for the org/course combination
         for location
 
+        If the refresh is due to saving `xblock` or deleting the blocks at
+        `deleted_locations`, and the tree is cached, only their changes are
+        applied to it rather than computing it again.
+
         If given a runtime, it replaces the cached_metadata in that runtime. NOTE: failure to provide
         a runtime may mean that some objects report old values for inherited data.
         """
         course_id = course_id.for_branch(None)
         if not self._is_in_bulk_operation(course_id):
-            # below is done for side effects when runtime is None
-            cached_metadata = self._get_cached_metadata_inheritance_tree(course_id, force_refresh=True)
+            cached_metadata = None
+            if xblock is not None or deleted_locations:
+                cached_metadata = self._update_cached_metadata_inheritance_tree(course_id, xblock, deleted_locations)
+            if cached_metadata is None:
+                # below is done for side effects when runtime is None
+                cached_metadata = self._get_cached_metadata_inheritance_tree(course_id, force_refresh=True)
             if runtime:
                 runtime.cached_metadata = cached_metadata
 
@@ -928,7 +1175,13 @@ class MongoModuleStore(ModuleStoreDraftAndPublished, ModuleStoreWriteBase, Mongo
         else:
             system = using_descriptor_system
             system.module_data.update(data_cache)
-            system.cached_metadata.update(cached_metadata)
+            if cached_metadata:
+                if isinstance(system.cached_metadata, dict) and isinstance(cached_metadata, dict):
+                    system.cached_metadata.update(cached_metadata)
+                else:
+                    # A MetadataInheritanceTree covers the whole course, so the
+                    # one just fetched replaces the system's rather than merging
+                    system.cached_metadata = cached_metadata
 
         return system.load_item(location)
 
@@ -1029,6 +1282,38 @@ class MongoModuleStore(ModuleStoreDraftAndPublished, ModuleStoreWriteBase, Mongo
         except ItemNotFoundError:
             return None
 
+    @autoretry_read()
+    def get_courses_by_keys(self, course_keys, depth=0, **kwargs):
+        """
+        Get the courses with the given courseids (org/course/run), fetching them all with one query
+        """
+        courses = dict.fromkeys(course_keys)
+        keys_by_location = {}
+        for course_key in course_keys:
+            assert isinstance(course_key, CourseKey)
+            if isinstance(course_key, LibraryLocator):
+                continue  # Libraries require split mongo
+            filled_key = self.fill_in_run(course_key)
+            if filled_key.run is None:
+                continue
+            keys_by_location[(filled_key.org, filled_key.course, filled_key.run)] = (course_key, filled_key)
+        if not keys_by_location:
+            return courses
+
+        course_records = self.collection.find({
+            '_id': {
+                '$in': [
+                    course_filled_key.make_usage_key('course', course_filled_key.run).to_deprecated_son()
+                    for __, course_filled_key in keys_by_location.itervalues()
+                ]
+            }
+        })
+        for course in course_records:
+            course_id = course['_id']
+            course_key, filled_key = keys_by_location[(course_id['org'], course_id['course'], course_id['name'])]
+            courses[course_key] = self._load_items(filled_key, [course], depth)[0]
+        return courses
+
     def has_course(self, course_key, ignore_case=False, **kwargs):
         """
         Returns the course_id of the course if it was found, else None
@@ -1451,7 +1736,9 @@ class MongoModuleStore(ModuleStoreDraftAndPublished, ModuleStoreWriteBase, Mongo
             xblock._edit_info = payload['edit_info']
 
             # recompute (and update) the metadata inheritance tree which is cached
-            self.refresh_cached_metadata_inheritance_tree(xblock.scope_ids.usage_id.course_key, xblock.runtime)
+            self.refresh_cached_metadata_inheritance_tree(
+                xblock.scope_ids.usage_id.course_key, xblock.runtime, xblock=xblock
+            )
             # fire signal that we've written to DB
         except ItemNotFoundError:
             if not allow_not_found:
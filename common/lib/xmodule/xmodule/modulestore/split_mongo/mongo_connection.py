@@ -12,6 +12,7 @@ from contracts import check, new_contract
 from xmodule.exceptions import HeartbeatFailure
 from xmodule.modulestore import BlockData
 from xmodule.modulestore.split_mongo import BlockKey
+from xmodule import profiling
 import datetime
 import pytz
 
@@ -76,11 +77,16 @@ class MongoConnection(object):
     """
     def __init__(
         self, db, collection, host, port=27017, tz_aware=True, user=None, password=None,
-        asset_collection=None, retry_wait_time=0.1, **kwargs
+        asset_collection=None, retry_wait_time=0.1, structure_cache=None, **kwargs
     ):
         """
         Create & open the connection, authenticate, and provide pointers to the collections
+
+        Arguments:
+            structure_cache (StructureCache): if given, structures are read through this cache
         """
+        self.structure_cache = structure_cache
+
         self.database = MongoProxy(
             pymongo.database.Database(
                 pymongo.MongoClient(
@@ -118,12 +124,26 @@ class MongoConnection(object):
         else:
             raise HeartbeatFailure("Can't connect to {}".format(self.database.name))
 
+    @profiling.profiled_function('split_mongo.get_structure')
     def get_structure(self, key):
         """
         Get the structure from the persistence mechanism whose id is the given key
+
+        Structures are immutable, so if a structure_cache is configured, the returned
+        structure may be shared with other callers and must not be modified in place.
         """
-        return structure_from_mongo(self.structures.find_one({'_id': key}))
+        if self.structure_cache is not None:
+            structure = self.structure_cache.get(key)
+            if structure is not None:
+                profiling.record('split_mongo.structure_cache_hit')
+                return structure
+
+        structure = structure_from_mongo(self.structures.find_one({'_id': key}))
+        if self.structure_cache is not None:
+            self.structure_cache.set(key, structure)
+        return structure
 
+    @profiling.profiled_function('split_mongo.find_structures_by_id')
     @autoretry_read()
     def find_structures_by_id(self, ids):
         """
@@ -132,8 +152,22 @@ class MongoConnection(object):
         Arguments:
             ids (list): A list of structure ids
         """
-        return [structure_from_mongo(structure) for structure in self.structures.find({'_id': {'$in': ids}})]
-
+        if self.structure_cache is None:
+            return [structure_from_mongo(structure) for structure in self.structures.find({'_id': {'$in': ids}})]
+
+        cached = self.structure_cache.get_many(ids)
+        if cached:
+            profiling.record('split_mongo.structure_cache_hit', count=len(cached))
+        structures = cached.values()
+        missing_ids = [structure_id for structure_id in ids if structure_id not in cached]
+        if missing_ids:
+            for structure in self.structures.find({'_id': {'$in': missing_ids}}):
+                structure = structure_from_mongo(structure)
+                self.structure_cache.set(structure['_id'], structure)
+                structures.append(structure)
+        return structures
+
+    @profiling.profiled_function('split_mongo.find_structures_derived_from')
     @autoretry_read()
     def find_structures_derived_from(self, ids):
         """
@@ -144,6 +178,7 @@ class MongoConnection(object):
         """
         return [structure_from_mongo(structure) for structure in self.structures.find({'previous_version': {'$in': ids}})]
 
+    @profiling.profiled_function('split_mongo.find_ancestor_structures')
     @autoretry_read()
     def find_ancestor_structures(self, original_version, block_key):
         """
@@ -169,12 +204,14 @@ class MongoConnection(object):
             })
         ]
 
+    @profiling.profiled_function('split_mongo.insert_structure')
     def insert_structure(self, structure):
         """
         Insert a new structure into the database.
         """
         self.structures.insert(structure_to_mongo(structure))
 
+    @profiling.profiled_function('split_mongo.get_course_index')
     def get_course_index(self, key, ignore_case=False):
         """
         Get the course_index from the persistence mechanism whose id is the given key
@@ -191,6 +228,19 @@ class MongoConnection(object):
             }
         return self.course_index.find_one(query)
 
+    @profiling.profiled_function('split_mongo.find_course_indexes')
+    def find_course_indexes(self, keys):
+        """
+        Get the course_indexes from the persistence mechanism whose ids are the given keys
+        """
+        return self.course_index.find({
+            '$or': [
+                {key_attr: getattr(key, key_attr) for key_attr in ('org', 'course', 'run')}
+                for key in keys
+            ]
+        })
+
+    @profiling.profiled_function('split_mongo.find_matching_course_indexes')
     def find_matching_course_indexes(self, branch=None, search_targets=None, org_target=None):
         """
         Find the course_index matching particular conditions.
@@ -215,6 +265,7 @@ class MongoConnection(object):
 
         return self.course_index.find(query)
 
+    @profiling.profiled_function('split_mongo.insert_course_index')
     def insert_course_index(self, course_index):
         """
         Create the course_index in the db
@@ -222,6 +273,7 @@ class MongoConnection(object):
         course_index['last_update'] = datetime.datetime.now(pytz.utc)
         self.course_index.insert(course_index)
 
+    @profiling.profiled_function('split_mongo.update_course_index')
     def update_course_index(self, course_index, from_index=None):
         """
         Update the db record for course_index.
@@ -244,6 +296,7 @@ class MongoConnection(object):
         course_index['last_update'] = datetime.datetime.now(pytz.utc)
         self.course_index.update(query, course_index, upsert=False,)
 
+    @profiling.profiled_function('split_mongo.delete_course_index')
     def delete_course_index(self, course_key):
         """
         Delete the course_index from the persistence mechanism whose id is the given course_index
@@ -254,18 +307,21 @@ class MongoConnection(object):
         }
         return self.course_index.remove(query)
 
+    @profiling.profiled_function('split_mongo.get_definition')
     def get_definition(self, key):
         """
         Get the definition from the persistence mechanism whose id is the given key
         """
         return self.definitions.find_one({'_id': key})
 
+    @profiling.profiled_function('split_mongo.get_definitions')
     def get_definitions(self, definitions):
         """
         Retrieve all definitions listed in `definitions`.
         """
         return self.definitions.find({'_id': {'$in': definitions}})
 
+    @profiling.profiled_function('split_mongo.insert_definition')
     def insert_definition(self, definition):
         """
         Create the definition in the db
@@ -80,6 +80,7 @@ from xmodule.modulestore import (
 from ..exceptions import ItemNotFoundError
 from .caching_descriptor_system import CachingDescriptorSystem
 from xmodule.modulestore.split_mongo.mongo_connection import MongoConnection, DuplicateKeyError
+from xmodule.modulestore.split_mongo.structure_cache import StructureCache
 from xmodule.modulestore.split_mongo import BlockKey, CourseEnvelope
 from xmodule.error_module import ErrorDescriptor
 from collections import defaultdict
@@ -636,14 +637,28 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
                  default_class=None,
                  error_tracker=null_error_tracker,
                  i18n_service=None, fs_service=None, user_service=None,
-                 services=None, signal_handler=None, **kwargs):
+                 services=None, signal_handler=None,
+                 structure_cache_max_bytes=0, structure_cache_subsystem=None, structure_cache_timeout=None,
+                 **kwargs):
         """
         :param doc_store_config: must have a host, db, and collection entries. Other common entries: port, tz_aware.
+        :param structure_cache_max_bytes: the size of the in-process structure cache. 0 disables it.
+        :param structure_cache_subsystem: an optional django-style cache shared between processes
+            used as the second tier of the structure cache.
+        :param structure_cache_timeout: the timeout for structures stored in structure_cache_subsystem.
         """
 
         super(SplitMongoModuleStore, self).__init__(contentstore, **kwargs)
 
-        self.db_connection = MongoConnection(**doc_store_config)
+        if structure_cache_max_bytes or structure_cache_subsystem is not None:
+            structure_cache = StructureCache(
+                max_bytes=structure_cache_max_bytes,
+                shared_cache=structure_cache_subsystem,
+                shared_timeout=structure_cache_timeout,
+            )
+        else:
+            structure_cache = None
+        self.db_connection = MongoConnection(structure_cache=structure_cache, **doc_store_config)
         self.db = self.db_connection.database
 
         if default_class is not None:
@@ -959,6 +974,52 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
             raise ItemNotFoundError(course_id)
         return self._get_structure(course_id, depth, **kwargs)
 
+    @autoretry_read()
+    def get_courses_by_keys(self, course_keys, depth=0, **kwargs):
+        """
+        Gets the course descriptors for the courses identified by the locators, fetching the
+        course indexes with one query and their structures with another.
+        """
+        courses = {}
+        batched_keys = []
+        for course_key in course_keys:
+            if not isinstance(course_key, CourseLocator) or course_key.deprecated:
+                # The supplied CourseKey is of the wrong type, so it can't possibly be stored in this modulestore.
+                courses[course_key] = None
+            elif course_key.version_guid or course_key.branch is None or self._is_in_bulk_operation(course_key):
+                # Specific versions, and courses with changes in flight, are looked up one by one
+                try:
+                    courses[course_key] = self.get_course(course_key, depth=depth, **kwargs)
+                except ItemNotFoundError:
+                    courses[course_key] = None
+            else:
+                batched_keys.append(course_key)
+
+        if not batched_keys:
+            return courses
+
+        indexes = {
+            (index['org'], index['course'], index['run']): index
+            for index in self.db_connection.find_course_indexes(batched_keys)
+        }
+        version_guids = {}
+        for course_key in batched_keys:
+            index = indexes.get((course_key.org, course_key.course, course_key.run))
+            version_guids[course_key] = index['versions'].get(course_key.branch) if index else None
+
+        structures = {
+            structure['_id']: structure
+            for structure in self.find_structures_by_id([guid for guid in version_guids.itervalues() if guid])
+        }
+        for course_key, version_guid in version_guids.iteritems():
+            structure = structures.get(version_guid)
+            if structure is None:
+                courses[course_key] = None
+                continue
+            envelope = CourseEnvelope(course_key.replace(version_guid=version_guid), structure)
+            courses[course_key] = self._load_items(envelope, [structure['root']], depth, **kwargs)[0]
+        return courses
+
     def get_library(self, library_id, depth=0, head_validation=True, **kwargs):
         """
         Gets the 'library' root block for the library identified by the locator
@@ -57,6 +57,21 @@ class DraftVersioningModuleStore(SplitMongoModuleStore, ModuleStoreDraftAndPubli
         course_id = self._map_revision_to_branch(course_id)
         return super(DraftVersioningModuleStore, self).get_course(course_id, depth=depth, **kwargs)
 
+    def get_courses_by_keys(self, course_keys, depth=0, **kwargs):
+        """
+        See :py:meth: xmodule.modulestore.split_mongo.split.SplitMongoModuleStore.get_courses_by_keys
+        """
+        branched_keys = {}
+        for course_key in course_keys:
+            if isinstance(course_key, CourseLocator) and not course_key.deprecated:
+                branched_keys[self._map_revision_to_branch(course_key)] = course_key
+            else:
+                branched_keys[course_key] = course_key
+        courses = super(DraftVersioningModuleStore, self).get_courses_by_keys(
+            branched_keys.keys(), depth=depth, **kwargs
+        )
+        return {branched_keys[key]: course for key, course in courses.iteritems()}
+
     def get_library(self, library_id, depth=0, head_validation=True, **kwargs):
         if not head_validation and library_id.version_guid:
             return SplitMongoModuleStore.get_library(
@@ -0,0 +1,206 @@
+"""
+A bounded, process-wide cache of split modulestore structures.
+
+Structures are content addressed by their ``_id`` and are never modified once
+they have been written (every edit goes through
+:meth:`SplitMongoModuleStore.version_structure`, which copies the structure
+under a new ``_id``), so a structure read from the database can be safely
+reused by every request a worker serves.
+
+The cache has two tiers:
+
+* an in-process LRU tier, bounded by the (approximate) number of bytes the
+  cached structures occupy, which holds the already-converted structures
+  (``{BlockKey: BlockData}`` maps, see
+  :func:`~xmodule.modulestore.split_mongo.mongo_connection.structure_from_mongo`);
+* an optional shared tier (any object with the django cache ``get``/``set``
+  interface, e.g. memcached), which holds compressed pickles of the converted
+  structures so that a worker which misses locally doesn't have to go to Mongo.
+"""
+import cPickle as pickle
+import logging
+import threading
+import zlib
+from collections import OrderedDict
+
+# We don't want to force a dependency on datadog, so make the import conditional
+try:
+    import dogstats_wrapper as dog_stats_api
+except ImportError:
+    # pylint: disable=invalid-name
+    dog_stats_api = None
+
+log = logging.getLogger(__name__)
+
+# By default, hold up to 256MB of structures in each process
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+
+def metric_name(name):
+    """
+    Return the datadog metric name for the structure cache metric ``name``.
+    """
+    return u'split.structure_cache.{}'.format(name)
+
+
+class StructureCache(object):
+    """
+    A byte-size-aware LRU cache of split structures keyed by structure id.
+
+    Callers must treat the structures returned by :meth:`get` as read-only.
+    """
+    def __init__(
+        self, max_bytes=DEFAULT_MAX_BYTES, shared_cache=None, shared_timeout=None, key_prefix='split_structure'
+    ):
+        """
+        Arguments:
+            max_bytes (int): the upper bound on the approximate size of all the structures
+                held in process. 0 disables the in-process tier.
+            shared_cache: an optional django-style cache used as a second tier.
+            shared_timeout (int): the timeout passed to ``shared_cache.set``. None means
+                use the cache's default timeout.
+            key_prefix (str): prefix for the keys stored in ``shared_cache``.
+        """
+        self.max_bytes = max_bytes
+        self.shared_cache = shared_cache
+        self.shared_timeout = shared_timeout
+        self.key_prefix = key_prefix
+
+        self._lock = threading.RLock()
+        # structure_id -> (structure, size in bytes), in least to most recently used order
+        self._entries = OrderedDict()
+        self.current_bytes = 0
+
+        self.hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _shared_key(self, structure_id):
+        """
+        Return the key under which ``structure_id`` is stored in the shared tier.
+        """
+        return u'{}.{}'.format(self.key_prefix, structure_id)
+
+    def _record(self, name, tier=None):
+        """
+        Report a cache event to datadog, if it is available.
+        """
+        if dog_stats_api:
+            tags = [u'tier:{}'.format(tier)] if tier else []
+            dog_stats_api.increment(metric_name(name), tags=tags)
+
+    def get(self, structure_id):
+        """
+        Return the structure with id ``structure_id``, or None if it isn't cached in either tier.
+        """
+        with self._lock:
+            entry = self._entries.pop(structure_id, None)
+            if entry is not None:
+                # re-insert to mark as most recently used
+                self._entries[structure_id] = entry
+                self.hits += 1
+                self._record('hit', 'local')
+                return entry[0]
+
+        if self.shared_cache is not None:
+            try:
+                compressed = self.shared_cache.get(self._shared_key(structure_id))
+            except Exception:  # pylint: disable=broad-except
+                log.exception("Unable to read structure %s from the shared structure cache", structure_id)
+                compressed = None
+
+            if compressed is not None:
+                pickled = zlib.decompress(compressed)
+                structure = pickle.loads(pickled)
+                self._store_locally(structure_id, structure, len(pickled))
+                with self._lock:
+                    self.shared_hits += 1
+                self._record('hit', 'shared')
+                return structure
+
+        with self._lock:
+            self.misses += 1
+        self._record('miss')
+        return None
+
+    def get_many(self, structure_ids):
+        """
+        Return a dict mapping each of ``structure_ids`` that is cached to its structure.
+        """
+        found = {}
+        for structure_id in structure_ids:
+            structure = self.get(structure_id)
+            if structure is not None:
+                found[structure_id] = structure
+        return found
+
+    def set(self, structure_id, structure):
+        """
+        Cache ``structure`` under ``structure_id`` in every configured tier.
+        """
+        if structure is None:
+            return
+
+        pickled = pickle.dumps(structure, pickle.HIGHEST_PROTOCOL)
+
+        if self.shared_cache is not None:
+            try:
+                self.shared_cache.set(self._shared_key(structure_id), zlib.compress(pickled, 1), self.shared_timeout)
+            except Exception:  # pylint: disable=broad-except
+                log.exception("Unable to write structure %s to the shared structure cache", structure_id)
+
+        self._store_locally(structure_id, structure, len(pickled))
+
+    def _store_locally(self, structure_id, structure, size):
+        """
+        Add ``structure`` to the in-process tier, evicting the least recently used
+        structures until the tier fits in ``max_bytes``.
+        """
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            previous = self._entries.pop(structure_id, None)
+            if previous is not None:
+                self.current_bytes -= previous[1]
+
+            self._entries[structure_id] = (structure, size)
+            self.current_bytes += size
+
+            while self.current_bytes > self.max_bytes:
+                __, (__, evicted_size) = self._entries.popitem(last=False)
+                self.current_bytes -= evicted_size
+                self.evictions += 1
+                self._record('eviction', 'local')
+
+    def clear(self):
+        """
+        Drop every structure held in process. The shared tier is left alone.
+        """
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def __contains__(self, structure_id):
+        with self._lock:
+            return structure_id in self._entries
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+    def stats(self):
+        """
+        Return a dict of the counters describing this cache's effectiveness.
+        """
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'shared_hits': self.shared_hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'entries': len(self._entries),
+                'bytes': self.current_bytes,
+                'max_bytes': self.max_bytes,
+            }
@@ -8,6 +8,7 @@ import mimetypes
 from tempfile import mkdtemp
 import path
 import shutil
+from fs.osfs import OSFS
 
 from opaque_keys.edx.locator import CourseLocator, AssetLocator
 from opaque_keys.edx.keys import AssetKey
@@ -132,10 +133,8 @@ class TestContentstore(unittest.TestCase):
         self.set_up_assets(deprecated)
         root_dir = path.path(mkdtemp())
         try:
-            self.contentstore.export_all_for_course(
-                self.course1_key, root_dir,
-                path.path(root_dir / "policy.json"),
-            )
+            self.contentstore.export_all_for_course_to_fs(self.course1_key, OSFS(root_dir), OSFS(root_dir))
+            self.assertTrue(path.path(root_dir / "assets.json").isfile())
             for filename in self.course1_files:
                 filepath = path.path(root_dir / filename)
                 self.assertTrue(filepath.isfile(), "{} is not a file".format(filepath))
@@ -857,6 +857,28 @@ class TestMixedModuleStore(CommonMixedModuleStoreSetup):
             published_courses = self.store.get_courses(remove_branch=True)
         self.assertEquals([c.id for c in draft_courses], [c.id for c in published_courses])
 
+    @ddt.data('draft', 'split')
+    def test_get_courses_by_keys(self, default_ms):
+        """
+        Test fetching several courses from different stores at once
+        """
+        self.initdb(default_ms)
+        missing_key = self.store.make_course_key('no', 'such', 'course')
+        course_keys = [
+            self.course_locations[self.MONGO_COURSEID].course_key,
+            self.course_locations[self.XML_COURSEID1].course_key,
+            missing_key,
+        ]
+        courses = self.store.get_courses_by_keys(course_keys)
+        self.assertItemsEqual(courses.keys(), course_keys)
+        self.assertEqual(courses[course_keys[0]].location, self.course_locations[self.MONGO_COURSEID])
+        self.assertEqual(courses[course_keys[1]].location, self.course_locations[self.XML_COURSEID1])
+        self.assertIsNone(courses[missing_key])
+
+        # the courses are the same as get_course returns, one by one
+        for course_key in course_keys[:2]:
+            self.assertEqual(courses[course_key].location, self.store.get_course(course_key).location)
+
     @ddt.data('draft', 'split')
     def test_create_child_detached_tabs(self, default_ms):
         """
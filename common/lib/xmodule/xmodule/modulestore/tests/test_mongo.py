@@ -11,7 +11,10 @@ from nose.tools import assert_equals, assert_raises, \
 from path import path
 import pymongo
 import logging
+import pickle
 import shutil
+import tarfile
+from StringIO import StringIO
 from tempfile import mkdtemp
 from uuid import uuid4
 from datetime import datetime
@@ -33,18 +36,20 @@ from opaque_keys.edx.locator import LibraryLocator, CourseLocator
 from opaque_keys.edx.keys import UsageKey
 from xmodule.modulestore.xml_exporter import export_course_to_xml
 from xmodule.modulestore.xml_importer import import_course_from_xml, perform_xlint
+from xmodule.contentstore.content import StaticContent
 from xmodule.contentstore.mongo import MongoContentStore
 
 from nose.tools import assert_in
 from xmodule.exceptions import NotFoundError
 from git.test.lib.asserts import assert_not_none
 from xmodule.x_module import XModuleMixin
-from xmodule.modulestore.mongo.base import as_draft
+from xmodule.modulestore.mongo.base import as_draft, MetadataInheritanceTree
 from xmodule.modulestore.tests.mongo_connection import MONGO_PORT_NUM, MONGO_HOST
 from xmodule.modulestore.tests.utils import LocationMixin
 from xmodule.modulestore.edit_info import EditInfoMixin
 from xmodule.modulestore.exceptions import ItemNotFoundError
 from xmodule.modulestore.inheritance import InheritanceMixin
+from xmodule.tarfs import TarWriterFS
 
 
 log = logging.getLogger(__name__)
@@ -327,6 +332,15 @@ class TestMongoModuleStore(TestMongoModuleStoreBase):
             self.draft_store.get_item(Location('edX', 'toy', '2012_Fall', 'video', 'Welcome')),
         )
 
+    def test_load_children_through_descriptor_system(self):
+        # Loaded at depth 0, the course has neither its children nor the inheritance tree
+        course = self.draft_store.get_course(SlashSeparatedCourseKey('edX', 'toy', '2012_Fall'), depth=0)
+        chapters = course.get_children()
+        assert_equals(len(chapters), len(course.children))
+        for chapter in chapters:
+            assert_equals(chapter.parent, course.location)
+        assert_is_instance(course.runtime.cached_metadata, MetadataInheritanceTree)
+
     def test_unicode_loads(self):
         """
         Test that getting items from the test_unicode course works
@@ -590,6 +604,33 @@ class TestMongoModuleStore(TestMongoModuleStoreBase):
         finally:
             shutil.rmtree(root_dir)
 
+    def test_export_imported_course_image_to_tar(self):
+        """
+        Make sure a course re-imported with the default course image, whose asset is then
+        exported to the legacy location already, can be exported to a tar archive.
+        """
+        course_key = SlashSeparatedCourseKey('edX', 'simple', '2012_Fall')
+        location = course_key.make_asset_key('asset', 'images_course_image.jpg')
+        course_image = self.content_store.find(location)
+        self.content_store.save(StaticContent(
+            location, 'course_image.jpg', course_image.content_type, course_image.data,
+            import_path='images/course_image.jpg',
+        ))
+        self.addCleanup(self.content_store.save, course_image)
+
+        archive = StringIO()
+        with tarfile.open(fileobj=archive, mode='w:gz') as tar_file:
+            export_course_to_xml(self.draft_store, self.content_store, course_key, TarWriterFS(tar_file), 'test_export')
+
+        archive.seek(0)
+        with tarfile.open(fileobj=archive, mode='r:gz') as tar_file:
+            image_members = [
+                member for member in tar_file.getmembers()
+                if member.name == 'test_export/static/images/course_image.jpg'
+            ]
+            assert_true(image_members)
+            assert_equals(tar_file.extractfile(image_members[-1]).read(), course_image.data)
+
     def test_export_course_image_nondefault(self):
         """
         Make sure that if a non-default image path is specified that we
@@ -913,3 +954,58 @@ def _build_requested_filter(requested_filter):
         "$where": ' || '.join(where),
     }
     return filter_params
+
+
+class TestMetadataInheritanceTree(unittest.TestCase):
+    """
+    Tests for MetadataInheritanceTree
+    """
+    def setUp(self):
+        super(TestMetadataInheritanceTree, self).setUp()
+        self.tree = MetadataInheritanceTree('course', ModuleStoreEnum.Branch.draft_preferred)
+        self.tree.update_container('course', {'graceperiod': '1 day', 'due': 'course due'}, ['chapter'])
+        self.tree.update_container('chapter', {'due': 'chapter due'}, ['sequential'])
+        self.tree.update_container('sequential', {}, ['problem'])
+
+    def assertInherits(self, url, metadata, parent):  # pylint: disable=invalid-name
+        """
+        Assert that `url` inherits `metadata`, and has `parent` as its parent.
+        """
+        expected = dict(metadata, parent={ModuleStoreEnum.Branch.draft_preferred: parent})
+        self.assertEqual(self.tree.get(url), expected)
+
+    def test_get(self):
+        # Containers' own metadata is included, like in a plain dict tree
+        self.assertInherits('chapter', {'graceperiod': '1 day', 'due': 'chapter due'}, 'course')
+        self.assertInherits('sequential', {'graceperiod': '1 day', 'due': 'chapter due'}, 'chapter')
+        self.assertInherits('problem', {'graceperiod': '1 day', 'due': 'chapter due'}, 'sequential')
+        self.assertEqual(self.tree.get('course', {}), {})
+        self.assertEqual(self.tree.get('orphan', {}), {})
+
+    def test_keys(self):
+        # As reported by the repr of CachingDescriptorSystem
+        self.assertEqual(sorted(self.tree.keys()), ['chapter', 'problem', 'sequential'])
+
+    def test_update_container(self):
+        self.assertInherits('problem', {'graceperiod': '1 day', 'due': 'chapter due'}, 'sequential')
+
+        # The change is seen by the whole subtree
+        self.tree.update_container('chapter', {'due': 'new due'}, ['sequential'])
+        self.assertInherits('problem', {'graceperiod': '1 day', 'due': 'new due'}, 'sequential')
+
+        # Moving a block to another container
+        self.tree.update_container('other_sequential', {'due': 'other due'}, ['problem'])
+        self.tree.update_container('chapter', {'due': 'new due'}, ['sequential', 'other_sequential'])
+        self.assertInherits('problem', {'graceperiod': '1 day', 'due': 'other due'}, 'other_sequential')
+
+    def test_remove(self):
+        self.tree.remove(['sequential'])
+        self.assertIsNone(self.tree.get('sequential'))
+        self.assertIsNone(self.tree.get('problem'))
+        self.assertEqual(self.tree.children['chapter'], [])
+
+    def test_pickle(self):
+        self.tree.get('problem')
+        tree = pickle.loads(pickle.dumps(self.tree))
+        self.assertEqual(tree.get('problem'), self.tree.get('problem'))
+        self.assertEqual(len(tree), 3)
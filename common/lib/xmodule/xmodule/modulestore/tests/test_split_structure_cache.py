@@ -0,0 +1,148 @@
+"""
+Tests for the split modulestore's process-wide structure cache.
+"""
+import unittest
+
+from bson.objectid import ObjectId
+from mock import MagicMock, patch
+
+from xmodule.modulestore import BlockData
+from xmodule.modulestore.split_mongo import BlockKey
+from xmodule.modulestore.split_mongo.mongo_connection import MongoConnection
+from xmodule.modulestore.split_mongo.structure_cache import StructureCache
+from xmodule.tests.helpers import DictCache
+
+
+def make_structure(num_blocks=1):
+    """
+    Return a converted structure with ``num_blocks`` html blocks.
+    """
+    structure_id = ObjectId()
+    return {
+        '_id': structure_id,
+        'root': BlockKey('course', 'course'),
+        'blocks': {
+            BlockKey('html', 'block{}'.format(index)): BlockData(
+                block_type='html',
+                definition=ObjectId(),
+                fields={'display_name': u'Block {}'.format(index)},
+                edit_info={'update_version': structure_id},
+            )
+            for index in range(num_blocks)
+        },
+    }
+
+
+class TestStructureCache(unittest.TestCase):
+    """
+    Tests of StructureCache.
+    """
+    def test_miss_then_hit(self):
+        cache = StructureCache()
+        structure = make_structure()
+
+        self.assertIsNone(cache.get(structure['_id']))
+        cache.set(structure['_id'], structure)
+        self.assertIs(cache.get(structure['_id']), structure)
+        self.assertEqual(cache.stats()['hits'], 1)
+        self.assertEqual(cache.stats()['misses'], 1)
+
+    def test_lru_eviction_by_size(self):
+        structures = [make_structure(10) for __ in range(3)]
+        cache = StructureCache(max_bytes=10 ** 9)
+        cache.set(structures[0]['_id'], structures[0])
+        size = cache.current_bytes
+
+        # Room for two structures only
+        cache = StructureCache(max_bytes=size * 2 + size / 2)
+        cache.set(structures[0]['_id'], structures[0])
+        cache.set(structures[1]['_id'], structures[1])
+        # Touch the first so the second becomes least recently used
+        cache.get(structures[0]['_id'])
+        cache.set(structures[2]['_id'], structures[2])
+
+        self.assertIn(structures[0]['_id'], cache)
+        self.assertNotIn(structures[1]['_id'], cache)
+        self.assertIn(structures[2]['_id'], cache)
+        self.assertEqual(cache.stats()['evictions'], 1)
+        self.assertLessEqual(cache.current_bytes, cache.max_bytes)
+
+    def test_oversized_structure_not_kept_locally(self):
+        cache = StructureCache(max_bytes=1)
+        structure = make_structure()
+        cache.set(structure['_id'], structure)
+        self.assertEqual(len(cache), 0)
+
+    def test_shared_tier(self):
+        shared = DictCache()
+        structure = make_structure(3)
+        StructureCache(shared_cache=shared).set(structure['_id'], structure)
+
+        # A different process, with nothing cached locally
+        cache = StructureCache(shared_cache=shared)
+        cached = cache.get(structure['_id'])
+        self.assertEqual(cached['_id'], structure['_id'])
+        self.assertEqual(cached['root'], structure['root'])
+        self.assertItemsEqual(cached['blocks'].keys(), structure['blocks'].keys())
+        self.assertEqual(cache.stats()['shared_hits'], 1)
+        # ... and now it is held in process
+        self.assertIn(structure['_id'], cache)
+
+    def test_broken_shared_tier(self):
+        shared = MagicMock()
+        shared.get.side_effect = Exception
+        shared.set.side_effect = Exception
+        cache = StructureCache(shared_cache=shared)
+        structure = make_structure()
+        cache.set(structure['_id'], structure)
+        self.assertIs(cache.get(structure['_id']), structure)
+        cache.clear()
+        self.assertIsNone(cache.get(structure['_id']))
+
+
+class TestMongoConnectionStructureCache(unittest.TestCase):
+    """
+    Tests that MongoConnection reads structures through its structure cache.
+    """
+    def setUp(self):
+        super(TestMongoConnectionStructureCache, self).setUp()
+        with patch('xmodule.modulestore.split_mongo.mongo_connection.pymongo'):
+            with patch('xmodule.modulestore.split_mongo.mongo_connection.MongoProxy') as proxy:
+                self.collections = {}
+                proxy.return_value.__getitem__.side_effect = lambda name: self.collections.setdefault(
+                    name, MagicMock(name=name)
+                )
+                self.connection = MongoConnection(
+                    'db', 'modulestore', 'localhost', structure_cache=StructureCache()
+                )
+        self.structures = self.collections['modulestore.structures']
+
+    def raw_structure(self):
+        """
+        Return a structure document as it is stored in mongo.
+        """
+        return {
+            '_id': ObjectId(),
+            'root': ['course', 'course'],
+            'blocks': [{'block_type': 'course', 'block_id': 'course', 'fields': {}, 'edit_info': {}}],
+        }
+
+    def test_get_structure_reads_once(self):
+        raw = self.raw_structure()
+        self.structures.find_one.return_value = raw
+        first = self.connection.get_structure(raw['_id'])
+        second = self.connection.get_structure(raw['_id'])
+        self.assertIs(first, second)
+        self.assertEqual(self.structures.find_one.call_count, 1)
+
+    def test_find_structures_by_id_only_queries_misses(self):
+        cached = self.raw_structure()
+        self.structures.find_one.return_value = cached
+        self.connection.get_structure(cached['_id'])
+
+        missing = self.raw_structure()
+        self.structures.find.return_value = [missing]
+        result = self.connection.find_structures_by_id([cached['_id'], missing['_id']])
+
+        self.assertItemsEqual([structure['_id'] for structure in result], [cached['_id'], missing['_id']])
+        self.structures.find.assert_called_once_with({'_id': {'$in': [missing['_id']]}})
@@ -828,6 +828,14 @@ class XMLModuleStore(ModuleStoreReadBase):
         """
         return self.courses.values()
 
+    def get_courses_by_keys(self, course_keys, depth=0, **kwargs):
+        """
+        Returns a dict mapping each of `course_keys` to its course descriptor, or None
+        if there's no such course.
+        """
+        courses = {course.id: course for course in self.get_courses()}
+        return {course_key: courses.get(course_key) for course_key in course_keys}
+
     def get_errored_courses(self):
         """
         Return a dictionary of course_dir -> [(msg, exception_str)], for each
@@ -20,8 +20,12 @@ Modulestore virtual   |          XML physical (draft, published)
              (a, a)   |  (a, a) | (x, a) | (x, x) | (x, y) | (a, x)
              (a, b)   |  (a, b) | (x, b) | (x, x) | (x, y) | (a, x)
 """
+import hashlib
 import logging
+import time
 from abc import abstractmethod
+from contextlib import contextmanager
+from multiprocessing.pool import ThreadPool
 from opaque_keys.edx.locator import LibraryLocator
 import os
 import mimetypes
@@ -53,9 +57,22 @@ from xmodule.modulestore.tests.utils import LocationMixin
 log = logging.getLogger(__name__)
 
 
+# The number of static files which are read and uploaded to the content store at the same time
+STATIC_CONTENT_IMPORT_WORKERS = 4
+
+
 def import_static_content(
         course_data_path, static_content_store,
         target_id, subpath='static', verbose=False):
+    """
+    Import the files under course_data_path/subpath into static_content_store as
+    assets of target_id, and return a dict mapping their paths under subpath to
+    their asset keys.
+
+    The files are read and uploaded by a pool of STATIC_CONTENT_IMPORT_WORKERS
+    threads. Files which the store already has with the same content (by md5) and
+    attributes, as when a course is imported again, aren't uploaded again.
+    """
 
     remap_dict = {}
 
@@ -75,6 +92,7 @@ def import_static_content(
     mimetypes.add_type('application/octet-stream', '.srt')
     mimetypes_list = mimetypes.types_map.values()
 
+    assets_to_import = []
     for dirname, _, filenames in os.walk(static_dir):
         for filename in filenames:
 
@@ -85,20 +103,6 @@ def import_static_content(
                     log.debug('skipping static content %s...', content_path)
                 continue
 
-            if verbose:
-                log.debug('importing static content %s...', content_path)
-
-            try:
-                with open(content_path, 'rb') as f:
-                    data = f.read()
-            except IOError:
-                if filename.startswith('._'):
-                    # OS X "companion files". See
-                    # http://www.diigo.com/annotated/0c936fda5da4aa1159c189cea227e174
-                    continue
-                # Not a 'hidden file', then re-raise exception
-                raise
-
             # strip away leading path from the name
             fullname_with_subpath = content_path.replace(static_dir, '')
             if fullname_with_subpath.startswith('/'):
@@ -113,27 +117,81 @@ def import_static_content(
             # Check extracted contentType in list of all valid mimetypes
             if not mime_type or mime_type not in mimetypes_list:
                 mime_type = mimetypes.guess_type(filename)[0]   # Assign guessed mimetype
-            content = StaticContent(
-                asset_key, displayname, mime_type, data,
-                import_path=fullname_with_subpath, locked=locked
-            )
 
-            # first let's save a thumbnail so we can get back a thumbnail location
-            thumbnail_content, thumbnail_location = static_content_store.generate_thumbnail(content)
+            assets_to_import.append((content_path, fullname_with_subpath, asset_key, displayname, mime_type, locked))
 
-            if thumbnail_content is not None:
-                content.thumbnail_location = thumbnail_location
+    if not assets_to_import:
+        return remap_dict
 
-            # then commit the content
-            try:
-                static_content_store.save(content)
-            except Exception as err:
-                log.exception(u'Error importing {0}, error={1}'.format(
-                    fullname_with_subpath, err
-                ))
+    existing_assets = {
+        asset['asset_key']: asset
+        for asset in static_content_store.get_all_content_for_course(target_id)[0]
+    }
+
+    def import_asset(asset_to_import):
+        """
+        Read and upload one static file, unless the store already has it. Returns
+        whether the file was imported, or False for unreadable OS X companion files.
+        """
+        content_path, fullname_with_subpath, asset_key, displayname, mime_type, locked = asset_to_import
+        if verbose:
+            log.debug('importing static content %s...', content_path)
 
+        try:
+            with open(content_path, 'rb') as f:
+                data = f.read()
+        except IOError:
+            if os.path.basename(content_path).startswith('._'):
+                # OS X "companion files". See
+                # http://www.diigo.com/annotated/0c936fda5da4aa1159c189cea227e174
+                return False
+            # Not a 'hidden file', then re-raise exception
+            raise
+
+        existing_asset = existing_assets.get(asset_key)
+        if existing_asset is not None and (
+                existing_asset.get('md5') == hashlib.md5(data).hexdigest() and
+                existing_asset.get('displayname') == displayname and
+                existing_asset.get('contentType') == mime_type and
+                existing_asset.get('locked', False) == locked and
+                existing_asset.get('import_path') == fullname_with_subpath
+        ):
+            if verbose:
+                log.debug('static content %s is unchanged, skipping upload', content_path)
+            return True
+
+        content = StaticContent(
+            asset_key, displayname, mime_type, data,
+            import_path=fullname_with_subpath, locked=locked
+        )
+
+        # first let's save a thumbnail so we can get back a thumbnail location
+        thumbnail_content, thumbnail_location = static_content_store.generate_thumbnail(content)
+
+        if thumbnail_content is not None:
+            content.thumbnail_location = thumbnail_location
+
+        # then commit the content
+        try:
+            static_content_store.save(content)
+        except Exception as err:
+            log.exception(u'Error importing {0}, error={1}'.format(
+                fullname_with_subpath, err
+            ))
+        return True
+
+    pool = ThreadPool(min(STATIC_CONTENT_IMPORT_WORKERS, len(assets_to_import)))
+    try:
+        imported = pool.map(import_asset, assets_to_import)
+    finally:
+        pool.close()
+        pool.join()
+
+    for asset_to_import, was_imported in zip(assets_to_import, imported):
+        if was_imported:
             # store the remapping information which will be needed
             # to subsitute in the module data
+            __, fullname_with_subpath, asset_key, __, __, __ = asset_to_import
             remap_dict[fullname_with_subpath] = asset_key
 
     return remap_dict
@@ -416,6 +474,17 @@ class ImportManager(object):
                 runtime=courselike.runtime,
             )
 
+    @contextmanager
+    def import_stage(self, dest_id, stage):
+        """
+        Log the start and the duration of a stage of the import into dest_id, so
+        that the progress of the imports of big courselikes can be followed.
+        """
+        log.info(u"Import %s: %s...", dest_id, stage)
+        start_time = time.time()
+        yield
+        log.info(u"Import %s: %s done in %.2f seconds", dest_id, stage, time.time() - start_time)
+
     def run_imports(self):
         """
         Iterate over the given directories and yield courses.
@@ -430,16 +499,20 @@ class ImportManager(object):
             # This bulk operation wraps all the operations to populate the published branch.
             with self.store.bulk_operations(dest_id):
                 # Retrieve the course itself.
-                source_courselike, courselike, data_path = self.get_courselike(courselike_key, runtime, dest_id)
+                with self.import_stage(dest_id, 'importing the courselike block'):
+                    source_courselike, courselike, data_path = self.get_courselike(courselike_key, runtime, dest_id)
 
                 # Import all static pieces.
-                self.import_static(data_path, dest_id)
+                with self.import_stage(dest_id, 'importing static content'):
+                    self.import_static(data_path, dest_id)
 
                 # Import asset metadata stored in XML.
-                self.import_asset_metadata(data_path, dest_id)
+                with self.import_stage(dest_id, 'importing asset metadata'):
+                    self.import_asset_metadata(data_path, dest_id)
 
                 # Import all children
-                self.import_children(source_courselike, courselike, courselike_key, dest_id)
+                with self.import_stage(dest_id, 'importing children'):
+                    self.import_children(source_courselike, courselike, courselike_key, dest_id)
 
             # This bulk operation wraps all the operations to populate the draft branch with any items
             # from the /drafts subdirectory.
@@ -448,7 +521,8 @@ class ImportManager(object):
             # and then publishing it.
             with self.store.bulk_operations(dest_id):
                 # Import all draft items into the courselike.
-                courselike = self.import_drafts(courselike, courselike_key, data_path, dest_id)
+                with self.import_stage(dest_id, 'importing drafts'):
+                    courselike = self.import_drafts(courselike, courselike_key, data_path, dest_id)
 
             yield courselike
 
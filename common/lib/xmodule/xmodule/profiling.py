@@ -0,0 +1,145 @@
+"""
+Counters and timings of the hot paths of a request (modulestore queries,
+FieldDataCache queries, sandboxed code, template rendering...), to tell what
+a slow request spent its time on without attaching a profiler.
+
+The code on those paths reports its work with `record`, `profiled` or
+`profiled_function`, which do nothing unless a profile was started for the
+current thread with `start_profile`, as the request profiler middleware of
+the LMS does for the requests it samples. Timings are inclusive: the time of
+a template rendered inside another template counts for both.
+"""
+from collections import defaultdict
+from contextlib import contextmanager
+from functools import wraps
+import threading
+import time
+
+_profiles = threading.local()  # pylint: disable=invalid-name
+
+
+class RequestProfile(object):
+    """
+    The number of times each hot path was taken during a request, and the time spent in it.
+    """
+    def __init__(self):
+        self.start_time = time.time()
+        # name -> number of calls
+        self.counts = defaultdict(int)
+        # name -> seconds spent
+        self.seconds = defaultdict(float)
+
+    def record(self, name, seconds=0.0, count=1):
+        """
+        Record `count` calls of `name`, which took `seconds`.
+        """
+        self.counts[name] += count
+        self.seconds[name] += seconds
+
+    def elapsed(self):
+        """
+        Return the number of seconds since the profile was started.
+        """
+        return time.time() - self.start_time
+
+    def summary(self):
+        """
+        Return a dict mapping each name to the number of calls and the milliseconds spent in them.
+        """
+        return {
+            name: {'count': count, 'ms': round(self.seconds[name] * 1000, 3)}
+            for name, count in self.counts.iteritems()
+        }
+
+
+def start_profile():
+    """
+    Start a new profile for the current thread, replacing any previous one, and return it.
+    """
+    _profiles.current = RequestProfile()
+    return _profiles.current
+
+
+def stop_profile():
+    """
+    Stop profiling the current thread, and return its profile, or None if none was started.
+    """
+    profile = current_profile()
+    _profiles.current = None
+    return profile
+
+
+def current_profile():
+    """
+    Return the profile of the current thread, or None if it isn't being profiled.
+    """
+    return getattr(_profiles, 'current', None)
+
+
+def record(name, seconds=0.0, count=1):
+    """
+    Record `count` calls of `name`, which took `seconds`, if the current thread is being profiled.
+    """
+    profile = current_profile()
+    if profile is not None:
+        profile.record(name, seconds, count)
+
+
+@contextmanager
+def profiled(name):
+    """
+    Record the time spent in the block as one call of `name`, if the current thread is being profiled.
+    """
+    profile = current_profile()
+    if profile is None:
+        yield
+        return
+
+    start_time = time.time()
+    try:
+        yield
+    finally:
+        profile.record(name, time.time() - start_time)
+
+
+def profiled_function(name):
+    """
+    Decorator recording each call of the function as a call of `name`, if the
+    current thread is being profiled.
+    """
+    def decorator(func):  # pylint: disable=missing-docstring
+        @wraps(func)
+        def wrapper(*args, **kwargs):  # pylint: disable=missing-docstring
+            with profiled(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+class ProfiledCollection(object):
+    """
+    A proxy of a pymongo collection which records its queries and updates as
+    calls of `<name>.<method>`, if the current thread is being profiled.
+
+    Cursors are read lazily, so the time recorded for `find` doesn't include
+    fetching its results.
+    """
+    PROFILED_METHODS = frozenset([
+        'find', 'find_one', 'find_and_modify', 'count', 'insert', 'save', 'update', 'remove', 'aggregate',
+    ])
+
+    def __init__(self, collection, name):
+        self.__dict__['_collection'] = collection
+        self.__dict__['_name'] = name
+
+    def __getattr__(self, attr):
+        value = getattr(self._collection, attr)
+        if attr in self.PROFILED_METHODS:
+            return profiled_function(u'{}.{}'.format(self._name, attr))(value)
+        return value
+
+    def __setattr__(self, attr, value):
+        setattr(self._collection, attr, value)
+
+    def __getitem__(self, name):
+        return self._collection[name]
@@ -0,0 +1,203 @@
+"""
+A write-only pyfilesystem FS which writes the files put in it into a tar archive,
+so that exports can be archived as they are written instead of being written to
+a temporary directory tree which is archived afterwards.
+"""
+import tarfile
+import time
+from tempfile import SpooledTemporaryFile
+
+from fs.base import FS
+from fs.errors import (
+    DestinationExistsError, ParentDirectoryMissingError, ResourceInvalidError, ResourceNotFoundError, UnsupportedError
+)
+from fs.path import dirname, normpath, relpath
+
+# Files written with open() are kept in memory until they reach this size, then spooled to disk
+MAX_IN_MEMORY_FILE_SIZE = 1024 * 1024
+
+
+class TarWriterFS(FS):
+    """
+    A filesystem which adds every file written in it to `tar_file`, an open TarFile
+    (which can be writing a stream, as with mode 'w|gz').
+
+    Files written with open() are added to the archive when they are closed.
+    A file written again is added again, and the later entry wins when the
+    archive is extracted, as when a file is overwritten in a directory.
+    setcontents() adds a file-like object which can seek (like a GridFS file) without
+    copying it, reading it chunk by chunk, so big files are streamed into the archive.
+    Files can't be read, changed or removed once they are written.
+    """
+    _meta = {
+        'thread_safe': False,
+        'virtual': False,
+        'read_only': False,
+        'unicode_paths': True,
+        'case_insensitive_paths': False,
+        'network': False,
+        'atomic.setcontents': True,
+    }
+
+    def __init__(self, tar_file):
+        super(TarWriterFS, self).__init__()
+        self.tar_file = tar_file
+        self._dirs = set([u''])
+        self._file_sizes = {}
+
+    def __str__(self):
+        return '<TarWriterFS: %s>' % (self.tar_file.name,)
+
+    def _archive_path(self, path):
+        """
+        Return the path of `path` in the archive.
+        """
+        return relpath(normpath(path))
+
+    def _check_can_create_file(self, path):
+        """
+        Raise an error if no file can be written at `path` (an archive path).
+        """
+        if path in self._dirs:
+            raise ResourceInvalidError(path, msg="Path is a directory: %(path)s")
+        if dirname(path) not in self._dirs:
+            raise ParentDirectoryMissingError(path)
+
+    def _add_file(self, path, fileobj, size):
+        """
+        Add the `size` bytes from the current position of `fileobj` to the archive at `path`.
+        """
+        tar_info = tarfile.TarInfo(path.encode('utf-8'))
+        tar_info.size = size
+        tar_info.mtime = time.time()
+        tar_info.mode = 0644
+        self.tar_file.addfile(tar_info, fileobj)
+        self._file_sizes[path] = size
+
+    def open(self, path, mode='r', **kwargs):  # pylint: disable=arguments-differ
+        if 'r' in mode or '+' in mode or 'a' in mode:
+            raise UnsupportedError("read or append to a file in an archive being written")
+        path = self._archive_path(path)
+        self._check_can_create_file(path)
+        return _TarEntryFile(self, path)
+
+    def setcontents(self, path, data=b'', encoding=None, errors=None, chunk_size=64 * 1024):
+        """
+        Add a file with the contents `data`, a string or a file-like object, to the archive.
+        """
+        if not (hasattr(data, 'seek') and hasattr(data, 'tell')):
+            return super(TarWriterFS, self).setcontents(
+                path, data, encoding=encoding, errors=errors, chunk_size=chunk_size
+            )
+
+        path = self._archive_path(path)
+        self._check_can_create_file(path)
+        start = data.tell()
+        data.seek(0, 2)
+        size = data.tell() - start
+        data.seek(start)
+        self._add_file(path, data, size)
+        return size
+
+    def makedir(self, path, recursive=False, allow_recreate=False):
+        path = self._archive_path(path)
+        if path in self._file_sizes:
+            raise ResourceInvalidError(path, msg="Path is a file: %(path)s")
+        if path in self._dirs:
+            if not allow_recreate:
+                raise DestinationExistsError(path)
+            return
+
+        if dirname(path) not in self._dirs:
+            if not recursive:
+                raise ParentDirectoryMissingError(path)
+            self.makedir(dirname(path), recursive=True, allow_recreate=True)
+
+        tar_info = tarfile.TarInfo(path.encode('utf-8'))
+        tar_info.type = tarfile.DIRTYPE
+        tar_info.mtime = time.time()
+        tar_info.mode = 0755
+        self.tar_file.addfile(tar_info)
+        self._dirs.add(path)
+
+    def isdir(self, path):
+        return self._archive_path(path) in self._dirs
+
+    def isfile(self, path):
+        return self._archive_path(path) in self._file_sizes
+
+    def listdir(self, path="./", wildcard=None, full=False, absolute=False, dirs_only=False, files_only=False):
+        path = self._archive_path(path)
+        if path not in self._dirs:
+            raise ResourceNotFoundError(path)
+        entries = []
+        if not files_only:
+            entries.extend(d for d in self._dirs if d and dirname(d) == path)
+        if not dirs_only:
+            entries.extend(f for f in self._file_sizes if dirname(f) == path)
+        return self._listdir_helper(
+            path, [entry[len(path):].lstrip('/') for entry in entries], wildcard, full, absolute, False, False
+        )
+
+    def getinfo(self, path):
+        path = self._archive_path(path)
+        if path in self._file_sizes:
+            return {'size': self._file_sizes[path]}
+        if path in self._dirs:
+            return {'size': 0}
+        raise ResourceNotFoundError(path)
+
+    def remove(self, path):
+        raise UnsupportedError("remove a file from an archive being written")
+
+    def removedir(self, path, recursive=False, force=False):
+        raise UnsupportedError("remove a directory from an archive being written")
+
+    def rename(self, src, dst):
+        raise UnsupportedError("rename a file in an archive being written")
+
+
+class _TarEntryFile(object):
+    """
+    A file being written in a TarWriterFS, which is added to its archive when closed.
+    """
+    def __init__(self, tar_fs, path):
+        self.tar_fs = tar_fs
+        self.path = path
+        self.closed = False
+        self._buffer = SpooledTemporaryFile(max_size=MAX_IN_MEMORY_FILE_SIZE)
+
+    def write(self, data):
+        if isinstance(data, unicode):
+            data = data.encode('utf-8')
+        self._buffer.write(data)
+
+    def writelines(self, lines):
+        for line in lines:
+            self.write(line)
+
+    def flush(self):
+        pass
+
+    def tell(self):
+        return self._buffer.tell()
+
+    def close(self):
+        """
+        Add the written file to the archive.
+        """
+        if self.closed:
+            return
+        self.closed = True
+        size = self._buffer.tell()
+        self._buffer.seek(0)
+        try:
+            self.tar_fs._add_file(self.path, self._buffer, size)  # pylint: disable=protected-access
+        finally:
+            self._buffer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
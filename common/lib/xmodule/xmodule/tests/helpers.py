@@ -24,3 +24,17 @@ def directories_equal(directory1, directory2):
         return True
 
     return compare_dirs(path(directory1), path(directory2))
+
+
+class DictCache(object):
+    """
+    A minimal stand-in for a django cache, which keeps its values in a dict.
+    """
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, timeout=None):  # pylint: disable=unused-argument
+        self.data[key] = value
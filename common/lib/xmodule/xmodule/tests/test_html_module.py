@@ -53,6 +53,15 @@ class HtmlModuleSubstitutionTestCase(unittest.TestCase):
         module = HtmlModule(self.descriptor, module_system, field_data, Mock())
         self.assertEqual(module.get_html(), sample_xml)
 
+    def test_user_independent_view(self):
+        module_system = get_test_system()
+        module = HtmlModule(self.descriptor, module_system, DictFieldData({'data': '<p>Hi</p>'}), Mock())
+        self.assertTrue(module.has_user_independent_view('student_view'))
+        self.assertFalse(module.has_user_independent_view('author_view'))
+
+        module = HtmlModule(self.descriptor, module_system, DictFieldData({'data': '%%USER_ID%%'}), Mock())
+        self.assertFalse(module.has_user_independent_view('student_view'))
+
 
 class HtmlDescriptorIndexingTestCase(unittest.TestCase):
     """
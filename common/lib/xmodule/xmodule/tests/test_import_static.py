@@ -1,6 +1,7 @@
 """
 Tests that check that we ignore the appropriate files when importing courses.
 """
+import hashlib
 import unittest
 from mock import Mock
 from xmodule.modulestore.xml_importer import import_static_content
@@ -15,6 +16,7 @@ class IgnoredFilesTestCase(unittest.TestCase):
         course_id = SlashSeparatedCourseKey("edX", "tilde", "Fall_2012")
         content_store = Mock()
         content_store.generate_thumbnail.return_value = ("content", "location")
+        content_store.get_all_content_for_course.return_value = ([], 0)
         import_static_content(course_dir, content_store, course_id)
         saved_static_content = [call[0][0] for call in content_store.save.call_args_list]
         name_val = {sc.name: sc.data for sc in saved_static_content}
@@ -30,6 +32,7 @@ class IgnoredFilesTestCase(unittest.TestCase):
         course_id = SlashSeparatedCourseKey("edX", "dot-underscore", "2014_Fall")
         content_store = Mock()
         content_store.generate_thumbnail.return_value = ("content", "location")
+        content_store.get_all_content_for_course.return_value = ([], 0)
         import_static_content(course_dir, content_store, course_id)
         saved_static_content = [call[0][0] for call in content_store.save.call_args_list]
         name_val = {sc.name: sc.data for sc in saved_static_content}
@@ -39,3 +42,31 @@ class IgnoredFilesTestCase(unittest.TestCase):
         self.assertNotIn(".DS_Store", name_val)
         self.assertIn("GREEN", name_val["example.txt"])
         self.assertIn("BLUE", name_val[".example.txt"])
+
+    def test_skip_unchanged_static_files(self):
+        """
+        Test that files which the content store already has unchanged aren't uploaded again
+        """
+        course_dir = DATA_DIR / "tilde"
+        course_id = SlashSeparatedCourseKey("edX", "tilde", "Fall_2012")
+        content_store = Mock()
+        content_store.generate_thumbnail.return_value = ("content", "location")
+        content_store.get_all_content_for_course.return_value = ([], 0)
+        remap_dict = import_static_content(course_dir, content_store, course_id)
+        saved_static_content = [call[0][0] for call in content_store.save.call_args_list]
+        self.assertEqual(len(saved_static_content), len(remap_dict))
+
+        content_store.save.reset_mock()
+        content_store.get_all_content_for_course.return_value = ([
+            {
+                'asset_key': sc.location,
+                'md5': hashlib.md5(sc.data).hexdigest(),
+                'displayname': sc.name,
+                'contentType': sc.content_type,
+                'locked': sc.locked,
+                'import_path': sc.import_path,
+            }
+            for sc in saved_static_content
+        ], len(saved_static_content))
+        self.assertEqual(import_static_content(course_dir, content_store, course_id), remap_dict)
+        self.assertFalse(content_store.save.called)
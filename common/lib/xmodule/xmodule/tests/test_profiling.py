@@ -0,0 +1,65 @@
+"""
+Tests of the per-request profiling of hot paths.
+"""
+import unittest
+
+from mock import Mock
+
+from xmodule import profiling
+
+
+class ProfilingTest(unittest.TestCase):
+    """
+    Tests of the profiles and of what records in them.
+    """
+    def setUp(self):
+        super(ProfilingTest, self).setUp()
+        self.addCleanup(profiling.stop_profile)
+
+    def test_nothing_recorded_without_profile(self):
+        profiling.record('noop')
+        with profiling.profiled('noop'):
+            pass
+        self.assertIsNone(profiling.current_profile())
+        self.assertIsNone(profiling.stop_profile())
+
+    def test_record(self):
+        profile = profiling.start_profile()
+        profiling.record('cache_hit')
+        profiling.record('cache_hit', count=2)
+        profiling.record('exec', 0.5)
+        with profiling.profiled('block'):
+            pass
+
+        self.assertIs(profiling.stop_profile(), profile)
+        self.assertIsNone(profiling.current_profile())
+        summary = profile.summary()
+        self.assertEqual(summary['cache_hit'], {'count': 3, 'ms': 0})
+        self.assertEqual(summary['exec'], {'count': 1, 'ms': 500})
+        self.assertEqual(summary['block']['count'], 1)
+
+    def test_profiled_function(self):
+        @profiling.profiled_function('double')
+        def double(value):  # pylint: disable=missing-docstring
+            return value * 2
+
+        profile = profiling.start_profile()
+        self.assertEqual(double(2), 4)
+        self.assertEqual(double(3), 6)
+        self.assertEqual(profile.counts['double'], 2)
+
+    def test_profiled_collection(self):
+        collection = Mock()
+        collection.find.return_value = ['result']
+        profiled_collection = profiling.ProfiledCollection(collection, 'mongo')
+        profiled_collection.write_concern = {'w': 1}
+        self.assertEqual(collection.write_concern, {'w': 1})
+
+        profile = profiling.start_profile()
+        self.assertEqual(profiled_collection.find({'_id': 1}), ['result'])
+        profiled_collection.find_one({'_id': 1})
+        profiled_collection.find_one({'_id': 2})
+        profiled_collection.database.connection.close()
+
+        collection.find.assert_called_once_with({'_id': 1})
+        self.assertEqual(dict(profile.counts), {'mongo.find': 1, 'mongo.find_one': 2})
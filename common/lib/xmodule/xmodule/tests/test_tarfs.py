@@ -0,0 +1,116 @@
+"""
+Tests for the TarWriterFS which writes exports into tar archives.
+"""
+from io import BytesIO
+import tarfile
+import unittest
+
+from fs.errors import DestinationExistsError, ParentDirectoryMissingError, ResourceNotFoundError, UnsupportedError
+
+from xmodule.tarfs import TarWriterFS
+
+
+class ReadRecordingBytesIO(BytesIO):
+    """
+    A BytesIO which records the number of bytes asked for by each read.
+    """
+    def __init__(self, *args, **kwargs):
+        super(ReadRecordingBytesIO, self).__init__(*args, **kwargs)
+        self.read_sizes = []
+
+    def read(self, size=-1):
+        self.read_sizes.append(size)
+        return super(ReadRecordingBytesIO, self).read(size)
+
+
+class TestTarWriterFS(unittest.TestCase):
+    """
+    Test writing files and directories into an archive with a TarWriterFS.
+    """
+    def setUp(self):
+        super(TestTarWriterFS, self).setUp()
+        self.archive = BytesIO()
+        self.tar_file = tarfile.open(fileobj=self.archive, mode='w')
+        self.tar_fs = TarWriterFS(self.tar_file)
+
+    def read_archive(self):
+        """
+        Close the archive being written, and return a TarFile reading it.
+        """
+        self.tar_file.close()
+        self.archive.seek(0)
+        return tarfile.open(fileobj=self.archive, mode='r')
+
+    def test_open_and_setcontents(self):
+        with self.tar_fs.open('course.xml', 'w') as course_file:
+            course_file.write(u'<course/>')
+        self.tar_fs.setcontents('about.html', b'<p>About</p>')
+
+        archive = self.read_archive()
+        self.assertEqual(archive.getnames(), ['course.xml', 'about.html'])
+        self.assertEqual(archive.extractfile('course.xml').read(), b'<course/>')
+        self.assertEqual(archive.extractfile('about.html').read(), b'<p>About</p>')
+
+    def test_write_same_path_twice(self):
+        self.tar_fs.setcontents('course.xml', b'<course/>')
+        self.tar_fs.setcontents('course.xml', b'<course url_name="2014"/>')
+        self.assertEqual(self.tar_fs.getinfo('course.xml'), {'size': len(b'<course url_name="2014"/>')})
+
+        # Both are in the archive, and the later one is extracted
+        archive = self.read_archive()
+        self.assertEqual(archive.getnames(), ['course.xml', 'course.xml'])
+        self.assertEqual(archive.extractfile('course.xml').read(), b'<course url_name="2014"/>')
+
+    def test_makedir(self):
+        with self.assertRaises(ParentDirectoryMissingError):
+            self.tar_fs.makedir('static/images')
+        with self.assertRaises(ParentDirectoryMissingError):
+            self.tar_fs.setcontents('static/images/logo.png', b'png')
+
+        self.tar_fs.makedir('static/images', recursive=True)
+        self.assertTrue(self.tar_fs.isdir('static'))
+        self.assertTrue(self.tar_fs.isdir('static/images'))
+        with self.assertRaises(DestinationExistsError):
+            self.tar_fs.makedir('static')
+        self.tar_fs.makedir('static', allow_recreate=True)
+        self.tar_fs.setcontents('static/images/logo.png', b'png')
+
+        archive = self.read_archive()
+        self.assertEqual(archive.getnames(), ['static', 'static/images', 'static/images/logo.png'])
+        self.assertTrue(archive.getmember('static/images').isdir())
+
+    def test_listdir_and_getinfo(self):
+        self.tar_fs.makedir('static/images', recursive=True)
+        self.tar_fs.setcontents('static/handouts.pdf', b'pdf')
+        self.tar_fs.setcontents('static/images/logo.png', b'png!')
+
+        self.assertEqual(sorted(self.tar_fs.listdir('static')), ['handouts.pdf', 'images'])
+        self.assertEqual(self.tar_fs.listdir('static', dirs_only=True), ['images'])
+        self.assertEqual(self.tar_fs.listdir('static', files_only=True), ['handouts.pdf'])
+        self.assertEqual(self.tar_fs.listdir('/'), ['static'])
+        with self.assertRaises(ResourceNotFoundError):
+            self.tar_fs.listdir('policies')
+
+        self.assertEqual(self.tar_fs.getinfo('static/images/logo.png'), {'size': 4})
+        self.assertEqual(self.tar_fs.getinfo('static/images'), {'size': 0})
+        with self.assertRaises(ResourceNotFoundError):
+            self.tar_fs.getinfo('static/syllabus.pdf')
+
+    def test_setcontents_streams_file(self):
+        data = b'0123456789' * 10000
+        asset_file = ReadRecordingBytesIO(b'header' + data)
+        asset_file.seek(len(b'header'))
+        self.assertEqual(self.tar_fs.setcontents('asset.bin', asset_file), len(data))
+
+        # The file is read in chunks, from its current position
+        self.assertTrue(asset_file.read_sizes)
+        self.assertLess(max(asset_file.read_sizes), len(data))
+        self.assertNotIn(-1, asset_file.read_sizes)
+        self.assertEqual(self.read_archive().extractfile('asset.bin').read(), data)
+
+    def test_read_unsupported(self):
+        self.tar_fs.setcontents('course.xml', b'<course/>')
+        with self.assertRaises(UnsupportedError):
+            self.tar_fs.open('course.xml', 'r')
+        with self.assertRaises(UnsupportedError):
+            self.tar_fs.remove('course.xml')
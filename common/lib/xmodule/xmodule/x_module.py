@@ -40,6 +40,7 @@ log = logging.getLogger(__name__)
 
 XMODULE_METRIC_NAME = 'edxapp.xmodule'
 XMODULE_DURATION_METRIC_NAME = XMODULE_METRIC_NAME + '.duration'
+XMODULE_FRAGMENT_CACHE_METRIC_NAME = XMODULE_METRIC_NAME + '.fragment_cache'
 XMODULE_METRIC_SAMPLE_RATE = 0.1
 
 # Stats event sent to DataDog in order to determine if old XML parsing can be deprecated.
@@ -508,6 +509,17 @@ class XModuleMixin(XModuleFields, XBlockMixin):
         """
         return False
 
+    def has_user_independent_view(self, view_name):  # pylint: disable=unused-argument
+        """
+        Returns True if the view `view_name` of this block renders the same
+        fragment for every user and request, as long as the block isn't edited,
+        so that the runtime can cache it.
+
+        The view must not use the student's state, identity or anything else
+        about the request. Blocks opt in by overriding this.
+        """
+        return False
+
     # Functions used in the LMS
 
     def get_score(self):
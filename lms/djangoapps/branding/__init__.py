@@ -4,19 +4,24 @@ from django.conf import settings
 
 from opaque_keys.edx.locations import SlashSeparatedCourseKey
 from microsite_configuration import microsite
+from openedx.core.djangoapps.content.course_overviews.models import CourseOverview
 
 
 def get_visible_courses():
     """
-    Return the set of CourseDescriptors that should be visible in this branded instance
+    Return the set of CourseDescriptors (or CourseOverviews, if they are enabled for the
+    catalog) that should be visible in this branded instance
     """
 
     filtered_by_org = microsite.get_value('course_org_filter')
 
-    _courses = modulestore().get_courses(org=filtered_by_org)
+    if settings.FEATURES.get('ENABLE_COURSE_OVERVIEWS_IN_CATALOG'):
+        courses = CourseOverview.get_all_courses(org=filtered_by_org)
+    else:
+        _courses = modulestore().get_courses(org=filtered_by_org)
 
-    courses = [c for c in _courses
-               if isinstance(c, CourseDescriptor)]
+        courses = [c for c in _courses
+                   if isinstance(c, CourseDescriptor)]
     courses = sorted(courses, key=lambda course: course.number)
 
     subdomain = microsite.get_value('subdomain', 'default')
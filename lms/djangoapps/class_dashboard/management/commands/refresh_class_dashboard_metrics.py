@@ -0,0 +1,53 @@
+"""
+Command to bring the aggregates which the Metrics tab displays up to date, meant to be run periodically.
+"""
+import logging
+from optparse import make_option
+
+from django.core.management.base import BaseCommand
+from opaque_keys.edx.keys import CourseKey
+from xmodule.modulestore.django import modulestore
+
+from class_dashboard.models import CourseMetricsRefresh
+
+
+log = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    args = '<course_id course_id ...>'
+    help = 'Refreshes the Metrics tab aggregates of one or more courses.'
+
+    option_list = BaseCommand.option_list + (
+        make_option('--all',
+                    action='store_true',
+                    default=False,
+                    help='Refresh the aggregates of all courses.'),
+        make_option('--rebuild',
+                    action='store_true',
+                    default=False,
+                    help='Count all the StudentModules of the courses again, not only those modified or deleted '
+                         'since the last refresh.'),
+    )
+
+    def handle(self, *args, **options):
+
+        if options['all']:
+            course_keys = [course.id for course in modulestore().get_courses()]
+        else:
+            course_keys = [CourseKey.from_string(arg) for arg in args]
+
+        if not course_keys:
+            log.fatal('No courses specified.')
+            return
+
+        log.info('Refreshing the metrics of %d courses.', len(course_keys))
+
+        for course_key in course_keys:
+            try:
+                CourseMetricsRefresh.refresh(course_key, rebuild=options['rebuild'])
+            except Exception as ex:  # pylint: disable=broad-except
+                log.exception('An error occurred while refreshing the metrics of %s: %s',
+                              unicode(course_key), ex.message)
+
+        log.info('Finished refreshing metrics.')
@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+import datetime
+from south.db import db
+from south.v2 import SchemaMigration
+from django.db import models
+
+
+class Migration(SchemaMigration):
+
+    def forwards(self, orm):
+        # Adding model 'CourseMetricsRefresh'
+        db.create_table('class_dashboard_coursemetricsrefresh', (
+            ('course_id', self.gf('xmodule_django.models.CourseKeyField')(max_length=255, primary_key=True)),
+            ('refreshed_up_to', self.gf('django.db.models.fields.DateTimeField')()),
+            ('refreshed_at', self.gf('django.db.models.fields.DateTimeField')()),
+        ))
+        db.send_create_signal('class_dashboard', ['CourseMetricsRefresh'])
+
+        # Adding model 'ProblemGradeCount'
+        db.create_table('class_dashboard_problemgradecount', (
+            ('id', self.gf('django.db.models.fields.AutoField')(primary_key=True)),
+            ('course_id', self.gf('xmodule_django.models.CourseKeyField')(max_length=255, db_index=True)),
+            ('module_state_key', self.gf('xmodule_django.models.LocationKeyField')(max_length=255, db_index=True)),
+            ('grade', self.gf('django.db.models.fields.FloatField')()),
+            ('max_grade', self.gf('django.db.models.fields.FloatField')(null=True)),
+            ('count', self.gf('django.db.models.fields.IntegerField')()),
+        ))
+        db.send_create_signal('class_dashboard', ['ProblemGradeCount'])
+
+        # Adding model 'SequentialOpenCount'
+        db.create_table('class_dashboard_sequentialopencount', (
+            ('id', self.gf('django.db.models.fields.AutoField')(primary_key=True)),
+            ('course_id', self.gf('xmodule_django.models.CourseKeyField')(max_length=255, db_index=True)),
+            ('module_state_key', self.gf('xmodule_django.models.LocationKeyField')(max_length=255)),
+            ('count', self.gf('django.db.models.fields.IntegerField')()),
+        ))
+        db.send_create_signal('class_dashboard', ['SequentialOpenCount'])
+
+
+    def backwards(self, orm):
+        # Deleting model 'CourseMetricsRefresh'
+        db.delete_table('class_dashboard_coursemetricsrefresh')
+
+        # Deleting model 'ProblemGradeCount'
+        db.delete_table('class_dashboard_problemgradecount')
+
+        # Deleting model 'SequentialOpenCount'
+        db.delete_table('class_dashboard_sequentialopencount')
+
+
+    models = {
+        'class_dashboard.coursemetricsrefresh': {
+            'Meta': {'object_name': 'CourseMetricsRefresh'},
+            'course_id': ('xmodule_django.models.CourseKeyField', [], {'max_length': '255', 'primary_key': 'True'}),
+            'refreshed_at': ('django.db.models.fields.DateTimeField', [], {}),
+            'refreshed_up_to': ('django.db.models.fields.DateTimeField', [], {})
+        },
+        'class_dashboard.problemgradecount': {
+            'Meta': {'object_name': 'ProblemGradeCount'},
+            'count': ('django.db.models.fields.IntegerField', [], {}),
+            'course_id': ('xmodule_django.models.CourseKeyField', [], {'max_length': '255', 'db_index': 'True'}),
+            'grade': ('django.db.models.fields.FloatField', [], {}),
+            'id': ('django.db.models.fields.AutoField', [], {'primary_key': 'True'}),
+            'max_grade': ('django.db.models.fields.FloatField', [], {'null': 'True'}),
+            'module_state_key': ('xmodule_django.models.LocationKeyField', [], {'max_length': '255', 'db_index': 'True'})
+        },
+        'class_dashboard.sequentialopencount': {
+            'Meta': {'object_name': 'SequentialOpenCount'},
+            'count': ('django.db.models.fields.IntegerField', [], {}),
+            'course_id': ('xmodule_django.models.CourseKeyField', [], {'max_length': '255', 'db_index': 'True'}),
+            'id': ('django.db.models.fields.AutoField', [], {'primary_key': 'True'}),
+            'module_state_key': ('xmodule_django.models.LocationKeyField', [], {'max_length': '255'})
+        }
+    }
+
+    complete_apps = ['class_dashboard']
@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+import datetime
+from south.db import db
+from south.v2 import SchemaMigration
+from django.db import models
+
+
+class Migration(SchemaMigration):
+
+    def forwards(self, orm):
+        # Adding model 'StaleMetricsBlock'
+        db.create_table('class_dashboard_stalemetricsblock', (
+            ('id', self.gf('django.db.models.fields.AutoField')(primary_key=True)),
+            ('course_id', self.gf('xmodule_django.models.CourseKeyField')(max_length=255, db_index=True)),
+            ('module_state_key', self.gf('xmodule_django.models.LocationKeyField')(max_length=255)),
+            ('module_type', self.gf('django.db.models.fields.CharField')(max_length=32)),
+            ('deleted_at', self.gf('django.db.models.fields.DateTimeField')(auto_now_add=True, blank=True)),
+        ))
+        db.send_create_signal('class_dashboard', ['StaleMetricsBlock'])
+
+
+    def backwards(self, orm):
+        # Deleting model 'StaleMetricsBlock'
+        db.delete_table('class_dashboard_stalemetricsblock')
+
+
+    models = {
+        'class_dashboard.coursemetricsrefresh': {
+            'Meta': {'object_name': 'CourseMetricsRefresh'},
+            'course_id': ('xmodule_django.models.CourseKeyField', [], {'max_length': '255', 'primary_key': 'True'}),
+            'refreshed_at': ('django.db.models.fields.DateTimeField', [], {}),
+            'refreshed_up_to': ('django.db.models.fields.DateTimeField', [], {})
+        },
+        'class_dashboard.problemgradecount': {
+            'Meta': {'object_name': 'ProblemGradeCount'},
+            'count': ('django.db.models.fields.IntegerField', [], {}),
+            'course_id': ('xmodule_django.models.CourseKeyField', [], {'max_length': '255', 'db_index': 'True'}),
+            'grade': ('django.db.models.fields.FloatField', [], {}),
+            'id': ('django.db.models.fields.AutoField', [], {'primary_key': 'True'}),
+            'max_grade': ('django.db.models.fields.FloatField', [], {'null': 'True'}),
+            'module_state_key': ('xmodule_django.models.LocationKeyField', [], {'max_length': '255', 'db_index': 'True'})
+        },
+        'class_dashboard.sequentialopencount': {
+            'Meta': {'object_name': 'SequentialOpenCount'},
+            'count': ('django.db.models.fields.IntegerField', [], {}),
+            'course_id': ('xmodule_django.models.CourseKeyField', [], {'max_length': '255', 'db_index': 'True'}),
+            'id': ('django.db.models.fields.AutoField', [], {'primary_key': 'True'}),
+            'module_state_key': ('xmodule_django.models.LocationKeyField', [], {'max_length': '255'})
+        },
+        'class_dashboard.stalemetricsblock': {
+            'Meta': {'object_name': 'StaleMetricsBlock'},
+            'course_id': ('xmodule_django.models.CourseKeyField', [], {'max_length': '255', 'db_index': 'True'}),
+            'deleted_at': ('django.db.models.fields.DateTimeField', [], {'auto_now_add': 'True', 'blank': 'True'}),
+            'id': ('django.db.models.fields.AutoField', [], {'primary_key': 'True'}),
+            'module_state_key': ('xmodule_django.models.LocationKeyField', [], {'max_length': '255'}),
+            'module_type': ('django.db.models.fields.CharField', [], {'max_length': '32'})
+        }
+    }
+
+    complete_apps = ['class_dashboard']
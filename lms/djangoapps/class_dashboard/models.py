@@ -0,0 +1,234 @@
+"""
+Aggregates of the StudentModules of courses which the Metrics tab displays.
+
+Counting the grades of every problem and the students who opened every
+subsection of a course is too slow to do each time the tab is opened, so the
+counts are kept in their own tables and brought up to date incrementally: a
+refresh only counts again the problems and subsections whose StudentModules
+were modified or deleted since the previous refresh. Refreshes are done by the
+refresh_class_dashboard_metrics command and by a celery task which the tab
+queues when its aggregates are stale, never while the tab's request waits.
+"""
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.db import models, transaction
+from django.db.models import Count
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from class_dashboard.tasks import refresh_course_metrics
+from courseware.models import StudentModule, chunks
+from util.query import use_read_replica_if_available
+from xmodule_django.models import CourseKeyField, LocationKeyField
+
+# How old the aggregates of a course can be before they are refreshed when they are read
+METRICS_MAX_AGE = timedelta(minutes=15)
+
+# How long before a refresh StudentModules must have been modified to be sure to be counted by
+# it, even if it reads a read replica which lags behind or they were saved by a long transaction
+REFRESH_OVERLAP = timedelta(minutes=5)
+
+# How many blocks are counted again with one query
+REFRESH_CHUNK_SIZE = 500
+
+# The cache key added while a refresh of a course is queued, so that it is only queued once
+REFRESH_QUEUED_KEY = u'class_dashboard.refresh_queued.{}'
+
+
+class CourseMetricsRefresh(models.Model):
+    """
+    When the aggregates of a course were last refreshed.
+    """
+    course_id = CourseKeyField(max_length=255, primary_key=True)
+
+    # The StudentModules of the course modified before this time are counted in its aggregates
+    refreshed_up_to = models.DateTimeField()
+
+    # When the refresh was done
+    refreshed_at = models.DateTimeField()
+
+    def __unicode__(self):
+        return u"[CourseMetricsRefresh] {}: {}".format(self.course_id, self.refreshed_up_to)
+
+    @classmethod
+    def refresh(cls, course_key, rebuild=False):
+        """
+        Bring the aggregates of the course with key `course_key` up to date.
+
+        Only the problems and subsections with StudentModules modified since the last
+        refresh are counted again, unless `rebuild` is True or the course was never
+        refreshed. The blocks with StudentModules deleted since the last refresh (when
+        a student's state is reset) are counted again too.
+        """
+        refresh_started = timezone.now()
+        student_modules = use_read_replica_if_available(StudentModule.objects.filter(course_id=course_key))
+
+        # A StudentModule deleted shortly before the refresh may still be read from a lagging
+        # read replica, so its block is only taken off the stale ones by a later refresh
+        stale_blocks = list(StaleMetricsBlock.objects.filter(course_id=course_key))
+        counted_stale_ids = [
+            stale_block.id for stale_block in stale_blocks
+            if stale_block.deleted_at < refresh_started - REFRESH_OVERLAP
+        ]
+
+        try:
+            course_refresh = cls.objects.get(course_id=course_key)
+        except cls.DoesNotExist:
+            course_refresh = cls(course_id=course_key)
+            rebuild = True
+
+        with transaction.commit_on_success():
+            if rebuild:
+                ProblemGradeCount.count_problems(course_key, student_modules)
+                SequentialOpenCount.count_sequentials(course_key, student_modules)
+            else:
+                # The blocks with StudentModules modified since the last refresh
+                modified_keys = student_modules.filter(
+                    modified__gte=course_refresh.refreshed_up_to,
+                    module_type__in=('problem', 'sequential'),
+                ).values_list('module_type', 'module_state_key').distinct()
+                problem_keys = set()
+                sequential_keys = set()
+                for module_type, module_state_key in modified_keys:
+                    usage_key = course_key.make_usage_key_from_deprecated_string(module_state_key)
+                    (problem_keys if module_type == 'problem' else sequential_keys).add(usage_key)
+                for stale_block in stale_blocks:
+                    usage_key = stale_block.module_state_key.map_into_course(course_key)
+                    (problem_keys if stale_block.module_type == 'problem' else sequential_keys).add(usage_key)
+
+                for problem_keys_chunk in chunks(problem_keys, REFRESH_CHUNK_SIZE):
+                    ProblemGradeCount.count_problems(course_key, student_modules, problem_keys_chunk)
+                for sequential_keys_chunk in chunks(sequential_keys, REFRESH_CHUNK_SIZE):
+                    SequentialOpenCount.count_sequentials(course_key, student_modules, sequential_keys_chunk)
+
+            StaleMetricsBlock.objects.filter(id__in=counted_stale_ids).delete()
+            course_refresh.refreshed_up_to = refresh_started - REFRESH_OVERLAP
+            course_refresh.refreshed_at = refresh_started
+            course_refresh.save()
+
+    @classmethod
+    def ensure_fresh(cls, course_key):
+        """
+        Queue a refresh of the aggregates of the course with key `course_key` if they were
+        never computed or are older than METRICS_MAX_AGE. The aggregates as they are (none,
+        for a course never refreshed) are read until the refresh is done.
+        """
+        try:
+            is_fresh = cls.objects.get(course_id=course_key).refreshed_at >= timezone.now() - METRICS_MAX_AGE
+        except cls.DoesNotExist:
+            is_fresh = False
+        queued_key = REFRESH_QUEUED_KEY.format(course_key)
+        if not is_fresh and cache.add(queued_key, True, int(METRICS_MAX_AGE.total_seconds())):
+            refresh_course_metrics.delay(unicode(course_key))
+
+
+class StaleMetricsBlock(models.Model):
+    """
+    A problem or subsection of a course with a StudentModule which was deleted since it was
+    last counted. An incremental refresh only finds the blocks with modified StudentModules,
+    so it counts these again too.
+    """
+    course_id = CourseKeyField(max_length=255, db_index=True)
+    module_state_key = LocationKeyField(max_length=255)
+    module_type = models.CharField(max_length=32)
+    deleted_at = models.DateTimeField(auto_now_add=True)
+
+    def __unicode__(self):
+        return u"[StaleMetricsBlock] {}: {}".format(self.module_state_key, self.deleted_at)
+
+
+@receiver(post_delete, sender=StudentModule)
+def mark_metrics_block_stale(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    """
+    Record the block of a deleted StudentModule as stale if the Metrics tab counts it.
+    """
+    if instance.module_type in ('problem', 'sequential'):
+        StaleMetricsBlock.objects.create(
+            course_id=instance.course_id,
+            module_state_key=instance.module_state_key,
+            module_type=instance.module_type,
+        )
+
+
+class ProblemGradeCount(models.Model):
+    """
+    The number of students of a course with a grade (out of max_grade) on a problem.
+    """
+    course_id = CourseKeyField(max_length=255, db_index=True)
+    module_state_key = LocationKeyField(max_length=255, db_index=True)
+    grade = models.FloatField()
+    max_grade = models.FloatField(null=True)
+    count = models.IntegerField()
+
+    def __unicode__(self):
+        return u"[ProblemGradeCount] {}: {}/{} x {}".format(
+            self.module_state_key, self.grade, self.max_grade, self.count
+        )
+
+    @classmethod
+    def count_problems(cls, course_key, student_modules, problem_keys=None):
+        """
+        Replace the counts of the problems of the course with key `course_key` by those of
+        `student_modules` (the course's StudentModules). Only the problems with the usage
+        keys `problem_keys` are counted if they are given.
+        """
+        problem_modules = student_modules.filter(module_type='problem', grade__isnull=False)
+        existing_counts = cls.objects.filter(course_id=course_key)
+        if problem_keys is not None:
+            problem_modules = problem_modules.filter(module_state_key__in=problem_keys)
+            existing_counts = existing_counts.filter(module_state_key__in=problem_keys)
+
+        grade_counts = problem_modules.values('module_state_key', 'grade', 'max_grade').annotate(
+            count_grade=Count('grade')
+        )
+        existing_counts.delete()
+        cls.objects.bulk_create([
+            cls(
+                course_id=course_key,
+                module_state_key=course_key.make_usage_key_from_deprecated_string(row['module_state_key']),
+                grade=row['grade'],
+                max_grade=row['max_grade'],
+                count=row['count_grade'],
+            )
+            for row in grade_counts
+        ])
+
+
+class SequentialOpenCount(models.Model):
+    """
+    The number of students of a course who opened a subsection.
+    """
+    course_id = CourseKeyField(max_length=255, db_index=True)
+    module_state_key = LocationKeyField(max_length=255)
+    count = models.IntegerField()
+
+    def __unicode__(self):
+        return u"[SequentialOpenCount] {}: {}".format(self.module_state_key, self.count)
+
+    @classmethod
+    def count_sequentials(cls, course_key, student_modules, sequential_keys=None):
+        """
+        Replace the counts of the subsections of the course with key `course_key` by those of
+        `student_modules` (the course's StudentModules). Only the subsections with the usage
+        keys `sequential_keys` are counted if they are given.
+        """
+        sequential_modules = student_modules.filter(module_type='sequential')
+        existing_counts = cls.objects.filter(course_id=course_key)
+        if sequential_keys is not None:
+            sequential_modules = sequential_modules.filter(module_state_key__in=sequential_keys)
+            existing_counts = existing_counts.filter(module_state_key__in=sequential_keys)
+
+        open_counts = sequential_modules.values('module_state_key').annotate(
+            count_sequential=Count('module_state_key')
+        )
+        existing_counts.delete()
+        cls.objects.bulk_create([
+            cls(
+                course_id=course_key,
+                module_state_key=course_key.make_usage_key_from_deprecated_string(row['module_state_key']),
+                count=row['count_sequential'],
+            )
+            for row in open_counts
+        ])
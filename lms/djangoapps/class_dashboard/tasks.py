@@ -0,0 +1,31 @@
+"""
+Celery task refreshing the aggregates which the Metrics tab displays.
+"""
+import logging
+
+from celery.task import task
+from django.core.cache import cache
+from opaque_keys.edx.keys import CourseKey
+
+
+log = logging.getLogger('edx.celery.task')
+
+
+@task(name=u'class_dashboard.tasks.refresh_course_metrics')
+def refresh_course_metrics(course_id):
+    """
+    Bring the Metrics tab aggregates of the course with ID `course_id` up to date.
+
+    The course ID is passed as a string, as course keys are not JSON-serializable.
+    """
+    # Import here to avoid circular import.
+    from class_dashboard.models import CourseMetricsRefresh, REFRESH_QUEUED_KEY
+
+    course_key = CourseKey.from_string(course_id)
+    try:
+        CourseMetricsRefresh.refresh(course_key)
+    except Exception as ex:
+        log.exception('An error occurred while refreshing the metrics of %s: %s', course_id, ex.message)
+        raise
+    finally:
+        cache.delete(REFRESH_QUEUED_KEY.format(course_key))
@@ -4,12 +4,15 @@ Tests for class dashboard (Metrics tab in instructor dashboard)
 
 import json
 
+from django.core.cache import cache
 from django.core.urlresolvers import reverse
 from django.test.client import RequestFactory
+from django.utils import timezone
 from mock import patch
 from nose.plugins.attrib import attr
 
 from capa.tests.response_xml_factory import StringResponseXMLFactory
+from courseware.models import StudentModule
 from courseware.tests.factories import StudentModuleFactory
 from student.tests.factories import UserFactory, CourseEnrollmentFactory, AdminFactory
 from xmodule.modulestore.tests.factories import CourseFactory, ItemFactory
@@ -22,6 +25,9 @@ from class_dashboard.dashboard_data import (
     get_section_display_name, get_array_section_has_problem,
     get_students_opened_subsection, get_students_problem_grades,
 )
+from class_dashboard.models import (
+    CourseMetricsRefresh, ProblemGradeCount, StaleMetricsBlock, REFRESH_OVERLAP, REFRESH_QUEUED_KEY,
+)
 from class_dashboard.views import has_instructor_access_for_class
 
 USER_COUNT = 11
@@ -158,6 +164,63 @@ class TestGetProblemGradeDistribution(ModuleStoreTestCase):
                 sum_values += problem['value']
             self.assertEquals(USER_COUNT, sum_values)
 
+    def test_aggregates_refreshed_incrementally(self):
+
+        prob_grade_distrib, __ = get_problem_grade_distribution(self.course.id)
+        self.assertEquals(
+            sorted(prob_grade_distrib[self.item.location]['grade_distrib']),
+            [(0, USER_COUNT - 1), (1, 1)]
+        )
+
+        # Fresh aggregates are read without counting again
+        with patch.object(ProblemGradeCount, 'count_problems') as mock_count_problems:
+            get_problem_grade_distribution(self.course.id)
+            self.assertFalse(mock_count_problems.called)
+
+        student_module = StudentModule.objects.get(module_state_key=self.item.location, student=self.users[-1])
+        student_module.grade = 0
+        student_module.max_grade = 0.5
+        student_module.save()
+
+        with patch.object(ProblemGradeCount, 'count_problems', wraps=ProblemGradeCount.count_problems) as mock_count:
+            CourseMetricsRefresh.refresh(self.course.id)
+            # Only the modified problem is counted again
+            self.assertEquals(mock_count.call_count, 1)
+            self.assertEquals(mock_count.call_args[0][2], [self.item.location])
+
+        prob_grade_distrib, total_student_count = get_problem_grade_distribution(self.course.id)
+        self.assertEquals(prob_grade_distrib[self.item.location]['grade_distrib'], [(0, USER_COUNT)])
+        self.assertEquals(total_student_count[self.item.location], USER_COUNT)
+
+    def test_deleted_modules_discounted(self):
+
+        get_problem_grade_distribution(self.course.id)
+        StudentModule.objects.get(module_state_key=self.item.location, student=self.users[-1]).delete()
+        self.assertEquals(StaleMetricsBlock.objects.filter(course_id=self.course.id).count(), 1)
+
+        CourseMetricsRefresh.refresh(self.course.id)
+        prob_grade_distrib, total_student_count = get_problem_grade_distribution(self.course.id)
+        self.assertEquals(prob_grade_distrib[self.item.location]['grade_distrib'], [(0, USER_COUNT - 1)])
+        self.assertEquals(total_student_count[self.item.location], USER_COUNT - 1)
+
+        # The block stays stale until a refresh can't read the deleted StudentModule from a lagging replica
+        self.assertEquals(StaleMetricsBlock.objects.filter(course_id=self.course.id).count(), 1)
+        later = timezone.now() + REFRESH_OVERLAP * 2
+        with patch('class_dashboard.models.timezone.now', return_value=later):
+            CourseMetricsRefresh.refresh(self.course.id)
+        self.assertFalse(StaleMetricsBlock.objects.filter(course_id=self.course.id).exists())
+
+    def test_refresh_queued(self):
+
+        self.addCleanup(cache.delete, REFRESH_QUEUED_KEY.format(self.course.id))
+        with patch('class_dashboard.models.refresh_course_metrics') as mock_refresh:
+            prob_grade_distrib, __ = get_problem_grade_distribution(self.course.id)
+            get_problem_grade_distribution(self.course.id)
+
+        # The aggregates are not counted while the request waits, and are only queued once
+        self.assertEquals(prob_grade_distrib, {})
+        mock_refresh.delay.assert_called_once_with(unicode(self.course.id))
+
     def test_get_students_problem_grades(self):
 
         attributes = '?module_id=' + self.item.location.to_deprecated_string()
@@ -18,14 +18,17 @@ from xblock.core import XBlock
 from xmodule.course_module import (
     CourseDescriptor, CATALOG_VISIBILITY_CATALOG_AND_ABOUT,
     CATALOG_VISIBILITY_ABOUT)
+from xmodule import profiling
 from xmodule.error_module import ErrorDescriptor
 from xmodule.x_module import XModule, DEPRECATION_VSCOMPAT_EVENT
 from xmodule.split_test_module import get_split_user_partitions
 from xmodule.partitions.partitions import NoSuchUserPartitionError, NoSuchUserPartitionGroupError
-from xmodule.util.django import get_current_request_hostname
+from xmodule.util.django import get_current_request, get_current_request_hostname
 
 from external_auth.models import ExternalAuthMap
-from courseware.masquerade import get_masquerade_role, is_masquerading_as_student
+from request_cache.middleware import RequestCache
+from openedx.core.djangoapps.content.course_overviews.models import CourseOverview
+from courseware.masquerade import get_masquerade_role, get_masquerading_group_info, is_masquerading_as_student
 from student import auth
 from student.models import CourseEnrollment, CourseEnrollmentAllowed
 from student.roles import (
@@ -41,6 +44,10 @@ import dogstats_wrapper as dog_stats_api
 
 DEBUG_ACCESS = False
 
+# The access decisions on blocks made while handling a request are kept in its request
+# cache under this key, and the numbers of them taken from there and computed under the next
+ACCESS_DECISIONS_CACHE_KEY = 'courseware.access.decisions'
+
 log = logging.getLogger(__name__)
 
 
@@ -79,6 +86,10 @@ def has_access(user, action, obj, course_key=None):
 
     Returns a bool.  It is up to the caller to actually deny access in a way
     that makes sense in context.
+
+    The decisions on blocks other than courses are cached until the end of the
+    request; how many were reused is recorded in the request profile, if any
+    (see xmodule.profiling).
     """
     # Just in case user is passed in as None, make them anonymous
     if not user:
@@ -86,7 +97,7 @@ def has_access(user, action, obj, course_key=None):
 
     # delegate the work to type-specific functions.
     # (start with more specific types, then get more general)
-    if isinstance(obj, CourseDescriptor):
+    if isinstance(obj, (CourseDescriptor, CourseOverview)):
         return _has_access_course_desc(user, action, obj)
 
     if isinstance(obj, ErrorDescriptor):
@@ -117,7 +128,7 @@ def has_access(user, action, obj, course_key=None):
 # ================ Implementation helpers ================================
 def _has_access_course_desc(user, action, course):
     """
-    Check if user has access to a course descriptor.
+    Check if user has access to a course descriptor, or to the course of a CourseOverview.
 
     Valid actions:
 
@@ -138,6 +149,8 @@ def _has_access_course_desc(user, action, course):
 
         NOTE: this is not checking whether user is actually enrolled in the course.
         """
+        if isinstance(course, CourseOverview):
+            return _can_load_course_overview(user, course)
         # delegate to generic descriptor check to check start dates
         return _has_access_descriptor(user, 'load', course, course.id)
 
@@ -432,29 +445,11 @@ def _has_access_descriptor(user, action, descriptor, course_key=None):
             # in which case immediately grant access.
             return _has_staff_access_to_descriptor(user, descriptor, course_key)
 
-        # If start dates are off, can always load
-        if settings.FEATURES['DISABLE_START_DATES'] and not is_masquerading_as_student(user, course_key):
-            debug("Allow: DISABLE_START_DATES")
+        if 'detached' in descriptor._class_tags:
+            debug("Allow: detached")
             return True
 
-        # Check start date
-        if 'detached' not in descriptor._class_tags and descriptor.start is not None:
-            now = datetime.now(UTC())
-            effective_start = _adjust_start_date_for_beta_testers(
-                user,
-                descriptor,
-                course_key=course_key
-            )
-            if in_preview_mode() or now > effective_start:
-                # after start date, everyone can see it
-                debug("Allow: now > effective start date")
-                return True
-            # otherwise, need staff access
-            return _has_staff_access_to_descriptor(user, descriptor, course_key)
-
-        # No start date, so can always load.
-        debug("Allow: no start date")
-        return True
+        return _can_access_descriptor_with_start_date(user, descriptor, course_key)
 
     checkers = {
         'load': can_load,
@@ -462,7 +457,113 @@ def _has_access_descriptor(user, action, descriptor, course_key=None):
         'instructor': lambda: _has_instructor_access_to_descriptor(user, descriptor, course_key)
     }
 
-    return _dispatch(checkers, action, user, descriptor)
+    return _request_cached_decision(
+        user, action, descriptor.location, course_key, lambda: _dispatch(checkers, action, user, descriptor)
+    )
+
+
+def _request_cached_decision(user, action, usage_key, course_key, decide):
+    """
+    Return decide(), the decision whether user can do action on the block with usage_key
+    in the course with course_key, which is cached for the rest of the current request.
+
+    Rendering a sequence or the table of contents checks the same blocks many times.
+    Decisions aren't cached outside of requests, since nothing would clear them, and
+    aren't recomputed if the roles of the user change during the request, but
+    are once the user's masquerade is set up.
+    """
+    if get_current_request() is None:
+        return decide()
+
+    request_cache = RequestCache.get_request_cache().data
+    decisions = request_cache.setdefault(ACCESS_DECISIONS_CACHE_KEY, {})
+
+    # Staff masquerading as students or groups get the decisions of those, once the masquerade is set up
+    decision_key = (
+        user.id, action, usage_key, course_key,
+        get_masquerade_role(user, course_key), get_masquerading_group_info(user, course_key),
+    )
+    if decision_key in decisions:
+        profiling.record('access.decision_cached')
+        return decisions[decision_key]
+
+    profiling.record('access.decision_computed')
+    decision = decisions[decision_key] = decide()
+    return decision
+
+
+def _can_access_descriptor_with_start_date(user, descriptor, course_key):  # pylint: disable=invalid-name
+    """
+    Check whether the start date of descriptor (or of anything else with start and
+    days_early_for_beta attributes, like a CourseOverview) lets user load it.
+    """
+    # If start dates are off, can always load
+    if settings.FEATURES['DISABLE_START_DATES'] and not is_masquerading_as_student(user, course_key):
+        debug("Allow: DISABLE_START_DATES")
+        return True
+
+    # Check start date
+    if descriptor.start is not None:
+        now = datetime.now(UTC())
+        effective_start = _adjust_start_date_for_beta_testers(
+            user,
+            descriptor,
+            course_key=course_key
+        )
+        if in_preview_mode() or now > effective_start:
+            # after start date, everyone can see it
+            debug("Allow: now > effective start date")
+            return True
+        # otherwise, need staff access
+        return _has_staff_access_to_descriptor(user, descriptor, course_key)
+
+    # No start date, so can always load.
+    debug("Allow: no start date")
+    return True
+
+
+def _can_load_course_overview(user, course_overview):
+    """
+    Check whether user can load the course of course_overview, as the 'load' action of
+    _has_access_descriptor does for the course itself.
+
+    An overview doesn't record the group access settings of its course, which are
+    only meant for the blocks within courses, so they aren't checked.
+    """
+    course_key = course_overview.id
+    if course_overview.visible_to_staff_only and not _has_staff_access_to_descriptor(user, course_overview, course_key):
+        return False
+
+    return _can_access_descriptor_with_start_date(user, course_overview, course_key)
+
+
+def filter_loadable_block_summaries(user, block_summaries, course_key):
+    """
+    Return the ones of block_summaries whose blocks user can load, as the 'load'
+    action of has_access would tell for the blocks themselves, checking only once
+    whether user is staff.
+
+    A block summary is anything with the location, start, days_early_for_beta and
+    visible_to_staff_only attributes of its block, so that the blocks don't have to
+    be loaded from the modulestore to be checked. Summaries don't record group
+    access settings, so blocks which have any must be checked with has_access.
+    """
+    block_summaries = list(block_summaries)
+    if not block_summaries:
+        return []
+
+    if not user:
+        user = AnonymousUser()
+
+    if _has_access_to_course(user, 'staff', course_key):
+        debug("Allow: staff access to all block summaries")
+        return block_summaries
+
+    return [
+        block_summary for block_summary in block_summaries
+        if not block_summary.visible_to_staff_only and
+        _can_access_descriptor_with_start_date(user, block_summary, course_key)
+    ]
 
 
 def _has_access_xmodule(user, action, xmodule, course_key):
@@ -1,18 +1,23 @@
 # Compute grades using real division, with no integer truncation
 from __future__ import division
-from collections import defaultdict
+from collections import defaultdict, namedtuple
+from datetime import timedelta
 import json
 import random
 import logging
 
 from contextlib import contextmanager
 from django.conf import settings
+from django.core.cache import cache
 from django.db import transaction
+from django.db.models import Count, Max
 from django.test.client import RequestFactory
+from django.utils import timezone
 
 import dogstats_wrapper as dog_stats_api
 
 from courseware import courses
+from courseware.access import has_access
 from courseware.model_data import FieldDataCache
 from student.models import anonymous_id_for_user
 from util.module_utils import yield_dynamic_descriptor_descendents
@@ -20,7 +25,7 @@ from xmodule import graders
 from xmodule.graders import Score
 from xmodule.modulestore.django import modulestore
 from xmodule.modulestore.exceptions import ItemNotFoundError
-from .models import StudentModule
+from .models import StudentModule, PersistentSectionGrade, chunks
 from .module_render import get_module_for_descriptor
 from submissions import api as sub_api  # installed from the edx-submissions repository
 from opaque_keys import InvalidKeyError
@@ -29,6 +34,148 @@ from opaque_keys.edx.keys import CourseKey
 
 log = logging.getLogger("edx.courseware")
 
+# The number of students whose scores iterate_grades_for_bulk fetches at once
+BULK_GRADING_CHUNK_SIZE = 100
+
+
+# The number of submitted problem StudentModules which answer_distributions reads at a time
+ANSWER_DISTRIBUTION_CHUNK_SIZE = 1000
+
+# How long the answer counts of the chunks of StudentModules of a course are cached
+ANSWER_DISTRIBUTION_CACHE_TIMEOUT = 60 * 60 * 24 * 7
+
+# The answer counts of a chunk of the submitted problem StudentModules of a course: those
+# with ids in (after_id, last_id]. The chunk is up to date as long as its StudentModules
+# still number `count` and were last modified at `max_modified`. `answer_counts` maps
+# (problem usage key, problem part id) -> {answer -> count}.
+AnswerDistributionChunk = namedtuple(
+    'AnswerDistributionChunk', ['after_id', 'last_id', 'count', 'max_modified', 'reusable', 'answer_counts']
+)
+
+
+def _count_answers(modules, course_key):
+    """
+    Return the answer counts of the given submitted problem StudentModules, as a dict
+    mapping (problem usage key, problem part id) -> {answer -> count}.
+    """
+    answer_counts = {}
+    for module in modules:
+        try:
+            state_dict = json.loads(module.state) if module.state else {}
+            raw_answers = state_dict.get("student_answers", {})
+        except ValueError:
+            log.error(
+                u"Answer Distribution: Could not parse module state for StudentModule id=%s, course=%s",
+                module.id,
+                course_key,
+            )
+            continue
+
+        usage_key = module.module_state_key.map_into_course(course_key)
+        # Each problem part has an ID that is derived from the
+        # module.module_state_key (with some suffix appended)
+        for problem_part_id, raw_answer in raw_answers.items():
+            # Convert whatever raw answers we have (numbers, unicode, None, etc.)
+            # to be unicode values. Note that if we get a string, it's always
+            # unicode and not str -- state comes from the json decoder, and that
+            # always returns unicode for strings.
+            answer = unicode(raw_answer)
+            part_counts = answer_counts.setdefault((usage_key, problem_part_id), {})
+            part_counts[answer] = part_counts.get(answer, 0) + 1
+
+    return answer_counts
+
+
+def _make_answer_distribution_chunk(queryset, course_key, after_id, modules, scan_started):
+    """
+    Count the answers of `modules`, the StudentModules of `queryset` with ids after
+    after_id up to the last one of them, and return them as an AnswerDistributionChunk.
+
+    The chunk's modification stats are read after its StudentModules, so that a chunk
+    which changed while it was read is never found up to date later. Chunks modified
+    shortly before the scan started can't be told from ones changed again within the
+    precision of `modified`, so they are rescanned next time.
+    """
+    last_id = modules[-1].id if modules else after_id
+    stats = queryset.filter(id__gt=after_id, id__lte=last_id).aggregate(count=Count('id'), max_modified=Max('modified'))
+    max_modified = stats['max_modified']
+    if max_modified is not None and timezone.is_naive(max_modified):
+        max_modified = timezone.make_aware(max_modified, timezone.utc)
+    reusable = max_modified is None or max_modified < scan_started - timedelta(seconds=1)
+    return AnswerDistributionChunk(
+        after_id, last_id, stats['count'], stats['max_modified'], reusable, _count_answers(modules, course_key)
+    )
+
+
+def _answer_distribution_chunk_cache_key(course_key, after_id):
+    """
+    Return the key the answer counts of the chunk of StudentModules of the course
+    with ids after `after_id` are cached under.
+    """
+    return u'courseware.answer_distribution_chunk.{}.{}'.format(course_key, after_id)
+
+
+def _answer_distribution_chunks(course_key):
+    """
+    Return the AnswerDistributionChunks of all the submitted problem StudentModules of
+    the course, reading the StudentModules ANSWER_DISTRIBUTION_CHUNK_SIZE at a time.
+
+    The chunks are cached per course, so only the chunks which changed since the last
+    time (and the StudentModules added since) are read again. The answer counts of each
+    chunk are cached under their own key, and the other fields of the chunks in an index,
+    so that no cached value grows with the size of the course beyond what memcached holds.
+    """
+    queryset = StudentModule.all_submitted_problems_read_only(course_key)
+    index_cache_key = u'courseware.answer_distribution_chunk_index.{}'.format(course_key)
+    scan_started = timezone.now()
+
+    chunk_index = cache.get(index_cache_key) or []
+    cached_answer_counts = cache.get_many([
+        _answer_distribution_chunk_cache_key(course_key, after_id)
+        for after_id, __, __, __, reusable in chunk_index if reusable
+    ])
+
+    answer_chunks = []
+    computed_chunks = []
+    for after_id, last_id, count, max_modified, reusable in chunk_index:
+        chunk_queryset = queryset.filter(id__gt=after_id, id__lte=last_id)
+        answer_counts = cached_answer_counts.get(_answer_distribution_chunk_cache_key(course_key, after_id))
+        if reusable and answer_counts is not None:
+            stats = chunk_queryset.aggregate(count=Count('id'), max_modified=Max('modified'))
+            if (stats['count'], stats['max_modified']) == (count, max_modified):
+                answer_chunks.append(
+                    AnswerDistributionChunk(after_id, last_id, count, max_modified, reusable, answer_counts)
+                )
+                continue
+        answer_chunks.append(_make_answer_distribution_chunk(
+            queryset, course_key, after_id, list(chunk_queryset.order_by('id')), scan_started
+        ))
+        computed_chunks.append(answer_chunks[-1])
+
+    # Read the StudentModules added since, paginating on their ids
+    last_id = answer_chunks[-1].last_id if answer_chunks else 0
+    while True:
+        modules = list(queryset.filter(id__gt=last_id).order_by('id')[:ANSWER_DISTRIBUTION_CHUNK_SIZE])
+        if not modules:
+            break
+        answer_chunks.append(_make_answer_distribution_chunk(queryset, course_key, last_id, modules, scan_started))
+        computed_chunks.append(answer_chunks[-1])
+        last_id = answer_chunks[-1].last_id
+
+    cache.set_many(
+        {
+            _answer_distribution_chunk_cache_key(course_key, chunk.after_id): chunk.answer_counts
+            for chunk in computed_chunks
+        },
+        ANSWER_DISTRIBUTION_CACHE_TIMEOUT
+    )
+    cache.set(
+        index_cache_key,
+        [(chunk.after_id, chunk.last_id, chunk.count, chunk.max_modified, chunk.reusable) for chunk in answer_chunks],
+        ANSWER_DISTRIBUTION_CACHE_TIMEOUT
+    )
+    return answer_chunks
+
 
 def answer_distributions(course_key):
     """
@@ -57,81 +204,252 @@ def answer_distributions(course_key):
     not be aware of problems that are not visible to the user being used to
     generate the report.
 
+    The StudentModules are read in chunks, whose answer counts are cached and
+    merged, so that later reports only read the StudentModules which changed.
+
     This method will try to use a read-replica database if one is available.
     """
-    # dict: { module.module_state_key : (url_name, display_name) }
-    state_keys_to_problem_info = {}  # For caching, used by url_and_display_name
+    # Merge the answer counts of all the chunks
+    answer_counts_by_usage_key = defaultdict(lambda: defaultdict(int))
+    for answer_chunk in _answer_distribution_chunks(course_key):
+        for part_key, part_counts in answer_chunk.answer_counts.iteritems():
+            for answer, count in part_counts.iteritems():
+                answer_counts_by_usage_key[part_key][answer] += count
+
+    problem_store = modulestore()
+    # dict: { usage_key : (url_name, display_name) }, None for missing problems
+    problem_info_by_usage_key = {}
+    answer_counts = defaultdict(lambda: defaultdict(int))
+    for (usage_key, problem_part_id), part_counts in answer_counts_by_usage_key.iteritems():
+        if usage_key not in problem_info_by_usage_key:
+            try:
+                problem = problem_store.get_item(usage_key)
+                problem_info_by_usage_key[usage_key] = (problem.url_name, problem.display_name_with_default)
+            except (ItemNotFoundError, InvalidKeyError):
+                msg = "Answer Distribution: Item {} referenced in StudentModules " + \
+                      "in course {} not found; " + \
+                      "This can happen if a student answered a question that " + \
+                      "was later deleted from the course. These answers will be " + \
+                      "omitted from the answer distribution CSV."
+                log.warning(msg.format(usage_key, course_key))
+                problem_info_by_usage_key[usage_key] = None
+
+        problem_info = problem_info_by_usage_key[usage_key]
+        if problem_info is not None:
+            url, display_name = problem_info
+            for answer, count in part_counts.iteritems():
+                answer_counts[(url, display_name, problem_part_id)][answer] += count
+
+    return answer_counts
+
+
+def persistent_grades_enabled():
+    """
+    Return whether computed section grades are stored and reused.
+    """
+    return settings.FEATURES.get('ENABLE_PERSISTENT_GRADES', False)
 
-    def url_and_display_name(usage_key):
+
+def course_grading_version(course):
+    """
+    Return a string identifying the version of `course`'s content that grades
+    are computed against. The modulestores update the course's subtree edit
+    time on every publish, so this changes whenever the course is published.
+    """
+    try:
+        edited_on = course.subtree_edited_on
+    except AttributeError:
+        # Courses from the XML modulestore don't record edit info
+        edited_on = None
+    return edited_on.isoformat() if edited_on else u''
+
+
+# How long the grading context of a published version of a course is cached
+GRADING_CONTEXT_CACHE_TIMEOUT = 60 * 60 * 24
+
+# A graded section, as kept in the cached grading context of its course: its usage key and
+# name, the usage keys of its scorable blocks (its own included) and of all its blocks, and
+# whether one of its scorable blocks always has to be graded again (like foldit does).
+GradedSectionSummary = namedtuple('GradedSectionSummary', [
+    'location', 'display_name', 'scorable_locations', 'block_locations', 'always_recalculate',
+])
+
+
+class CourseGradingContext(object):
+    """
+    What grading students of a course needs to know about it: its graded sections,
+    by format, with their scorable blocks.
+
+    This replaces CourseDescriptor.grading_context, which walks the whole course
+    tree each time a course is loaded. The sections are summarized once per
+    published version of the course, and the summaries, which only hold usage
+    keys, are cached. Descriptors are loaded when they are asked for, so grading a
+    student doesn't load the sections they haven't started.
+    """
+    def __init__(self, course, graded_sections):
+        self.course = course
+        # section format -> [GradedSectionSummary]
+        self.graded_sections = graded_sections
+        # usage key -> descriptor, for the blocks which have been loaded
+        self._descriptors = {}
+
+    @classmethod
+    def for_course(cls, course):
+        """
+        Return the grading context of `course`, from the cache if it was computed for its version.
+        """
+        course_version = course_grading_version(course)
+        cache_key = u'courseware.grading_context.{}.{}'.format(course.id, course_version)
+        # Courses from the XML modulestore have no version to key their context on
+        graded_sections = cache.get(cache_key) if course_version else None
+        if graded_sections is None:
+            graded_sections = cls._summarize_graded_sections(course)
+            if course_version:
+                cache.set(cache_key, graded_sections, GRADING_CONTEXT_CACHE_TIMEOUT)
+        return cls(course, graded_sections)
+
+    @staticmethod
+    def _summarize_graded_sections(course):
         """
-        For a given usage_key, return the problem's url and display_name.
-        Handle modulestore access and caching. This method ignores permissions.
+        Return a dict mapping section formats to the GradedSectionSummaries of the graded sections of `course`.
+        """
+        graded_sections = defaultdict(list)
+        for chapter in course.get_children():
+            for section in chapter.get_children():
+                if not section.graded:
+                    continue
 
-        Raises:
-            InvalidKeyError: if the usage_key does not parse
-            ItemNotFoundError: if there is no content that corresponds
-                to this usage_key.
+                blocks = [section]
+                unvisited = [section]
+                while unvisited:
+                    children = unvisited.pop().get_children()
+                    blocks.extend(children)
+                    unvisited.extend(children)
+                scorable_blocks = [block for block in blocks if block.has_score]
+
+                section_format = section.format if section.format is not None else ''
+                graded_sections[section_format].append(GradedSectionSummary(
+                    location=section.location,
+                    display_name=section.display_name_with_default,
+                    scorable_locations=tuple(block.location for block in scorable_blocks),
+                    block_locations=tuple(block.location for block in blocks),
+                    always_recalculate=any(block.always_recalculate_grades for block in scorable_blocks),
+                ))
+        return dict(graded_sections)
+
+    def get_descriptor(self, usage_key):
         """
-        problem_store = modulestore()
-        if usage_key not in state_keys_to_problem_info:
-            problem = problem_store.get_item(usage_key)
-            problem_info = (problem.url_name, problem.display_name_with_default)
-            state_keys_to_problem_info[usage_key] = problem_info
+        Return the descriptor of the block of the course with usage key `usage_key`.
+        """
+        descriptor = self._descriptors.get(usage_key)
+        if descriptor is None:
+            descriptor = self._descriptors[usage_key] = self.course.runtime.get_block(usage_key)
+        return descriptor
 
-        return state_keys_to_problem_info[usage_key]
+    def all_locations(self):
+        """
+        Return the usage keys of all the blocks of the graded sections, which can affect grades.
+        """
+        return [
+            location
+            for sections in self.graded_sections.itervalues()
+            for section in sections
+            for location in section.block_locations
+        ]
 
-    # Iterate through all problems submitted for this course in no particular
-    # order, and build up our answer_counts dict that we will eventually return
-    answer_counts = defaultdict(lambda: defaultdict(int))
-    for module in StudentModule.all_submitted_problems_read_only(course_key):
-        try:
-            state_dict = json.loads(module.state) if module.state else {}
-            raw_answers = state_dict.get("student_answers", {})
-        except ValueError:
-            log.error(
-                u"Answer Distribution: Could not parse module state for StudentModule id=%s, course=%s",
-                module.id,
-                course_key,
-            )
-            continue
 
-        try:
-            url, display_name = url_and_display_name(module.module_state_key.map_into_course(course_key))
-            # Each problem part has an ID that is derived from the
-            # module.module_state_key (with some suffix appended)
-            for problem_part_id, raw_answer in raw_answers.items():
-                # Convert whatever raw answers we have (numbers, unicode, None, etc.)
-                # to be unicode values. Note that if we get a string, it's always
-                # unicode and not str -- state comes from the json decoder, and that
-                # always returns unicode for strings.
-                answer = unicode(raw_answer)
-                answer_counts[(url, display_name, problem_part_id)][answer] += 1
-
-        except (ItemNotFoundError, InvalidKeyError):
-            msg = "Answer Distribution: Item {} referenced in StudentModule {} " + \
-                  "for user {} in course {} not found; " + \
-                  "This can happen if a student answered a question that " + \
-                  "was later deleted from the course. This answer will be " + \
-                  "omitted from the answer distribution CSV."
-            log.warning(
-                msg.format(module.module_state_key, module.id, module.student_id, course_key)
+class BulkGradingContext(object):
+    """
+    The state shared by the grading of many students in one course.
+
+    The grading context is computed once, and the StudentModule scores (and
+    stored section grades) of a chunk of students are fetched with a single
+    query, so that grading a student doesn't query the database once per
+    section and per problem. The max score of a block a student hasn't been
+    scored on is the one stored for the other students, so that blocks aren't
+    instantiated just to tell their max score.
+    """
+    def __init__(self, course):
+        self.course_key = course.id
+        self.course_version = course_grading_version(course)
+        self.grading_context = CourseGradingContext.for_course(course)
+        # usage key -> max score, as stored for any student, or computed by instantiating the block
+        self.max_scores = self._stored_max_scores()
+        # student id -> {usage key -> (grade, max_grade)}
+        self._module_scores = {}
+        # student id -> {section usage key -> PersistentSectionGrade}
+        self._stored_grades = {}
+
+    def prefetch(self, students):
+        """
+        Fetch the scores of `students`, replacing those fetched for any previous chunk.
+        """
+        student_ids = [student.id for student in students]
+        self._module_scores = defaultdict(dict)
+        student_modules = StudentModule.objects.filter(
+            course_id=self.course_key,
+            student_id__in=student_ids,
+        ).only('student', 'module_state_key', 'grade', 'max_grade')
+        for student_module in student_modules:
+            usage_key = student_module.module_state_key.map_into_course(self.course_key)
+            self._module_scores[student_module.student_id][usage_key] = (student_module.grade, student_module.max_grade)
+
+        if persistent_grades_enabled():
+            self._stored_grades = PersistentSectionGrade.grades_for_users(
+                student_ids, self.course_key, self.course_version
             )
-            continue
 
-    return answer_counts
+    def _stored_max_scores(self):
+        """
+        Return a dict mapping the usage keys of the blocks of the course to the
+        max score stored in their StudentModules.
+        """
+        rows = StudentModule.objects.filter(
+            course_id=self.course_key,
+            max_grade__isnull=False,
+        ).values('module_state_key').annotate(stored_max_grade=Max('max_grade'))
+        return {
+            self.course_key.make_usage_key_from_deprecated_string(row['module_state_key']): row['stored_max_grade']
+            for row in rows
+        }
+
+    def max_score(self, problem_descriptor, module_creator):
+        """
+        Return the max score of the block `problem_descriptor`, instantiating it
+        with `module_creator` only if no student has been scored on it yet.
+        """
+        location = problem_descriptor.location
+        if location not in self.max_scores:
+            problem = module_creator(problem_descriptor)
+            if problem is None:
+                return None
+            self.max_scores[location] = problem.max_score()
+        return self.max_scores[location]
+
+    def module_scores(self, student):
+        """
+        Return a dict mapping usage keys to the (grade, max_grade) stored for `student`.
+        """
+        return self._module_scores.get(student.id, {})
+
+    def stored_grades(self, student):
+        """
+        Return a dict mapping section usage keys to the section grades stored for `student`.
+        """
+        return self._stored_grades.get(student.id, {})
 
 
 @transaction.commit_manually
-def grade(student, request, course, keep_raw_scores=False):
+def grade(student, request, course, keep_raw_scores=False, bulk_context=None):
     """
     Wraps "_grade" with the manual_transaction context manager just in case
     there are unanticipated errors.
     """
     with manual_transaction():
-        return _grade(student, request, course, keep_raw_scores)
+        return _grade(student, request, course, keep_raw_scores, bulk_context)
 
 
-def _grade(student, request, course, keep_raw_scores):
+def _grade(student, request, course, keep_raw_scores, bulk_context=None):
     """
     Unwrapped version of "grade"
 
@@ -150,9 +468,15 @@ def _grade(student, request, course, keep_raw_scores):
     - keep_raw_scores : if True, then value for key 'raw_scores' contains scores
       for every graded module
 
+    If a BulkGradingContext which has prefetched this student's scores is
+    given as bulk_context, scores are read from it instead of the database.
+
     More information on the format is in the docstring for CourseGrader.
     """
-    grading_context = course.grading_context
+    if bulk_context is not None:
+        grading_context = bulk_context.grading_context
+    else:
+        grading_context = CourseGradingContext.for_course(course)
     raw_scores = []
 
     # Dict of item_ids -> (earned, possible) point tuples. This *only* grabs
@@ -162,57 +486,96 @@ def _grade(student, request, course, keep_raw_scores):
         course.id.to_deprecated_string(), anonymous_id_for_user(student, course.id)
     )
 
+    # Section grades stored by a previous call, if they are enabled
+    persist_grades = persistent_grades_enabled()
+    if persist_grades:
+        course_version = course_grading_version(course)
+        if bulk_context is not None:
+            stored_grades = bulk_context.stored_grades(student)
+        else:
+            with manual_transaction():
+                stored_grades = PersistentSectionGrade.grades_for(student, course.id, course_version)
+
+    # The student's state of all the graded blocks, loaded by usage key when the first
+    # module is created. The blocks themselves are only loaded as they are graded.
+    field_data_caches = []
+
+    def create_module(descriptor):
+        '''creates an XModule instance given a descriptor'''
+        if not field_data_caches:
+            with manual_transaction():
+                field_data_cache = FieldDataCache([], course.id, student)
+                field_data_cache.prefetch_user_state(grading_context.all_locations())
+                field_data_caches.append(field_data_cache)
+        field_data_cache = field_data_caches[0]
+        with manual_transaction():
+            field_data_cache.add_descriptors_to_cache([descriptor])
+        # TODO: We need the request to pass into here. If we could forego that, our arguments
+        # would be simpler
+        return get_module_for_descriptor(student, request, descriptor, field_data_cache, course.id)
+
     totaled_scores = {}
     # This next complicated loop is just to collect the totaled_scores, which is
     # passed to the grader
-    for section_format, sections in grading_context['graded_sections'].iteritems():
+    for section_format, sections in grading_context.graded_sections.iteritems():
         format_scores = []
         for section in sections:
-            section_descriptor = section['section_descriptor']
-            section_name = section_descriptor.display_name_with_default
+            section_name = section.display_name
 
             # some problems have state that is updated independently of interaction
             # with the LMS, so they need to always be scored. (E.g. foldit.,
             # combinedopenended)
-            should_grade_section = any(
-                descriptor.always_recalculate_grades for descriptor in section['xmoduledescriptors']
-            )
+            should_grade_section = section.always_recalculate
 
             # If there are no problems that always have to be regraded, check to
             # see if any of our locations are in the scores from the submissions
             # API. If scores exist, we have to calculate grades for this section.
             if not should_grade_section:
                 should_grade_section = any(
-                    descriptor.location.to_deprecated_string() in submissions_scores
-                    for descriptor in section['xmoduledescriptors']
+                    location.to_deprecated_string() in submissions_scores
+                    for location in section.scorable_locations
                 )
 
-            if not should_grade_section:
-                with manual_transaction():
-                    should_grade_section = StudentModule.objects.filter(
-                        student=student,
-                        module_state_key__in=[
-                            descriptor.location for descriptor in section['xmoduledescriptors']
-                        ]
-                    ).exists()
+            # Scores which don't come from the StudentModule table can change
+            # without notice, so only sections without them are stored.
+            can_persist_section = persist_grades and not should_grade_section
+            stored_grade = stored_grades.get(section.location) if can_persist_section else None
+
+            if stored_grade is None and not should_grade_section:
+                if bulk_context is not None:
+                    module_scores = bulk_context.module_scores(student)
+                    should_grade_section = any(
+                        location in module_scores for location in section.scorable_locations
+                    )
+                else:
+                    with manual_transaction():
+                        should_grade_section = StudentModule.objects.filter(
+                            student=student,
+                            module_state_key__in=section.scorable_locations
+                        ).exists()
+
+            if stored_grade is not None:
+                graded_total = Score(stored_grade.earned, stored_grade.possible, True, section_name, None)
+                if keep_raw_scores:
+                    raw_scores += stored_grade.scores
 
             # If we haven't seen a single problem in the section, we don't have
             # to grade it at all! We can assume 0%
-            if should_grade_section:
+            elif should_grade_section:
                 scores = []
-
-                def create_module(descriptor):
-                    '''creates an XModule instance given a descriptor'''
-                    # TODO: We need the request to pass into here. If we could forego that, our arguments
-                    # would be simpler
+                if can_persist_section:
+                    # To tell whether the scores changed while they were computed
                     with manual_transaction():
-                        field_data_cache = FieldDataCache([descriptor], course.id, student)
-                    return get_module_for_descriptor(student, request, descriptor, field_data_cache, course.id)
+                        modules_version = PersistentSectionGrade.modules_version(
+                            student.id, section.scorable_locations
+                        )
 
+                section_descriptor = grading_context.get_descriptor(section.location)
                 for module_descriptor in yield_dynamic_descriptor_descendents(section_descriptor, create_module):
 
                     (correct, total) = get_score(
-                        course.id, student, module_descriptor, create_module, scores_cache=submissions_scores
+                        course.id, student, module_descriptor, create_module, scores_cache=submissions_scores,
+                        bulk_context=bulk_context,
                     )
                     if correct is None and total is None:
                         continue
@@ -241,6 +604,13 @@ def _grade(student, request, course, keep_raw_scores):
                 _, graded_total = graders.aggregate_scores(scores, section_name)
                 if keep_raw_scores:
                     raw_scores += scores
+
+                if can_persist_section and not settings.GENERATE_PROFILE_SCORES:
+                    with manual_transaction():
+                        PersistentSectionGrade.save_section_grade(
+                            student, course.id, section.location, course_version, graded_total, scores,
+                            section.scorable_locations, modules_version,
+                        )
             else:
                 graded_total = Score(0.0, 1.0, True, section_name, None)
 
@@ -250,7 +620,7 @@ def _grade(student, request, course, keep_raw_scores):
             else:
                 log.info(
                     "Unable to grade a section with a total possible score of zero. " +
-                    str(section_descriptor.location)
+                    str(section.location)
                 )
 
         totaled_scores[section_format] = format_scores
@@ -407,7 +777,7 @@ def _progress_summary(student, request, course):
     return chapters
 
 
-def get_score(course_id, user, problem_descriptor, module_creator, scores_cache=None):
+def get_score(course_id, user, problem_descriptor, module_creator, scores_cache=None, bulk_context=None):
     """
     Return the score for a user on a problem, as a tuple (correct, total).
     e.g. (5,7) if you got 5 out of 7 points.
@@ -421,6 +791,9 @@ def get_score(course_id, user, problem_descriptor, module_creator, scores_cache=
            Can return None if user doesn't have access, or if something else went wrong.
     scores_cache: A dict of location names to (earned, possible) point tuples.
            If an entry is found in this cache, it takes precedence.
+    bulk_context: A BulkGradingContext which has prefetched the user's scores. If given,
+           the score is read from it, and the max scores of problems the user hasn't been
+           scored on are the ones stored for the other users.
     """
     scores_cache = scores_cache or {}
 
@@ -447,18 +820,33 @@ def get_score(course_id, user, problem_descriptor, module_creator, scores_cache=
         # These are not problems, and do not have a score
         return (None, None)
 
-    try:
-        student_module = StudentModule.objects.get(
-            student=user,
-            course_id=course_id,
-            module_state_key=problem_descriptor.location
+    if bulk_context is not None:
+        stored_grade, stored_max_grade = bulk_context.module_scores(user).get(
+            problem_descriptor.location, (None, None)
         )
-    except StudentModule.DoesNotExist:
-        student_module = None
-
-    if student_module is not None and student_module.max_grade is not None:
-        correct = student_module.grade if student_module.grade is not None else 0
-        total = student_module.max_grade
+    else:
+        try:
+            student_module = StudentModule.objects.get(
+                student=user,
+                course_id=course_id,
+                module_state_key=problem_descriptor.location
+            )
+        except StudentModule.DoesNotExist:
+            stored_grade, stored_max_grade = None, None
+        else:
+            stored_grade, stored_max_grade = student_module.grade, student_module.max_grade
+
+    if stored_max_grade is not None:
+        correct = stored_grade if stored_grade is not None else 0
+        total = stored_max_grade
+    elif bulk_context is not None:
+        # The access check module_creator makes, without instantiating the block
+        if not has_access(user, 'load', problem_descriptor, course_id):
+            return (None, None)
+        correct = 0.0
+        total = bulk_context.max_score(problem_descriptor, module_creator)
+        if total is None:
+            return (None, None)
     else:
         # If the problem was not in the cache, or hasn't been graded yet,
         # we need to instantiate the problem.
@@ -479,7 +867,9 @@ def get_score(course_id, user, problem_descriptor, module_creator, scores_cache=
     weight = problem_descriptor.weight
     if weight is not None:
         if total == 0:
-            log.exception("Cannot reweight a problem with zero total points. Problem: " + str(student_module))
+            log.exception(
+                "Cannot reweight a problem with zero total points. Problem: " + unicode(problem_descriptor.location)
+            )
             return (correct, total)
         correct = correct * weight / total
         total = weight
@@ -517,12 +907,44 @@ def iterate_grades_for(course_or_id, students, keep_raw_scores=False):
     - grade_breakdown : A breakdown of the major components that
         make up the final grade. (For display)
     - raw_scores: contains scores for every graded module
+
+    If FEATURES['ENABLE_BULK_GRADING'] is set, this defers to iterate_grades_for_bulk.
+    """
+    if settings.FEATURES.get('ENABLE_BULK_GRADING', False):
+        return iterate_grades_for_bulk(course_or_id, students, keep_raw_scores)
+
+    return _iterate_grades(_course_for(course_or_id), students, keep_raw_scores)
+
+
+def iterate_grades_for_bulk(course_or_id, students, keep_raw_scores=False, chunk_size=BULK_GRADING_CHUNK_SIZE):
+    """
+    Yield the same (student, gradeset, err_msg) tuples as iterate_grades_for,
+    grading the students `chunk_size` at a time with a shared
+    BulkGradingContext, so that the course's grading context is computed once
+    and the scores of each chunk of students are fetched with one query.
+    """
+    course = _course_for(course_or_id)
+    bulk_context = BulkGradingContext(course)
+
+    for students_chunk in chunks(students, chunk_size):
+        bulk_context.prefetch(students_chunk)
+        for result in _iterate_grades(course, students_chunk, keep_raw_scores, bulk_context):
+            yield result
+
+
+def _course_for(course_or_id):
+    """
+    Return the course descriptor for `course_or_id`, loading it if given a course id.
     """
     if isinstance(course_or_id, (basestring, CourseKey)):
-        course = courses.get_course_by_id(course_or_id)
-    else:
-        course = course_or_id
+        return courses.get_course_by_id(course_or_id)
+    return course_or_id
+
 
+def _iterate_grades(course, students, keep_raw_scores, bulk_context=None):
+    """
+    Yield (student, gradeset, err_msg) for every one of `students`. See iterate_grades_for.
+    """
     # We make a fake request because grading code expects to be able to look at
     # the request. We have to attach the correct user to the request before
     # grading that student.
@@ -537,7 +959,10 @@ def iterate_grades_for(course_or_id, students, keep_raw_scores=False):
                 # It's not pretty, but untangling that is currently beyond the
                 # scope of this feature.
                 request.session = {}
-                gradeset = grade(student, request, course, keep_raw_scores)
+                if bulk_context is not None:
+                    gradeset = grade(student, request, course, keep_raw_scores, bulk_context=bulk_context)
+                else:
+                    gradeset = grade(student, request, course, keep_raw_scores)
                 yield student, gradeset, ""
             except Exception as exc:  # pylint: disable=broad-except
                 # Keep marching on even if this student couldn't be graded for
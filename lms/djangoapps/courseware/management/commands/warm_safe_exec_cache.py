@@ -0,0 +1,117 @@
+"""
+A Django command that runs the scripts of a course's problems with every
+random seed students can be given, so that the results are in the safe_exec
+cache before the students ask for the problems.
+
+Run it ahead of an exam or a problem set's release, so that the first wave of
+students doesn't have to wait for all the scripts to run in the sandbox.
+"""
+import logging
+from optparse import make_option
+from textwrap import dedent
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from capa.capa_problem import LoncapaProblem, LoncapaSystem
+from edxmako.shortcuts import render_to_string
+from opaque_keys import InvalidKeyError
+from opaque_keys.edx.keys import CourseKey
+from util.sandboxing import can_execute_unsafe_code, get_python_lib_zip, safe_exec_cache
+from xmodule.capa_base import MAX_RANDOMIZATION_BINS
+from xmodule.capa_base_constants import RANDOMIZATION
+from xmodule.contentstore.django import contentstore
+from xmodule.modulestore.django import modulestore, ModuleI18nService
+
+log = logging.getLogger(__name__)
+
+
+def problem_seeds(problem, max_seeds=None):
+    """
+    Return the random seeds students can be given for `problem`, at most `max_seeds` of them.
+    """
+    if problem.rerandomize == RANDOMIZATION.NEVER:
+        seeds = [1]
+    else:
+        seeds = range(MAX_RANDOMIZATION_BINS)
+    return seeds[:max_seeds]
+
+
+class Command(BaseCommand):
+    """
+    Run the scripts of a course's problems for every random seed, caching the results.
+    """
+    args = "<course_id>"
+    help = dedent(__doc__).strip()
+    option_list = BaseCommand.option_list + (
+        make_option('--max-seeds',
+                    action='store',
+                    type='int',
+                    default=None,
+                    help='Only warm this many seeds of each problem'),
+    )
+
+    def handle(self, *args, **options):
+        if len(args) != 1:
+            raise CommandError("course_id not specified")
+
+        try:
+            course_key = CourseKey.from_string(args[0])
+        except InvalidKeyError:
+            raise CommandError("Invalid course_id")
+
+        store = modulestore()
+        if store.get_course(course_key) is None:
+            raise CommandError("Invalid course_id")
+
+        problems = [
+            problem for problem in store.get_items(course_key, qualifiers={'category': 'problem'})
+            if '<script' in problem.data
+        ]
+
+        executions = failures = 0
+        for problem in problems:
+            for seed in problem_seeds(problem, options['max_seeds']):
+                try:
+                    LoncapaProblem(
+                        problem.data,
+                        id=problem.location.html_id(),
+                        capa_system=self._capa_system(course_key, problem),
+                        seed=seed,
+                    )
+                except Exception:  # pylint: disable=broad-except
+                    # The problem is broken; its other seeds would fail in the same way.
+                    log.exception(u"Unable to run the scripts of %s with seed %s", problem.location, seed)
+                    failures += 1
+                    break
+                executions += 1
+
+        cache_stats = safe_exec_cache().stats()
+        hits = sum(stats['hits'] for stats in cache_stats.itervalues())
+        self.stdout.write(
+            "Ran the scripts of {problems} problems with {executions} seeds ({hits} already cached); "
+            "{failures} problems failed.\n".format(
+                problems=len(problems), executions=executions, hits=hits, failures=failures
+            )
+        )
+
+    def _capa_system(self, course_key, problem):
+        """
+        Return a LoncapaSystem for running the scripts of `problem` outside of any student's context.
+        """
+        return LoncapaSystem(
+            ajax_url=None,
+            anonymous_student_id=None,
+            cache=safe_exec_cache(),
+            can_execute_unsafe_code=lambda: can_execute_unsafe_code(course_key),
+            get_python_lib_zip=lambda: get_python_lib_zip(contentstore, course_key),
+            DEBUG=settings.DEBUG,
+            filestore=problem.runtime.resources_fs,
+            i18n=ModuleI18nService(),
+            node_path=settings.NODE_PATH,
+            render_template=render_to_string,
+            seed=None,
+            STATIC_URL=settings.STATIC_URL,
+            xqueue=None,
+            matlab_api_key=problem.matlab_api_key,
+        )
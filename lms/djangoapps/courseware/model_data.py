@@ -24,6 +24,7 @@ DjangoOrmFieldCache: A base-class for single-row-per-field caches.
 import json
 from abc import abstractmethod, ABCMeta
 from collections import defaultdict
+from contextlib import contextmanager
 from .models import (
     StudentModule,
     XModuleUserStateSummaryField,
@@ -36,13 +37,14 @@ from opaque_keys.edx.block_types import BlockTypeKeyV1
 from opaque_keys.edx.asides import AsideUsageKeyV1
 from contracts import contract, new_contract
 
-from django.db import DatabaseError
+from django.db import DatabaseError, transaction
 
 from xblock.runtime import KeyValueStore
 from xblock.exceptions import KeyValueMultiSaveError, InvalidScopeError
-from xblock.fields import Scope, UserScope
+from xblock.fields import BlockScope, Scope, UserScope
 from xmodule.modulestore.django import modulestore
 from xblock.core import XBlockAside
+from xmodule import profiling
 from courseware.user_state_client import DjangoXBlockUserStateClient
 
 log = logging.getLogger(__name__)
@@ -353,6 +355,14 @@ class UserStateCache(object):
         self.course_id = course_id
         self.user = user
         self._client = DjangoXBlockUserStateClient(self.user)
+        # The usage keys whose state has been loaded (whether the user has any), or
+        # None once the state of the whole course has been
+        self._loaded_usage_keys = set()
+
+        # While writes are deferred, the state set since the last flush by block,
+        # and the scores by (user id, block). None when writes go straight to the database.
+        self._pending_state = None
+        self._pending_scores = None
 
     def cache_fields(self, fields, xblocks, aside_types):  # pylint: disable=unused-argument
         """
@@ -364,12 +374,22 @@ class UserStateCache(object):
             xblocks (list of :class:`XBlock`): XBlocks to cache fields for.
             aside_types (list of str): Aside types to cache fields for.
         """
-        block_field_state = self._client.get_many(
-            self.user.username,
-            _all_usage_keys(xblocks, aside_types),
-        )
+        self.cache_usage_keys(_all_usage_keys(xblocks, aside_types))
+
+    def cache_usage_keys(self, usage_keys):
+        """
+        Load the state of the blocks with `usage_keys` into this cache, in a
+        single query, skipping those already loaded.
+        """
+        if self._loaded_usage_keys is None:
+            return
+        usage_keys = set(usage_keys) - self._loaded_usage_keys
+        if not usage_keys:
+            return
+        block_field_state = self._client.get_many(self.user.username, usage_keys)
         for usage_key, field_state in block_field_state:
             self._cache[usage_key] = field_state
+        self._loaded_usage_keys.update(usage_keys)
 
     @contract(kvs_key=DjangoKeyValueStore.Key)
     def set(self, kvs_key, value):
@@ -413,6 +433,12 @@ class UserStateCache(object):
 
             pending_updates[cache_key][kvs_key.field_name] = value
 
+        if self._pending_state is not None:
+            for cache_key, field_state in pending_updates.iteritems():
+                self._pending_state[cache_key].update(field_state)
+                self._cache[cache_key].update(field_state)
+            return
+
         try:
             self._client.set_many(
                 self.user.username,
@@ -459,6 +485,9 @@ class UserStateCache(object):
         if kvs_key.field_name not in field_state:
             raise KeyError(kvs_key.field_name)
 
+        if self._pending_state is not None and cache_key in self._pending_state:
+            self._pending_state[cache_key].pop(kvs_key.field_name, None)
+
         self._client.delete(self.user.username, cache_key, fields=[kvs_key.field_name])
         del field_state[kvs_key.field_name]
 
@@ -486,6 +515,10 @@ class UserStateCache(object):
 
         Set the score and max_score for the specified user and xblock usage.
         """
+        if self._pending_scores is not None:
+            self._pending_scores[(user_id, usage_key)] = (score, max_score)
+            return
+
         student_module, created = StudentModule.objects.get_or_create(
             student_id=user_id,
             module_state_key=usage_key,
@@ -500,6 +533,96 @@ class UserStateCache(object):
             student_module.max_grade = max_score
             student_module.save()
 
+    def defer_writes(self):
+        """
+        Hold back the state and scores set from now on, until `flush` is called.
+
+        All the updates of a block are then written with a single save (and
+        so a single StudentModuleHistory row).
+        """
+        if self._pending_state is None:
+            self._pending_state = defaultdict(dict)
+            self._pending_scores = {}
+
+    def stop_deferring_writes(self):
+        """
+        Write the held back updates, and write later ones straight to the database again.
+        """
+        try:
+            self.flush()
+        finally:
+            self._pending_state = None
+            self._pending_scores = None
+
+    def flush(self):
+        """
+        Write the state and scores held back since `defer_writes` or the last
+        flush, with one save per block, in a single transaction.
+        """
+        if not self._pending_state and not self._pending_scores:
+            return
+
+        pending_state, pending_scores = self._pending_state, self._pending_scores
+        self._pending_state, self._pending_scores = defaultdict(dict), {}
+        try:
+            with transaction.commit_on_success():
+                # Scores can be set for other users than the one whose state this is
+                pending_keys = set((self.user.id, usage_key) for usage_key in pending_state) | set(pending_scores)
+                for user_id, usage_key in pending_keys:
+                    self._write_student_module(
+                        user_id,
+                        usage_key,
+                        pending_state.get(usage_key) if user_id == self.user.id else None,
+                        pending_scores.get((user_id, usage_key)),
+                    )
+        except DatabaseError:
+            log.exception("Saving the state of %s failed", ", ".join(unicode(key) for key in pending_state))
+            raise KeyValueMultiSaveError([])
+
+    def _write_student_module(self, user_id, usage_key, state, score):
+        """
+        Update the StudentModule of the user with id `user_id` for `usage_key` with the
+        fields in `state` and the (score, max_score) pair `score`, either of which may be None.
+        """
+        defaults = {
+            'state': json.dumps(state or {}),
+            'module_type': usage_key.block_type,
+        }
+        if score is not None:
+            defaults['grade'], defaults['max_grade'] = score
+
+        student_module, created = StudentModule.objects.get_or_create(
+            student_id=user_id,
+            course_id=usage_key.course_key,
+            module_state_key=usage_key,
+            defaults=defaults,
+        )
+        if created:
+            return
+
+        if state:
+            current_state = {} if student_module.state is None else json.loads(student_module.state)
+            current_state.update(state)
+            student_module.state = json.dumps(current_state)
+        if score is not None:
+            student_module.grade, student_module.max_grade = score
+        # We just read this object, so we know that we can do an update
+        student_module.save(force_update=True)
+
+    def cache_course(self):
+        """
+        Load the state of every block of the course which the user has state for
+        into this cache, in a single query.
+        """
+        query = StudentModule.objects.filter(student=self.user.pk, course_id=self.course_id)
+        for student_module in query.iterator():
+            usage_key = student_module.module_state_key.map_into_course(student_module.course_id)
+            if student_module.state is None:
+                self._cache[usage_key] = {}
+            else:
+                self._cache[usage_key] = json.loads(student_module.state)
+        self._loaded_usage_keys = None
+
     def __len__(self):
         return len(self._cache)
 
@@ -725,6 +848,14 @@ class FieldDataCache(object):
         self.course_id = course_id
         self.user = user
 
+        # The usage keys loaded by `prefetch_course`, or None if it hasn't been used
+        self.prefetched_usage_keys = None
+        # The usage keys which were read or added after `prefetch_course`, although it didn't load them
+        self.straggler_usage_keys = set()
+        # The callbacks to call once the writes held back by `deferred_writes` are made,
+        # or None when writes aren't held back
+        self._after_writes = None
+
         self.cache = {
             Scope.user_state: UserStateCache(
                 self.user,
@@ -742,10 +873,25 @@ class FieldDataCache(object):
         }
         self.add_descriptors_to_cache(descriptors)
 
+    @profiling.profiled_function('field_data_cache.add_descriptors_to_cache')
     def add_descriptors_to_cache(self, descriptors):
         """
         Add all `descriptors` to this FieldDataCache.
+
+        Once the cache has been prefetched with `prefetch_course`, only the
+        descriptors it didn't load are added, and they are reported as stragglers.
         """
+        if self.prefetched_usage_keys is not None:
+            descriptors = [
+                descriptor for descriptor in descriptors
+                if descriptor.scope_ids.usage_id not in self.prefetched_usage_keys
+            ]
+            if not descriptors:
+                return
+            usage_keys = _all_usage_keys(descriptors, self.asides)
+            self._report_stragglers(usage_keys)
+            self.prefetched_usage_keys.update(usage_keys)
+
         if self.user.is_authenticated():
             for scope, fields in self._fields_to_cache(descriptors).items():
                 if scope not in self.cache:
@@ -753,6 +899,96 @@ class FieldDataCache(object):
 
                 self.cache[scope].cache_fields(fields, descriptors, self.asides)
 
+    @contextmanager
+    def deferred_writes(self):
+        """
+        Hold back the user state and scores set within the block, and write
+        them when it exits, with one save per block in a single transaction.
+
+        A handler which sets a block's state and score several times then
+        saves its StudentModule (and adds to its history) only once.
+        """
+        user_state = self.cache[Scope.user_state]
+        user_state.defer_writes()
+        self._after_writes = []
+        try:
+            yield
+        finally:
+            after_writes, self._after_writes = self._after_writes, None
+            user_state.stop_deferring_writes()
+            for callback in after_writes:
+                callback()
+
+    def after_writes(self, callback):
+        """
+        Call `callback` once the user state and scores set so far are written to
+        the database: when `deferred_writes` exits, or right away if writes
+        aren't held back.
+        """
+        if self._after_writes is None:
+            callback()
+        else:
+            self._after_writes.append(callback)
+
+    def flush_writes(self):
+        """
+        Write the user state and scores held back by `deferred_writes` so far.
+        """
+        self.cache[Scope.user_state].flush()
+
+    def prefetch_user_state(self, usage_keys):
+        """
+        Load the user's state of the blocks with `usage_keys` in a single query,
+        without loading the blocks themselves. Descriptors added later then only
+        load their data of the other scopes.
+        """
+        if self.user.is_authenticated():
+            self.cache[Scope.user_state].cache_usage_keys(usage_keys)
+
+    @profiling.profiled_function('field_data_cache.prefetch_course')
+    def prefetch_course(self, descriptors):
+        """
+        Load all of the user's data for `descriptors`, which should be all the
+        blocks of the course that will be used with this FieldDataCache.
+
+        The user's state is loaded for the whole course in a single query, and
+        the other scopes in a fixed number of chunked queries, so that later
+        reads are answered from memory no matter how many blocks are used.
+        Blocks added or read later, which weren't in `descriptors`, are logged
+        and recorded in `straggler_usage_keys`.
+        """
+        if self.user.is_authenticated():
+            self.cache[Scope.user_state].cache_course()
+            for scope, fields in self._fields_to_cache(descriptors).items():
+                if scope in self.cache and scope != Scope.user_state:
+                    self.cache[scope].cache_fields(fields, descriptors, self.asides)
+
+        self.prefetched_usage_keys = _all_usage_keys(descriptors, self.asides)
+
+    def _report_stragglers(self, usage_keys):
+        """
+        Log the `usage_keys` which `prefetch_course` didn't load, the first time they are seen.
+        """
+        new_stragglers = set(usage_keys) - self.straggler_usage_keys
+        if new_stragglers:
+            log.warning(
+                "Blocks of %s used after the course's field data was prefetched: %s",
+                self.course_id,
+                ", ".join(sorted(unicode(usage_key) for usage_key in new_stragglers)),
+            )
+            self.straggler_usage_keys.update(new_stragglers)
+
+    def _check_prefetched(self, key):
+        """
+        Report a read of `key` if it belongs to a block which `prefetch_course` didn't load.
+        """
+        if (
+                self.prefetched_usage_keys is not None and
+                key.scope.block == BlockScope.USAGE and
+                key.block_scope_id not in self.prefetched_usage_keys
+        ):
+            self._report_stragglers([key.block_scope_id])
+
     def add_descriptor_descendents(self, descriptor, depth=None, descriptor_filter=lambda descriptor: True):
         """
         Add all descendants of `descriptor` to this FieldDataCache.
@@ -811,6 +1047,26 @@ class FieldDataCache(object):
         cache.add_descriptor_descendents(descriptor, depth, descriptor_filter)
         return cache
 
+    @classmethod
+    def cache_for_course(cls, course, user, descriptors=None, asides=None):
+        """
+        Return a FieldDataCache prefetched with all of `user`'s data for `course`.
+
+        course: the course descriptor.
+        user: the django user for whom to load data.
+        descriptors: the blocks of the course which will be used. Defaults to
+            every block of the course.
+        asides: The list of aside types to load, or None to prefetch no asides.
+        """
+        if descriptors is None:
+            store = modulestore()
+            with store.bulk_operations(course.id):
+                descriptors = store.get_items(course.id)
+
+        cache = FieldDataCache([], course.id, user, asides=asides)
+        cache.prefetch_course(descriptors)
+        return cache
+
     def _fields_to_cache(self, descriptors):
         """
         Returns a map of scopes to fields in that scope that should be cached
@@ -841,8 +1097,10 @@ class FieldDataCache(object):
         if key.scope not in self.cache:
             raise KeyError(key.field_name)
 
+        self._check_prefetched(key)
         return self.cache[key.scope].get(key)
 
+    @profiling.profiled_function('field_data_cache.set_many')
     @contract(kv_dict="dict(DjangoKeyValueStore_Key: *)")
     def set_many(self, kv_dict):
         """
@@ -918,6 +1176,7 @@ class FieldDataCache(object):
         if key.scope not in self.cache:
             return False
 
+        self._check_prefetched(key)
         return self.cache[key.scope].has(key)
 
     @contract(user_id=int, usage_key=UsageKey, score="number|None", max_score="number|None")
@@ -12,19 +12,24 @@ file and check it in at the same time as your model changes. To do that,
 ASSUMPTIONS: modules have unique IDs, even across different module_types
 
 """
+import json
 import logging
 import itertools
+from collections import defaultdict
 
 from django.contrib.auth.models import User
 from django.conf import settings
 from django.db import models
+from django.db.models import Count, Max
 from django.db.models.signals import post_save
 from django.dispatch import receiver, Signal
 
 from model_utils.models import TimeStampedModel
+from opaque_keys.edx.keys import CourseKey, UsageKey
 from student.models import user_by_anonymous_id
 from submissions.models import score_set, score_reset
 
+from xmodule.graders import Score
 from xmodule_django.models import CourseKeyField, LocationKeyField, BlockTypeKeyField  # pylint: disable=import-error
 
 log = logging.getLogger("edx.courseware")
@@ -281,6 +286,131 @@ class OfflineComputedGradeLog(models.Model):
         return "[OCGLog] %s: %s" % (self.course_id.to_deprecated_string(), self.created)  # pylint: disable=no-member
 
 
+class PersistentSectionGrade(TimeStampedModel):
+    """
+    The most recently computed grade of a graded section for a student.
+
+    Rows are written by `courseware.grades` when FEATURES['ENABLE_PERSISTENT_GRADES']
+    is enabled. A row is only valid for the `course_version` it was computed
+    against, and is deleted whenever the score of one of its problems changes.
+    """
+    class Meta(object):  # pylint: disable=missing-docstring
+        unique_together = (('user', 'course_id', 'usage_key'),)
+
+    user = models.ForeignKey(User, db_index=True)
+    course_id = CourseKeyField(max_length=255, db_index=True)
+    usage_key = LocationKeyField(max_length=255, db_index=True)
+
+    # Identifies the published version of the course the grade was computed against
+    course_version = models.CharField(max_length=255, blank=True, default='')
+
+    earned = models.FloatField()
+    possible = models.FloatField()
+
+    # The scores of every scored block in the section, stored as a JSON list of
+    # [earned, possible, graded, display_name, usage_key] lists
+    raw_scores = models.TextField(default='[]')
+
+    def __unicode__(self):
+        return u"[PersistentSectionGrade] {}: {} {} = {}/{}".format(
+            self.user_id, self.course_id, self.usage_key, self.earned, self.possible
+        )
+
+    @classmethod
+    def grades_for(cls, user, course_key, course_version):
+        """
+        Return a dict mapping section usage keys to the grades stored for `user`
+        in `course_key` which are still valid for `course_version`.
+        """
+        return {
+            section_grade.usage_key: section_grade
+            for section_grade in cls.objects.filter(user=user, course_id=course_key)
+            if section_grade.course_version == course_version
+        }
+
+    @classmethod
+    def grades_for_users(cls, user_ids, course_key, course_version):
+        """
+        Return a dict mapping each of `user_ids` which has stored grades in
+        `course_key` to the dict grades_for would return for that user.
+        """
+        grades = defaultdict(dict)
+        for section_grade in cls.objects.filter(user_id__in=user_ids, course_id=course_key):
+            if section_grade.course_version == course_version:
+                grades[section_grade.user_id][section_grade.usage_key] = section_grade
+        return dict(grades)
+
+    @staticmethod
+    def modules_version(user_id, usage_keys):
+        """
+        Return the number of StudentModules of the user for `usage_keys`, and when the
+        last of them was modified, which change whenever one of them is saved or deleted.
+        """
+        stats = StudentModule.objects.filter(student_id=user_id, module_state_key__in=usage_keys).aggregate(
+            count=Count('id'), modified=Max('modified')
+        )
+        return stats['count'], stats['modified']
+
+    @classmethod
+    def save_section_grade(cls, user, course_key, usage_key, course_version, graded_total, scores,
+                           scorable_locations=None, modules_version=None):
+        """
+        Store the grade of the section `usage_key`, unless the StudentModules of its
+        scorable blocks changed since it was computed.
+
+        Arguments:
+            graded_total (Score): the graded total of the section
+            scores (list of Score): the scores of the section's scored blocks
+            scorable_locations (list of UsageKey): the section's scorable blocks
+            modules_version: what `modules_version` returned for scorable_locations before
+                the scores were read, or None to store the grade regardless
+
+        Returns the stored PersistentSectionGrade, or None if it wasn't stored.
+        """
+        section_grade, __ = cls.objects.get_or_create(
+            user=user,
+            course_id=course_key,
+            usage_key=usage_key,
+            defaults={'earned': graded_total.earned, 'possible': graded_total.possible},
+        )
+        section_grade.course_version = course_version
+        section_grade.earned = graded_total.earned
+        section_grade.possible = graded_total.possible
+        section_grade.raw_scores = json.dumps([
+            [score.earned, score.possible, score.graded, score.section, unicode(score.module_id)]
+            for score in scores
+        ])
+        section_grade.save()
+
+        # Checked once the grade is saved: a score changed before the check is caught by it, and
+        # the invalidation following a score changed after it deletes the grade just saved.
+        if modules_version is not None and cls.modules_version(user.id, scorable_locations) != modules_version:
+            section_grade.delete()
+            return None
+        return section_grade
+
+    @classmethod
+    def invalidate(cls, user_id, course_key, usage_key):
+        """
+        Delete the stored grades of every section of `course_key` containing `usage_key`.
+        """
+        cls.objects.filter(
+            user_id=user_id,
+            course_id=course_key,
+            raw_scores__contains=json.dumps(unicode(usage_key)),
+        ).delete()
+
+    @property
+    def scores(self):
+        """
+        The stored list of block scores, as `xmodule.graders.Score` tuples.
+        """
+        return [
+            Score(earned, possible, graded, display_name, UsageKey.from_string(usage_key))
+            for earned, possible, graded, display_name, usage_key in json.loads(self.raw_scores)
+        ]
+
+
 class StudentFieldOverride(TimeStampedModel):
     """
     Holds the value of a specific field overriden for a student.  This is used
@@ -394,3 +524,18 @@ def submissions_score_reset_handler(sender, **kwargs):  # pylint: disable=unused
             u"Failed to process score_reset signal from Submissions API. "
             "user: %s, course_id: %s, usage_id: %s", user, course_id, usage_id
         )
+
+
+@receiver(SCORE_CHANGED)
+def invalidate_persistent_grades_handler(sender, **kwargs):  # pylint: disable=unused-argument
+    """
+    Consume the SCORE_CHANGED signal and delete the stored grades of the
+    sections containing the problem whose score changed, so that they are
+    recomputed the next time the student is graded.
+    """
+    if not settings.FEATURES.get('ENABLE_PERSISTENT_GRADES', False):
+        return
+
+    course_key = CourseKey.from_string(kwargs['course_id'])
+    usage_key = UsageKey.from_string(kwargs['usage_id']).map_into_course(course_key)
+    PersistentSectionGrade.invalidate(kwargs['user_id'], course_key, usage_key)
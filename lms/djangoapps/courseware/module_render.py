@@ -18,7 +18,6 @@ from opaque_keys import InvalidKeyError
 
 from django.conf import settings
 from django.contrib.auth.models import User
-from django.core.cache import cache
 from django.core.context_processors import csrf
 from django.core.exceptions import PermissionDenied
 from django.core.urlresolvers import reverse
@@ -70,7 +69,7 @@ from xmodule.x_module import XModuleDescriptor
 from xmodule.mixin import wrap_with_license
 from xblock_django.user_service import DjangoXBlockUserService
 from util.json_request import JsonResponse
-from util.sandboxing import can_execute_unsafe_code, get_python_lib_zip
+from util.sandboxing import can_execute_unsafe_code, get_python_lib_zip, safe_exec_cache
 from util import milestones_helpers
 from util.module_utils import yield_dynamic_descriptor_descendents
 from verify_student.services import ReverificationService
@@ -441,24 +440,32 @@ def get_module_system_for_user(user, field_data_cache,
 
         dog_stats_api.increment("lms.courseware.question_answered", tags=tags)
 
-        # Cycle through the milestone fulfillment scenarios to see if any are now applicable
-        # thanks to the updated grading information that was just submitted
-        _fulfill_content_milestones(
-            user,
-            course_id,
-            descriptor.location,
-        )
+        def score_written():
+            """
+            Act on the score once it is in the database, where the milestones and
+            the listeners of SCORE_CHANGED read it.
+            """
+            # Cycle through the milestone fulfillment scenarios to see if any are now applicable
+            # thanks to the updated grading information that was just submitted
+            _fulfill_content_milestones(
+                user,
+                course_id,
+                descriptor.location,
+            )
 
-        # Send a signal out to any listeners who are waiting for score change
-        # events.
-        SCORE_CHANGED.send(
-            sender=None,
-            points_possible=event['max_value'],
-            points_earned=event['value'],
-            user_id=user_id,
-            course_id=unicode(course_id),
-            usage_id=unicode(descriptor.location)
-        )
+            # Send a signal out to any listeners who are waiting for score change events.
+            SCORE_CHANGED.send(
+                sender=None,
+                points_possible=event['max_value'],
+                points_earned=event['value'],
+                user_id=user_id,
+                course_id=unicode(course_id),
+                usage_id=unicode(descriptor.location)
+            )
+
+        # When the handler's writes are held back, that's once the handler is done, so that
+        # the state it saves after publishing the grade is written along with the score
+        field_data_cache.after_writes(score_written)
 
     def publish(block, event_type, event):
         """A function that allows XModules to publish events."""
@@ -628,7 +635,7 @@ def get_module_system_for_user(user, field_data_cache,
         course_id=course_id,
         open_ended_grading_interface=open_ended_grading_interface,
         s3_interface=s3_interface,
-        cache=cache,
+        cache=safe_exec_cache(),
         can_execute_unsafe_code=(lambda: can_execute_unsafe_code(course_id)),
         get_python_lib_zip=(lambda: get_python_lib_zip(contentstore, course_id)),
         # TODO: When we merge the descriptor and module systems, we can stop reaching into the mixologist (cpennington)
@@ -842,6 +849,16 @@ def get_module_by_usage_id(request, course_id, usage_id):
 
     Returns (instance, tracking_context)
     """
+    instance, tracking_context, _ = _get_module_and_field_data_cache_by_usage_id(request, course_id, usage_id)
+    return (instance, tracking_context)
+
+
+def _get_module_and_field_data_cache_by_usage_id(request, course_id, usage_id):
+    """
+    Gets a module instance based on its `usage_id` in a course, for a given request/user
+
+    Returns (instance, tracking_context, field_data_cache)
+    """
     user = request.user
 
     try:
@@ -887,7 +904,7 @@ def get_module_by_usage_id(request, course_id, usage_id):
         log.debug("No module %s for user %s -- access denied?", usage_key, user)
         raise Http404
 
-    return (instance, tracking_context)
+    return (instance, tracking_context, field_data_cache)
 
 
 def _invoke_xblock_handler(request, course_id, usage_id, handler, suffix):
@@ -908,7 +925,9 @@ def _invoke_xblock_handler(request, course_id, usage_id, handler, suffix):
     if error_msg:
         return JsonResponse(object={'success': error_msg}, status=413)
 
-    instance, tracking_context = get_module_by_usage_id(request, course_id, usage_id)
+    instance, tracking_context, field_data_cache = _get_module_and_field_data_cache_by_usage_id(
+        request, course_id, usage_id
+    )
 
     # Name the transaction so that we can view XBlock handlers separately in
     # New Relic. The suffix is necessary for XModule handlers because the
@@ -921,7 +940,9 @@ def _invoke_xblock_handler(request, course_id, usage_id, handler, suffix):
     req = django_to_webob_request(request)
     try:
         with tracker.get_tracker().context(tracking_context_name, tracking_context):
-            resp = instance.handle(handler, req, suffix)
+            # Save each block's state and score once, however many times the handler sets them
+            with field_data_cache.deferred_writes():
+                resp = instance.handle(handler, req, suffix)
 
     except NoSuchHandlerError:
         log.exception("XBlock %s attempted to access missing handler %r", instance, handler)
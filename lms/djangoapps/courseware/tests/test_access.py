@@ -11,7 +11,9 @@ import courseware.access as access
 from courseware.masquerade import CourseMasquerade
 from courseware.tests.factories import UserFactory, StaffFactory, InstructorFactory
 from courseware.tests.helpers import LoginEnrollmentTestCase
+from openedx.core.djangoapps.content.course_overviews.models import CourseOverview
 from student.tests.factories import AnonymousUserFactory, CourseEnrollmentAllowedFactory, CourseEnrollmentFactory
+from xmodule import profiling
 from xmodule.course_module import (
     CATALOG_VISIBILITY_CATALOG_AND_ABOUT, CATALOG_VISIBILITY_ABOUT,
     CATALOG_VISIBILITY_NONE
@@ -212,6 +214,42 @@ class AccessTestCase(LoginEnrollmentTestCase, ModuleStoreTestCase):
         mock_unit.start = datetime.datetime.now(pytz.utc) + datetime.timedelta(days=1)  # release date in the future
         self.verify_access(mock_unit, False)
 
+    @patch.dict('django.conf.settings.FEATURES', {'DISABLE_START_DATES': False})
+    def test__has_access_descriptor_cached_for_request(self):
+        """
+        Tests that the access decisions on a block are cached during a request.
+        """
+        mock_unit = Mock(user_partitions=[], visible_to_staff_only=False, start=None)
+        mock_unit._class_tags = {}  # Needed for detached check in _has_access_descriptor
+        course_key = self.course.course_key
+
+        profile = profiling.start_profile()
+        self.addCleanup(profiling.stop_profile)
+        with patch('courseware.access.get_current_request', Mock(return_value=Mock())):
+            self.assertTrue(access._has_access_descriptor(self.student, 'load', mock_unit, course_key))
+            mock_unit.visible_to_staff_only = True
+            self.assertTrue(access._has_access_descriptor(self.student, 'load', mock_unit, course_key))
+            self.assertFalse(access._has_access_descriptor(self.anonymous_user, 'load', mock_unit, course_key))
+        # The reused and computed decisions are reported in the request profile
+        self.assertEqual(profile.counts['access.decision_cached'], 1)
+        self.assertEqual(profile.counts['access.decision_computed'], 2)
+
+        # Outside of requests, the decisions are computed each time
+        self.assertFalse(access._has_access_descriptor(self.student, 'load', mock_unit, course_key))
+
+    def test__has_access_descriptor_cached_for_masquerade(self):
+        """
+        Tests that the decisions cached before the masquerade of staff is set up aren't used once it is.
+        """
+        mock_unit = Mock(user_partitions=[], visible_to_staff_only=True, start=None)
+        mock_unit._class_tags = {}  # Needed for detached check in _has_access_descriptor
+        course_key = self.course.course_key
+
+        with patch('courseware.access.get_current_request', Mock(return_value=Mock())):
+            self.assertTrue(access._has_access_descriptor(self.course_staff, 'load', mock_unit, course_key))
+            self.course_staff.masquerade_settings = {course_key: CourseMasquerade(course_key, role='student')}
+            self.assertFalse(access._has_access_descriptor(self.course_staff, 'load', mock_unit, course_key))
+
     def test__has_access_course_desc_can_enroll(self):
         yesterday = datetime.datetime.now(pytz.utc) - datetime.timedelta(days=1)
         tomorrow = datetime.datetime.now(pytz.utc) + datetime.timedelta(days=1)
@@ -256,6 +294,22 @@ class AccessTestCase(LoginEnrollmentTestCase, ModuleStoreTestCase):
         )
         self.assertFalse(access._has_access_course_desc(user, 'enroll', course))
 
+    def test__has_access_course_overview(self):
+        """
+        Test that the overview of a course gives the same access as the course itself
+        """
+        tomorrow = datetime.datetime.now(pytz.utc) + datetime.timedelta(days=1)
+        course = CourseFactory.create(start=tomorrow, catalog_visibility=CATALOG_VISIBILITY_ABOUT)
+        course_overview = CourseOverview.get_from_id(course.id)
+        course_staff = StaffFactory(course_key=course.id)
+        for user in (self.anonymous_user, self.student, course_staff, self.global_staff):
+            for action in ('load', 'see_exists', 'see_in_catalog', 'see_about_page', 'enroll', 'staff'):
+                self.assertEqual(
+                    bool(access.has_access(user, action, course)),
+                    bool(access.has_access(user, action, course_overview)),
+                    "{} {}".format(user, action)
+                )
+
     def test__user_passed_as_none(self):
         """Ensure has_access handles a user being passed as null"""
         access.has_access(None, 'staff', 'global', None)
@@ -1,14 +1,22 @@
 """
 Test grade calculation.
 """
+from datetime import timedelta
+
+from django.conf import settings
 from django.http import Http404
+from django.test.client import RequestFactory
+from django.utils import timezone
 from mock import patch
 from nose.plugins.attrib import attr
 from opaque_keys.edx.locations import SlashSeparatedCourseKey
 
-from courseware.grades import grade, iterate_grades_for
+from courseware.grades import CourseGradingContext, get_score, grade, iterate_grades_for, iterate_grades_for_bulk
+from courseware.models import PersistentSectionGrade, StudentModule, SCORE_CHANGED
+from courseware.tests.factories import StudentModuleFactory
+from instructor_task.tasks_helper import delete_problem_module_state
 from student.tests.factories import UserFactory
-from xmodule.modulestore.tests.factories import CourseFactory
+from xmodule.modulestore.tests.factories import CourseFactory, ItemFactory
 from xmodule.modulestore.tests.django_utils import ModuleStoreTestCase
 
 
@@ -121,3 +129,216 @@ class TestGradeIteration(ModuleStoreTestCase):
                 students_to_errors[student] = err_msg
 
         return students_to_gradesets, students_to_errors
+
+
+@attr('shard_1')
+@patch.dict(settings.FEATURES, {'ENABLE_PERSISTENT_GRADES': True})
+class TestPersistentGrades(ModuleStoreTestCase):
+    """
+    Test that section grades are stored, reused and invalidated.
+    """
+    def setUp(self):
+        super(TestPersistentGrades, self).setUp()
+        self.course = CourseFactory.create()
+        chapter = ItemFactory.create(parent=self.course, category='chapter')
+        self.sequence = ItemFactory.create(
+            parent=chapter, category='sequential', graded=True, format='Homework'
+        )
+        self.problem = ItemFactory.create(parent=self.sequence, category='problem')
+        self.student = UserFactory.create()
+        StudentModuleFactory.create(
+            student=self.student,
+            course_id=self.course.id,
+            module_state_key=self.problem.location,
+            grade=1,
+            max_grade=2,
+        )
+        self.request = RequestFactory().get('/')
+        self.request.user = self.student
+        self.request.session = {}
+
+    def _grade(self):
+        """
+        Grade the student in the test course, keeping raw scores.
+        """
+        return grade(self.student, self.request, self.course, keep_raw_scores=True)
+
+    def test_section_grade_stored(self):
+        gradeset = self._grade()
+        section_grade = PersistentSectionGrade.objects.get(
+            user=self.student, course_id=self.course.id, usage_key=self.sequence.location
+        )
+        self.assertEqual((section_grade.earned, section_grade.possible), (1.0, 2.0))
+        self.assertEqual(section_grade.scores, gradeset['raw_scores'])
+
+    def test_stored_grade_reused(self):
+        first_gradeset = self._grade()
+        with patch('courseware.grades.get_score') as mock_get_score:
+            second_gradeset = self._grade()
+        self.assertFalse(mock_get_score.called)
+        self.assertEqual(first_gradeset['percent'], second_gradeset['percent'])
+        self.assertEqual(first_gradeset['raw_scores'], second_gradeset['raw_scores'])
+
+    def test_score_change_invalidates(self):
+        self._grade()
+        SCORE_CHANGED.send(
+            sender=None,
+            points_possible=2,
+            points_earned=2,
+            user_id=self.student.id,
+            course_id=unicode(self.course.id),
+            usage_id=unicode(self.problem.location),
+        )
+        self.assertFalse(PersistentSectionGrade.objects.filter(user=self.student).exists())
+
+    def test_state_deletion_invalidates(self):
+        self._grade()
+        student_module = StudentModule.objects.get(student=self.student, module_state_key=self.problem.location)
+        delete_problem_module_state(None, None, student_module)
+        self.assertFalse(PersistentSectionGrade.objects.filter(user=self.student).exists())
+
+    def test_score_changed_while_computed_not_stored(self):
+        def get_score_and_change_it(*args, **kwargs):
+            """Get the score, then change it as another request would."""
+            score = get_score(*args, **kwargs)
+            StudentModule.objects.filter(student=self.student).update(
+                grade=2, modified=timezone.now() + timedelta(seconds=5)
+            )
+            return score
+
+        with patch('courseware.grades.get_score', side_effect=get_score_and_change_it):
+            self._grade()
+        self.assertFalse(PersistentSectionGrade.objects.filter(user=self.student).exists())
+
+    def test_stale_course_version_ignored(self):
+        self._grade()
+        PersistentSectionGrade.objects.filter(user=self.student).update(earned=0, course_version='stale')
+        gradeset = self._grade()
+        self.assertEqual(gradeset['raw_scores'][0].earned, 1.0)
+
+
+@attr('shard_1')
+class TestCourseGradingContext(ModuleStoreTestCase):
+    """
+    Test that the grading context of a course is summarized once per version of the course.
+    """
+    def setUp(self):
+        super(TestCourseGradingContext, self).setUp()
+        self.course = CourseFactory.create()
+        chapter = ItemFactory.create(parent=self.course, category='chapter')
+        self.sequence = ItemFactory.create(
+            parent=chapter, category='sequential', graded=True, format='Homework', display_name='Graded'
+        )
+        vertical = ItemFactory.create(parent=self.sequence, category='vertical')
+        self.problem = ItemFactory.create(parent=vertical, category='problem')
+        ItemFactory.create(parent=chapter, category='sequential', graded=False)
+
+    def _get_course(self):
+        """
+        Return the test course, as it is now in the modulestore.
+        """
+        return self.store.get_course(self.course.id)
+
+    def test_graded_sections(self):
+        grading_context = CourseGradingContext.for_course(self._get_course())
+        self.assertEqual(grading_context.graded_sections.keys(), ['Homework'])
+        [section] = grading_context.graded_sections['Homework']
+        self.assertEqual(section.location, self.sequence.location)
+        self.assertEqual(section.display_name, 'Graded')
+        self.assertEqual(section.scorable_locations, (self.problem.location,))
+        self.assertFalse(section.always_recalculate)
+        self.assertEqual(len(grading_context.all_locations()), 3)
+        self.assertEqual(grading_context.get_descriptor(self.problem.location).location, self.problem.location)
+
+    def test_summarized_once_per_version(self):
+        with patch.object(
+            CourseGradingContext, '_summarize_graded_sections', wraps=CourseGradingContext._summarize_graded_sections
+        ) as mock_summarize:
+            CourseGradingContext.for_course(self._get_course())
+            CourseGradingContext.for_course(self._get_course())
+            self.assertEqual(mock_summarize.call_count, 1)
+
+            ItemFactory.create(parent_location=self.sequence.location, category='problem')
+            grading_context = CourseGradingContext.for_course(self._get_course())
+            self.assertEqual(mock_summarize.call_count, 2)
+        self.assertEqual(len(grading_context.graded_sections['Homework'][0].scorable_locations), 2)
+
+
+@attr('shard_1')
+class TestBulkGradeIteration(ModuleStoreTestCase):
+    """
+    Test that grading students in bulk gives the same grades as grading them one at a time.
+    """
+    def setUp(self):
+        super(TestBulkGradeIteration, self).setUp()
+        self.course = CourseFactory.create()
+        chapter = ItemFactory.create(parent=self.course, category='chapter')
+        sequence = ItemFactory.create(parent=chapter, category='sequential', graded=True, format='Homework')
+        self.problems = [ItemFactory.create(parent=sequence, category='problem') for __ in range(2)]
+        self.students = [UserFactory.create() for __ in range(3)]
+        for points, student in enumerate(self.students):
+            StudentModuleFactory.create(
+                student=student,
+                course_id=self.course.id,
+                module_state_key=self.problems[0].location,
+                grade=points,
+                max_grade=2,
+            )
+
+    def _gradesets(self, results):
+        """
+        Return a dict mapping students to their gradesets, checking no student failed to grade.
+        """
+        gradesets = {}
+        for student, gradeset, err_msg in results:
+            self.assertEqual(err_msg, "")
+            gradesets[student] = gradeset
+        return gradesets
+
+    def test_bulk_grades_match(self):
+        expected = self._gradesets(iterate_grades_for(self.course.id, self.students, keep_raw_scores=True))
+        actual = self._gradesets(
+            iterate_grades_for_bulk(self.course.id, self.students, keep_raw_scores=True, chunk_size=2)
+        )
+        self.assertEqual(expected, actual)
+
+    @patch.dict(settings.FEATURES, {'ENABLE_BULK_GRADING': True})
+    def test_feature_flag(self):
+        with patch('courseware.grades.iterate_grades_for_bulk') as mock_bulk:
+            iterate_grades_for(self.course, self.students)
+        mock_bulk.assert_called_once_with(self.course, self.students, False)
+
+    def test_inaccessible_problems_match(self):
+        # A problem the students can't load, like one restricted to a content group
+        hidden = self.problems[1].location
+
+        def has_access(user, action, obj, course_key=None):  # pylint: disable=unused-argument
+            """Deny access to the hidden problem only."""
+            return getattr(obj, 'location', None) != hidden
+
+        with patch('courseware.grades.has_access', has_access):
+            with patch('courseware.module_render.has_access', has_access):
+                expected = self._gradesets(iterate_grades_for(self.course.id, self.students, keep_raw_scores=True))
+                actual = self._gradesets(iterate_grades_for_bulk(self.course.id, self.students, keep_raw_scores=True))
+        self.assertEqual(expected, actual)
+        for gradeset in actual.values():
+            self.assertNotIn(hidden, [score.module_id for score in gradeset['raw_scores']])
+
+    def test_unscored_problems_not_instantiated(self):
+        StudentModuleFactory.create(
+            student=self.students[0],
+            course_id=self.course.id,
+            module_state_key=self.problems[1].location,
+            grade=1,
+            max_grade=3,
+        )
+        with patch('courseware.grades.get_module_for_descriptor') as mock_get_module:
+            gradesets = self._gradesets(iterate_grades_for_bulk(self.course, self.students, keep_raw_scores=True))
+        self.assertFalse(mock_get_module.called)
+        for gradeset in gradesets.values():
+            self.assertIn(3, [score.possible for score in gradeset['raw_scores']])
+
+    def test_scores_fetched_once_per_chunk(self):
+        with patch('courseware.grades.StudentModule.objects.get') as mock_get:
+            self._gradesets(iterate_grades_for_bulk(self.course, self.students))
+        self.assertFalse(mock_get.called)
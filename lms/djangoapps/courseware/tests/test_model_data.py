@@ -8,7 +8,7 @@ from functools import partial
 
 from courseware.model_data import DjangoKeyValueStore
 from courseware.model_data import InvalidScopeError, FieldDataCache
-from courseware.models import StudentModule
+from courseware.models import StudentModule, StudentModuleHistory
 from courseware.models import XModuleStudentInfoField, XModuleStudentPrefsField
 
 from student.tests.factories import UserFactory
@@ -416,3 +416,163 @@ class TestStudentInfoStorage(OtherUserFailureTestMixin, StorageTestBase, TestCas
     storage_class = XModuleStudentInfoField
     other_key_factory = partial(DjangoKeyValueStore.Key, Scope.user_info, 2, 'mock_problem')  # user_id=2, not 1
     existing_field_name = "existing_field"
+
+
+@attr('shard_1')
+class TestCoursePrefetch(TestCase):
+    """Tests for FieldDataCache.prefetch_course"""
+    def setUp(self):
+        super(TestCoursePrefetch, self).setUp()
+        student_module = StudentModuleFactory(state=json.dumps({'a_field': 'a_value'}))
+        self.user = student_module.student
+        self.assertEqual(self.user.id, 1)   # check our assumption hard-coded in the key functions above.
+        StudentModuleFactory(
+            student=self.user,
+            module_state_key=location('other_usage_id'),
+            state=json.dumps({'a_field': 'other_value'}),
+        )
+        UserStateSummaryFactory.create(field_name='summary_field', value=json.dumps('summary_value'))
+
+        self.descriptor = mock_descriptor([
+            mock_field(Scope.user_state, 'a_field'),
+            mock_field(Scope.user_state_summary, 'summary_field'),
+        ])
+
+        # One query for the user's state in the whole course, one for the user_state_summary fields
+        with self.assertNumQueries(2):
+            self.field_data_cache = FieldDataCache.cache_for_course(
+                Mock(id=course_id), self.user, descriptors=[self.descriptor]
+            )
+
+    def test_reads_from_memory(self):
+        with self.assertNumQueries(0):
+            self.assertEquals('a_value', self.field_data_cache.get(user_state_key('a_field')))
+            self.assertEquals('summary_value', self.field_data_cache.get(user_state_summary_key('summary_field')))
+            self.field_data_cache.add_descriptors_to_cache([self.descriptor])
+        self.assertEquals(set(), self.field_data_cache.straggler_usage_keys)
+
+    def test_user_state_of_whole_course(self):
+        other_key = DjangoKeyValueStore.Key(Scope.user_state, 1, location('other_usage_id'), 'a_field')
+        with self.assertNumQueries(0):
+            self.assertEquals('other_value', self.field_data_cache.get(other_key))
+        # The block wasn't among the descriptors, so its read is reported
+        self.assertEquals({location('other_usage_id')}, self.field_data_cache.straggler_usage_keys)
+
+    def test_stragglers(self):
+        other_descriptor = mock_descriptor([mock_field(Scope.user_state, 'a_field')])
+        other_descriptor.scope_ids = ScopeIds('user1', 'mock_problem', location('def_id'), location('other_usage_id'))
+
+        self.field_data_cache.add_descriptors_to_cache([self.descriptor, other_descriptor])
+        self.assertEquals({location('other_usage_id')}, self.field_data_cache.straggler_usage_keys)
+
+        # It is only loaded once
+        with self.assertNumQueries(0):
+            self.field_data_cache.add_descriptors_to_cache([other_descriptor])
+
+
+@attr('shard_1')
+class TestUserStatePrefetch(TestCase):
+    """Tests for FieldDataCache.prefetch_user_state"""
+    def setUp(self):
+        super(TestUserStatePrefetch, self).setUp()
+        student_module = StudentModuleFactory(state=json.dumps({'a_field': 'a_value'}))
+        self.user = student_module.student
+        self.assertEqual(self.user.id, 1)   # check our assumption hard-coded in the key functions above.
+        self.field_data_cache = FieldDataCache([], course_id, self.user)
+
+    def test_state_loaded_by_usage_key(self):
+        with self.assertNumQueries(1):
+            self.field_data_cache.prefetch_user_state([location('usage_id'), location('other_usage_id')])
+
+        # Adding the blocks later doesn't load their state again
+        descriptor = mock_descriptor([mock_field(Scope.user_state, 'a_field')])
+        with self.assertNumQueries(0):
+            self.field_data_cache.add_descriptors_to_cache([descriptor])
+            self.assertEquals('a_value', self.field_data_cache.get(user_state_key('a_field')))
+
+
+@attr('shard_1')
+class TestDeferredWrites(TestCase):
+    """Tests for FieldDataCache.deferred_writes"""
+    def setUp(self):
+        super(TestDeferredWrites, self).setUp()
+        student_module = StudentModuleFactory(state=json.dumps({'a_field': 'a_value'}))
+        self.user = student_module.student
+        self.assertEqual(self.user.id, 1)   # check our assumption hard-coded in the key functions above.
+        self.field_data_cache = FieldDataCache(
+            [mock_descriptor([mock_field(Scope.user_state, 'a_field')])], course_id, self.user
+        )
+        self.kvs = DjangoKeyValueStore(self.field_data_cache)
+
+    def test_single_save(self):
+        history_count = StudentModuleHistory.objects.count()
+        with self.field_data_cache.deferred_writes():
+            with self.assertNumQueries(0):
+                self.kvs.set(user_state_key('a_field'), 'new_value')
+                self.field_data_cache.set_score(1, location('usage_id'), 1, 2)
+                self.kvs.set(user_state_key('b_field'), 'b_value')
+                self.assertEquals('new_value', self.kvs.get(user_state_key('a_field')))
+                self.assertEquals('b_value', self.kvs.get(user_state_key('b_field')))
+
+        student_module = StudentModule.objects.get()
+        self.assertEquals({'a_field': 'new_value', 'b_field': 'b_value'}, json.loads(student_module.state))
+        self.assertEquals((1, 2), (student_module.grade, student_module.max_grade))
+        # All of the changes were saved at once
+        self.assertEquals(history_count + 1, StudentModuleHistory.objects.count())
+
+    def test_new_student_module(self):
+        other_usage_key = location('other_usage_id')
+        with self.field_data_cache.deferred_writes():
+            self.field_data_cache.set_score(1, other_usage_key, 3, 4)
+
+        student_module = StudentModule.objects.get(module_state_key=other_usage_key)
+        self.assertEquals((3, 4), (student_module.grade, student_module.max_grade))
+
+    def test_score_of_other_user(self):
+        other_user = UserFactory.create()
+        with self.field_data_cache.deferred_writes():
+            self.kvs.set(user_state_key('a_field'), 'new_value')
+            self.field_data_cache.set_score(other_user.id, location('usage_id'), 3, 4)
+
+        student_module = StudentModule.objects.get(student=self.user)
+        self.assertEquals({'a_field': 'new_value'}, json.loads(student_module.state))
+        self.assertEquals((None, None), (student_module.grade, student_module.max_grade))
+        other_student_module = StudentModule.objects.get(student=other_user)
+        self.assertEquals((3, 4), (other_student_module.grade, other_student_module.max_grade))
+
+    def test_flush_writes(self):
+        with self.field_data_cache.deferred_writes():
+            self.kvs.set(user_state_key('a_field'), 'new_value')
+            self.field_data_cache.flush_writes()
+            self.assertEquals({'a_field': 'new_value'}, json.loads(StudentModule.objects.get().state))
+
+            # Writes are still deferred after the flush
+            self.kvs.set(user_state_key('a_field'), 'newer_value')
+            self.assertEquals({'a_field': 'new_value'}, json.loads(StudentModule.objects.get().state))
+
+        self.assertEquals({'a_field': 'newer_value'}, json.loads(StudentModule.objects.get().state))
+
+    def test_after_writes(self):
+        states = []
+
+        def record_state():
+            """Record the state in the database."""
+            states.append(json.loads(StudentModule.objects.get().state))
+
+        with self.field_data_cache.deferred_writes():
+            self.kvs.set(user_state_key('a_field'), 'new_value')
+            self.field_data_cache.after_writes(record_state)
+            self.kvs.set(user_state_key('a_field'), 'newer_value')
+            self.assertEquals([], states)
+        self.assertEquals([{'a_field': 'newer_value'}], states)
+
+        # Without deferred writes, the callback is called right away
+        self.field_data_cache.after_writes(record_state)
+        self.assertEquals(2, len(states))
+
+    def test_delete_pending_field(self):
+        with self.field_data_cache.deferred_writes():
+            self.kvs.set(user_state_key('b_field'), 'b_value')
+            self.kvs.delete(user_state_key('b_field'))
+
+        self.assertEquals({'a_field': 'a_value'}, json.loads(StudentModule.objects.get().state))
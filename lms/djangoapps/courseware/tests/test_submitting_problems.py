@@ -2,14 +2,17 @@
 """
 Integration tests for submitting problem responses and getting grades.
 """
+from datetime import timedelta
 import json
 import os
 from textwrap import dedent
 
 from django.conf import settings
 from django.contrib.auth.models import User
+from django.core.cache import cache
 from django.core.urlresolvers import reverse
 from django.test.client import RequestFactory
+from django.utils import timezone
 from mock import patch
 from nose.plugins.attrib import attr
 
@@ -18,7 +21,7 @@ from capa.tests.response_xml_factory import (
     CodeResponseXMLFactory,
 )
 from courseware import grades
-from courseware.models import StudentModule
+from courseware.models import StudentModule, StudentModuleHistory
 from courseware.tests.helpers import LoginEnrollmentTestCase
 from lms.djangoapps.lms_xblock.runtime import quote_slashes
 from student.tests.factories import UserFactory
@@ -402,6 +405,18 @@ class TestCourseGrader(TestSubmittingProblems):
         )
         self.assertEqual(json.loads(resp.content).get("success"), err_msg)
 
+    def test_check_saved_once(self):
+        """A check saves the problem's state and score together, in one history row"""
+        self.basic_setup()
+        resp = self.submit_question_answer('p1', {'2_1': 'Correct'})
+        self.assertEqual(resp.status_code, 200)
+
+        student_module = StudentModule.objects.get(
+            student=self.student_user, module_state_key=self.problem_location('p1')
+        )
+        self.assertEqual((student_module.grade, student_module.max_grade), (1, 1))
+        self.assertEqual(StudentModuleHistory.objects.filter(student_module=student_module).count(), 1)
+
     def test_submission_reset(self):
         """Test problem ProcessingErrors due to resets"""
         self.basic_setup(reset=True)
@@ -1053,6 +1068,58 @@ class TestAnswerDistributions(TestSubmittingProblems):
             )
 
 
+    @patch('courseware.grades.ANSWER_DISTRIBUTION_CHUNK_SIZE', 2)
+    def test_unchanged_chunks_not_reread(self):
+        # Chunks of StudentModules which haven't changed since they were last
+        # read are counted from the cache, and only new ones are read.
+        self.submit_question_answer('p1', {'2_1': u'Correct'})
+        self.submit_question_answer('p2', {'2_1': u'Incorrect'})
+        self.submit_question_answer('p3', {'2_1': u'Correct'})
+        StudentModule.objects.filter(course_id=self.course.id).update(
+            modified=timezone.now() - timedelta(minutes=5)
+        )
+        expected = {
+            ('p1', 'p1', '{}_2_1'.format(self.p1_html_id)): {'Correct': 1},
+            ('p2', 'p2', '{}_2_1'.format(self.p2_html_id)): {'Incorrect': 1},
+            ('p3', 'p3', '{}_2_1'.format(self.p3_html_id)): {'Correct': 1},
+        }
+        self.assertEqual(grades.answer_distributions(self.course.id), expected)
+
+        with patch('courseware.grades._count_answers', wraps=grades._count_answers) as mock_count_answers:
+            self.assertEqual(grades.answer_distributions(self.course.id), expected)
+            self.assertFalse(mock_count_answers.called)
+
+            # Another student answers p1
+            problem = StudentModule.objects.get(
+                course_id=self.course.id, student=self.student_user, module_state_key=self.problem_location('p1')
+            )
+            problem.pk = None
+            problem.student = UserFactory.create()
+            problem.save()
+            expected[('p1', 'p1', '{}_2_1'.format(self.p1_html_id))]['Correct'] = 2
+            self.assertEqual(grades.answer_distributions(self.course.id), expected)
+            self.assertEqual(mock_count_answers.call_count, 1)
+            self.assertEqual([module.id for module in mock_count_answers.call_args[0][0]], [problem.id])
+
+    @patch('courseware.grades.ANSWER_DISTRIBUTION_CHUNK_SIZE', 2)
+    def test_evicted_chunks_reread(self):
+        # The answer counts of each chunk are cached under their own key, and
+        # a chunk whose counts were evicted is read again.
+        self.submit_question_answer('p1', {'2_1': u'Correct'})
+        self.submit_question_answer('p2', {'2_1': u'Incorrect'})
+        self.submit_question_answer('p3', {'2_1': u'Correct'})
+        StudentModule.objects.filter(course_id=self.course.id).update(
+            modified=timezone.now() - timedelta(minutes=5)
+        )
+        expected = grades.answer_distributions(self.course.id)
+        cache.delete(grades._answer_distribution_chunk_cache_key(self.course.id, 0))  # pylint: disable=protected-access
+
+        with patch('courseware.grades._count_answers', wraps=grades._count_answers) as mock_count_answers:
+            self.assertEqual(grades.answer_distributions(self.course.id), expected)
+            self.assertEqual(mock_count_answers.call_count, 1)
+            self.assertEqual(len(mock_count_answers.call_args[0][0]), 2)
+
+
 @attr('shard_1')
 class TestConditionalContent(TestSubmittingProblems):
     """
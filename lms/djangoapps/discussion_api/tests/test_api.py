@@ -30,7 +30,7 @@ from django_comment_common.models import (
     Role,
 )
 from openedx.core.djangoapps.course_groups.models import CourseUserGroupPartitionGroup
-from openedx.core.djangoapps.course_groups.tests.helpers import CohortFactory
+from openedx.core.djangoapps.course_groups.tests.helpers import CohortFactory, clear_cohort_caches
 from student.tests.factories import CourseEnrollmentFactory, UserFactory
 from xmodule.modulestore.django import modulestore
 from xmodule.modulestore.tests.django_utils import ModuleStoreTestCase
@@ -55,6 +55,7 @@ class GetCourseTopicsTest(ModuleStoreTestCase):
 
     def setUp(self):
         super(GetCourseTopicsTest, self).setUp()
+        self.addCleanup(clear_cohort_caches)
         self.maxDiff = None  # pylint: disable=invalid-name
         self.partition = UserPartition(
             0,
@@ -360,6 +361,7 @@ class GetThreadListTest(CommentsServiceMockMixin, ModuleStoreTestCase):
     """Test for get_thread_list"""
     def setUp(self):
         super(GetThreadListTest, self).setUp()
+        self.addCleanup(clear_cohort_caches)
         httpretty.reset()
         httpretty.enable()
         self.addCleanup(httpretty.disable)
@@ -579,6 +581,7 @@ class GetCommentListTest(CommentsServiceMockMixin, ModuleStoreTestCase):
     """Test for get_comment_list"""
     def setUp(self):
         super(GetCommentListTest, self).setUp()
+        self.addCleanup(clear_cohort_caches)
         httpretty.reset()
         httpretty.enable()
         self.addCleanup(httpretty.disable)
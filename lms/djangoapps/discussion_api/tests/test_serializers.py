@@ -20,13 +20,14 @@ from django_comment_common.models import (
 from student.tests.factories import UserFactory
 from xmodule.modulestore.tests.django_utils import ModuleStoreTestCase
 from xmodule.modulestore.tests.factories import CourseFactory
-from openedx.core.djangoapps.course_groups.tests.helpers import CohortFactory
+from openedx.core.djangoapps.course_groups.tests.helpers import CohortFactory, clear_cohort_caches
 
 
 @ddt.ddt
 class SerializerTestMixin(CommentsServiceMockMixin):
     def setUp(self):
         super(SerializerTestMixin, self).setUp()
+        self.addCleanup(clear_cohort_caches)
         httpretty.reset()
         httpretty.enable()
         self.addCleanup(httpretty.disable)
@@ -316,9 +316,9 @@ class SingleThreadQueryCountTestCase(ModuleStoreTestCase):
     MODULESTORE = TEST_DATA_MONGO_MODULESTORE
 
     @ddt.data(
-        # old mongo with cache: 15
-        (ModuleStoreEnum.Type.mongo, 1, 21, 15, 40, 27),
-        (ModuleStoreEnum.Type.mongo, 50, 315, 15, 628, 27),
+        # old mongo with cache: 14 (the discussion module index is only built once)
+        (ModuleStoreEnum.Type.mongo, 1, 21, 14, 40, 27),
+        (ModuleStoreEnum.Type.mongo, 50, 315, 14, 628, 27),
         # split mongo: 3 queries, regardless of thread response size.
         (ModuleStoreEnum.Type.split, 1, 3, 3, 40, 27),
         (ModuleStoreEnum.Type.split, 50, 3, 3, 628, 27),
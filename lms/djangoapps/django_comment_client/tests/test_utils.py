@@ -723,6 +723,39 @@ class CategoryMapTestCase(CategoryMapTestMixin, ModuleStoreTestCase):
             }
         )
 
+    def get_accessible_discussion_ids(self, user):
+        """
+        Return the discussion ids of the discussion modules of a freshly loaded
+        copy of the course which user can access.
+        """
+        course = self.store.get_course(self.course.id)
+        return [summary.discussion_id for summary in utils.get_accessible_discussion_modules(course, user)]
+
+    def test_discussion_module_index_cached_per_version(self):
+        self.create_discussion("Chapter 1", "Discussion 1")
+        with mock.patch.object(self.store, 'get_items', wraps=self.store.get_items) as mock_get_items:
+            self.assertEqual(self.get_accessible_discussion_ids(self.instructor), ["discussion1"])
+            self.assertEqual(self.get_accessible_discussion_ids(self.instructor), ["discussion1"])
+            self.assertEqual(mock_get_items.call_count, 1)
+
+        # Changing the course gives it a new version, whose index is built anew
+        self.create_discussion("Chapter 1", "Discussion 2")
+        with mock.patch.object(self.store, 'get_items', wraps=self.store.get_items) as mock_get_items:
+            self.assertItemsEqual(self.get_accessible_discussion_ids(self.instructor), ["discussion1", "discussion2"])
+            self.assertEqual(mock_get_items.call_count, 1)
+
+    def test_discussion_module_index_filtered_per_user(self):
+        later = datetime.datetime(datetime.MAXYEAR, 1, 1, tzinfo=django_utc())
+        self.create_discussion("Chapter 1", "Discussion 1")
+        self.create_discussion("Chapter 1", "Discussion 2", visible_to_staff_only=True)
+        self.create_discussion("Chapter 1", "Discussion 3", start=later)
+        student = UserFactory.create()
+
+        self.assertItemsEqual(
+            self.get_accessible_discussion_ids(self.instructor), ["discussion1", "discussion2", "discussion3"]
+        )
+        self.assertEqual(self.get_accessible_discussion_ids(student), ["discussion1"])
+
     def test_ids_empty(self):
         self.assertEqual(utils.get_discussion_categories_ids(self.course, self.user), [])
 
@@ -3,7 +3,7 @@ Utilities for tests within the django_comment_client module.
 """
 from mock import patch
 
-from openedx.core.djangoapps.course_groups.tests.helpers import CohortFactory
+from openedx.core.djangoapps.course_groups.tests.helpers import CohortFactory, clear_cohort_caches
 from django_comment_common.models import Role
 from django_comment_common.utils import seed_permissions_roles
 from student.tests.factories import CourseEnrollmentFactory, UserFactory
@@ -18,6 +18,7 @@ class CohortedTestCase(ModuleStoreTestCase):
     @patch.dict("django.conf.settings.FEATURES", {"ENABLE_DISCUSSION_SERVICE": True})
     def setUp(self):
         super(CohortedTestCase, self).setUp()
+        self.addCleanup(clear_cohort_caches)
 
         self.course = CourseFactory.create(
             cohort_config={
@@ -1,4 +1,4 @@
-from collections import defaultdict
+from collections import defaultdict, namedtuple
 from datetime import datetime
 import json
 import logging
@@ -15,10 +15,12 @@ from opaque_keys.edx.keys import CourseKey
 from xmodule.modulestore.django import modulestore
 
 from django_comment_common.models import Role, FORUM_ROLE_STUDENT
+from django_comment_client import permissions
 from django_comment_client.permissions import check_permissions_by_view, cached_has_permission
 from edxmako import lookup_template
 
-from courseware.access import has_access
+from courseware.access import filter_loadable_block_summaries, has_access
+from courseware.grades import course_grading_version
 from openedx.core.djangoapps.course_groups.cohorts import (
     get_course_cohort_settings, get_cohort_by_id, get_cohort_id, is_commentable_cohorted, is_course_cohorted
 )
@@ -61,12 +63,30 @@ def has_forum_access(uname, course_id, rolename):
     return role.users.filter(username=uname).exists()
 
 
-def get_accessible_discussion_modules(course, user, include_all=False):  # pylint: disable=invalid-name
+# The attributes of a discussion module which the forums use, kept in the
+# discussion module index of its course. has_group_access_restrictions tells
+# whether the module (or one of its ancestors) restricts access to some groups.
+DiscussionModuleSummary = namedtuple('DiscussionModuleSummary', [
+    'location', 'discussion_id', 'discussion_category', 'discussion_target', 'sort_key', 'start',
+    'days_early_for_beta', 'visible_to_staff_only', 'has_group_access_restrictions',
+])
+
+DISCUSSION_MODULE_INDEX_TIMEOUT = 60 * 60 * 24
+
+
+def _get_discussion_module_index(course):
     """
-    Return a list of all valid discussion modules in this course that
-    are accessible to the given user.
+    Return the summaries of all the valid discussion modules in this course.
+
+    The index is cached for each published version of the course, so the
+    modulestore is only scanned for the discussion modules once per publish.
     """
-    all_modules = modulestore().get_items(course.id, qualifiers={'category': 'discussion'})
+    course_version = course_grading_version(course)
+    cache_key = u'discussion_module_index.{}.{}'.format(course.id, course_version)
+    if course_version:
+        index = permissions.CACHE.get(cache_key)
+        if index is not None:
+            return index
 
     def has_required_keys(module):
         for key in ('discussion_id', 'discussion_category', 'discussion_target'):
@@ -75,9 +95,55 @@ def get_accessible_discussion_modules(course, user, include_all=False):  # pylin
                 return False
         return True
 
+    index = [
+        DiscussionModuleSummary(
+            location=module.location,
+            discussion_id=module.discussion_id,
+            discussion_category=module.discussion_category,
+            discussion_target=module.discussion_target,
+            sort_key=module.sort_key,
+            start=module.start,
+            days_early_for_beta=module.days_early_for_beta,
+            visible_to_staff_only=module.visible_to_staff_only,
+            has_group_access_restrictions=bool(module.merged_group_access),
+        )
+        for module in modulestore().get_items(course.id, qualifiers={'category': 'discussion'})
+        if has_required_keys(module)
+    ]
+
+    # Courses from the XML modulestore have no version to key their index on
+    if course_version:
+        permissions.CACHE.set(cache_key, index, DISCUSSION_MODULE_INDEX_TIMEOUT)
+    return index
+
+
+def get_accessible_discussion_modules(course, user, include_all=False):  # pylint: disable=invalid-name
+    """
+    Return a list of summaries (DiscussionModuleSummary) of all valid discussion
+    modules in this course that are accessible to the given user.
+
+    The summaries come from the cached discussion module index of the course, so
+    only the modules which restrict access to some groups are loaded to check it.
+    """
+    index = _get_discussion_module_index(course)
+    if include_all:
+        return index
+
+    loadable_locations = set(
+        summary.location for summary in filter_loadable_block_summaries(
+            user,
+            (summary for summary in index if not summary.has_group_access_restrictions),
+            course.id
+        )
+    )
+    store = modulestore()
     return [
-        module for module in all_modules
-        if has_required_keys(module) and (include_all or has_access(user, 'load', module, course.id))
+        summary for summary in index
+        if (
+            has_access(user, 'load', store.get_item(summary.location), course.id)
+            if summary.has_group_access_restrictions
+            else summary.location in loadable_locations
+        )
     ]
 
 
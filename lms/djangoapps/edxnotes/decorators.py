@@ -51,5 +51,19 @@ def edxnotes(cls):
                 },
             })
 
+    original_has_user_independent_view = cls.has_user_independent_view
+
+    def has_user_independent_view(self, view_name):
+        """
+        Returns whether the view `view_name` is the same for every user, which
+        it isn't once it is annotatable: the notes wrapper has the user's token.
+        """
+        is_studio = getattr(self.system, "is_author_mode", False)
+        course = self.descriptor.runtime.modulestore.get_course(self.runtime.course_id)
+        if is_studio or not is_feature_enabled(course):
+            return original_has_user_independent_view(self, view_name)
+        return False
+
     cls.get_html = get_html
+    cls.has_user_independent_view = has_user_independent_view
     return cls
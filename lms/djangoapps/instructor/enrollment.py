@@ -12,7 +12,7 @@ from django.core.mail import send_mail
 from django.utils.translation import override as override_language
 
 from student.models import CourseEnrollment, CourseEnrollmentAllowed
-from courseware.models import StudentModule
+from courseware.models import StudentModule, PersistentSectionGrade
 from edxmako.shortcuts import render_to_string
 from lang_pref import LANGUAGE_KEY
 
@@ -223,6 +223,7 @@ def reset_student_attempts(course_id, student, module_state_key, delete_module=F
 
     if delete_module:
         module_to_reset.delete()
+        PersistentSectionGrade.invalidate(student.id, course_id, module_state_key)
     else:
         _reset_module_attempts(module_to_reset)
 
@@ -1147,14 +1147,14 @@ def dump_grading_context(course):
     msg += "-----------------------------------------------------------------------------\n"
     msg += "Listing grading context for course %s\n" % course.id
 
-    gcontext = course.grading_context
+    gcontext = grades.CourseGradingContext.for_course(course)
     msg += "graded sections:\n"
 
-    msg += '%s\n' % gcontext['graded_sections'].keys()
-    for (gsections, gsvals) in gcontext['graded_sections'].items():
+    msg += '%s\n' % gcontext.graded_sections.keys()
+    for (gsections, gsvals) in gcontext.graded_sections.items():
         msg += "--> Section %s:\n" % (gsections)
         for sec in gsvals:
-            sdesc = sec['section_descriptor']
+            sdesc = gcontext.get_descriptor(sec.location)
             grade_format = getattr(sdesc, 'grade_format', None)
             aname = ''
             if grade_format in graders:
@@ -1169,7 +1169,7 @@ def dump_grading_context(course):
                 notes = ', score by attempt!'
             msg += "      %s (grade_format=%s, Assignment=%s%s)\n" % (sdesc.display_name, grade_format, aname, notes)
     msg += "all descriptors:\n"
-    msg += "length=%d\n" % len(gcontext['all_descriptors'])
+    msg += "length=%d\n" % len(gcontext.all_locations())
     msg = '<pre>%s</pre>' % msg.replace('<', '&lt;')
     return msg
 
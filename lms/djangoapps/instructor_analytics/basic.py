@@ -15,6 +15,8 @@ from django.core.urlresolvers import reverse
 import xmodule.graders as xmgraders
 from django.core.exceptions import ObjectDoesNotExist
 from microsite_configuration import microsite
+from courseware.grades import CourseGradingContext
+from openedx.core.djangoapps.course_groups.cohorts import get_cohorts_for_users
 
 
 STUDENT_FEATURES = ('id', 'username', 'first_name', 'last_name', 'is_staff', 'email')
@@ -166,8 +168,10 @@ def enrolled_students_features(course_key, features):
         courseenrollment__is_active=1,
     ).order_by('username').select_related('profile')
 
+    student_cohorts = {}
     if include_cohort_column:
-        students = students.prefetch_related('course_groups')
+        students = list(students)
+        student_cohorts = get_cohorts_for_users(course_key, [student.id for student in students])
 
     def extract_student(student, features):
         """ convert student to dictionary """
@@ -197,13 +201,8 @@ def enrolled_students_features(course_key, features):
                 student_dict[meta_feature] = meta_dict.get(meta_key)
 
         if include_cohort_column:
-            # Note that we use student.course_groups.all() here instead of
-            # student.course_groups.filter(). The latter creates a fresh query,
-            # therefore negating the performance gain from prefetch_related().
-            student_dict['cohort'] = next(
-                (cohort.name for cohort in student.course_groups.all() if cohort.course_id == course_key),
-                "[unassigned]"
-            )
+            cohort = student_cohorts.get(student.id)
+            student_dict['cohort'] = cohort.name if cohort is not None else "[unassigned]"
         return student_dict
 
     return [extract_student(student, features) for student in students]
@@ -319,14 +318,14 @@ def dump_grading_context(course):
     msg += hbar
     msg += "Listing grading context for course %s\n" % course.id.to_deprecated_string()
 
-    gcontext = course.grading_context
+    gcontext = CourseGradingContext.for_course(course)
     msg += "graded sections:\n"
 
-    msg += '%s\n' % gcontext['graded_sections'].keys()
-    for (gsomething, gsvals) in gcontext['graded_sections'].items():
+    msg += '%s\n' % gcontext.graded_sections.keys()
+    for (gsomething, gsvals) in gcontext.graded_sections.items():
         msg += "--> Section %s:\n" % (gsomething)
         for sec in gsvals:
-            sdesc = sec['section_descriptor']
+            sdesc = gcontext.get_descriptor(sec.location)
             frmat = getattr(sdesc, 'format', None)
             aname = ''
             if frmat in graders:
@@ -342,6 +341,6 @@ def dump_grading_context(course):
             msg += "      %s (format=%s, Assignment=%s%s)\n"\
                 % (sdesc.display_name, frmat, aname, notes)
     msg += "all descriptors:\n"
-    msg += "length=%d\n" % len(gcontext['all_descriptors'])
+    msg += "length=%d\n" % len(gcontext.all_locations())
     msg = '<pre>%s</pre>' % msg.replace('<', '&lt;')
     return msg
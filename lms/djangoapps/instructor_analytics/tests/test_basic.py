@@ -17,7 +17,8 @@ from instructor_analytics.basic import (
     sale_record_features, sale_order_record_features, enrolled_students_features, course_registration_features,
     coupon_codes_features, AVAILABLE_FEATURES, STUDENT_FEATURES, PROFILE_FEATURES
 )
-from openedx.core.djangoapps.course_groups.tests.helpers import CohortFactory
+from openedx.core.djangoapps.course_groups.cohorts import is_course_cohorted
+from openedx.core.djangoapps.course_groups.tests.helpers import CohortFactory, clear_cohort_caches
 from courseware.tests.factories import InstructorFactory
 from xmodule.modulestore.tests.django_utils import ModuleStoreTestCase
 from xmodule.modulestore.tests.factories import CourseFactory
@@ -32,6 +33,7 @@ class TestAnalyticsBasic(ModuleStoreTestCase):
 
     def setUp(self):
         super(TestAnalyticsBasic, self).setUp()
+        self.addCleanup(clear_cohort_caches)
         self.course_key = self.store.make_course_key('robot', 'course', 'id')
         self.users = tuple(UserFactory() for _ in xrange(30))
         self.ces = tuple(CourseEnrollment.enroll(user, self.course_key)
@@ -94,11 +96,12 @@ class TestAnalyticsBasic(ModuleStoreTestCase):
         self.client.login(username=instructor.username, password='test')
 
         query_features = ('username', 'cohort')
-        # There should be a constant of 2 SQL queries when calling
-        # enrolled_students_features.  The first query comes from the call to
-        # User.objects.filter(...), and the second comes from
-        # prefetch_related('course_groups').
-        with self.assertNumQueries(2):
+        # Migrate the course's cohort settings from the modulestore beforehand
+        self.assertTrue(is_course_cohorted(course.id))
+        # There should be a constant of 3 SQL queries when calling
+        # enrolled_students_features: User.objects.filter(...), the course's
+        # cohort settings, and one batch of the students' cohort memberships.
+        with self.assertNumQueries(3):
             userreports = enrolled_students_features(course.id, query_features)
         self.assertEqual(len([r for r in userreports if r['username'] in cohorted_usernames]), len(cohorted_students))
         self.assertEqual(len([r for r in userreports if r['username'] == non_cohorted_student.username]), 1)
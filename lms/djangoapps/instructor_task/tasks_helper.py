@@ -28,14 +28,14 @@ from xmodule.split_test_module import get_split_user_partitions
 from certificates.models import CertificateWhitelist, certificate_info_for_user
 from courseware.courses import get_course_by_id, get_problems_in_section
 from courseware.grades import iterate_grades_for
-from courseware.models import StudentModule
+from courseware.models import StudentModule, PersistentSectionGrade
 from courseware.model_data import FieldDataCache
 from courseware.module_render import get_module_for_descriptor_internal
 from instructor_analytics.basic import enrolled_students_features
 from instructor_analytics.csvs import format_dictlist
 from instructor_task.models import ReportStore, InstructorTask, PROGRESS
 from lms.djangoapps.lms_xblock.runtime import LmsPartitionService
-from openedx.core.djangoapps.course_groups.cohorts import get_cohort
+from openedx.core.djangoapps.course_groups.cohorts import get_cohorts_for_users
 from openedx.core.djangoapps.course_groups.models import CourseUserGroup
 from openedx.core.djangoapps.content.course_structures.models import CourseStructure
 from opaque_keys.edx.keys import UsageKey
@@ -525,6 +525,11 @@ def delete_problem_module_state(xmodule_instance_args, _module_descriptor, stude
     Always returns UPDATE_STATUS_SUCCEEDED, indicating success, if it doesn't raise an exception due to database error.
     """
     student_module.delete()
+    PersistentSectionGrade.invalidate(
+        student_module.student_id,
+        student_module.course_id,
+        student_module.module_state_key.map_into_course(student_module.course_id),
+    )
     # get request-related tracking information from args passthrough,
     # and supplement with task-specific information:
     track_function = _get_track_function_for_task(student_module.student, xmodule_instance_args)
@@ -590,6 +595,11 @@ def upload_grades_csv(_xmodule_instance_args, _entry_id, course_id, _task_input,
     course = get_course_by_id(course_id)
     course_is_cohorted = is_course_cohorted(course.id)
     cohorts_header = ['Cohort Name'] if course_is_cohorted else []
+    # Look up the cohorts of all the students at once rather than one by one
+    student_cohorts = (
+        get_cohorts_for_users(course_id, enrolled_students.values_list('id', flat=True))
+        if course_is_cohorted else {}
+    )
 
     experiment_partitions = get_split_user_partitions(course.user_partitions)
     group_configs_header = [u'Experiment Group ({})'.format(partition.name) for partition in experiment_partitions]
@@ -649,7 +659,7 @@ def upload_grades_csv(_xmodule_instance_args, _entry_id, course_id, _task_input,
 
             cohorts_group_name = []
             if course_is_cohorted:
-                group = get_cohort(student, course_id, assign=False)
+                group = student_cohorts.get(student.id)
                 cohorts_group_name.append(group.name if group else '')
 
             group_configs_group_names = []
@@ -16,7 +16,7 @@ from certificates.tests.factories import GeneratedCertificateFactory, Certificat
 from course_modes.models import CourseMode
 from instructor_task.tests.test_base import InstructorTaskCourseTestCase, TestReportMixin, InstructorTaskModuleTestCase
 from openedx.core.djangoapps.course_groups.models import CourseUserGroupPartitionGroup
-from openedx.core.djangoapps.course_groups.tests.helpers import CohortFactory
+from openedx.core.djangoapps.course_groups.tests.helpers import CohortFactory, clear_cohort_caches
 import openedx.core.djangoapps.user_api.course_tag.api as course_tag_api
 from openedx.core.djangoapps.user_api.partition_schemes import RandomUserPartitionScheme
 from student.tests.factories import UserFactory
@@ -38,6 +38,7 @@ class TestInstructorGradeReport(TestReportMixin, InstructorTaskCourseTestCase):
     """
     def setUp(self):
         super(TestInstructorGradeReport, self).setUp()
+        self.addCleanup(clear_cohort_caches)
         self.course = CourseFactory.create()
 
     @ddt.data([u'student@example.com', u'ni\xf1o@example.com'])
@@ -570,6 +571,7 @@ class TestCohortStudents(TestReportMixin, InstructorTaskCourseTestCase):
     """
     def setUp(self):
         super(TestCohortStudents, self).setUp()
+        self.addCleanup(clear_cohort_caches)
 
         self.course = CourseFactory.create()
         self.cohort_1 = CohortFactory(course_id=self.course.id, name='Cohort 1')
@@ -3,19 +3,29 @@ Module implementing `xblock.runtime.Runtime` functionality for the LMS
 """
 
 import re
+import time
 import xblock.reference.plugins
 
+import dogstats_wrapper as dog_stats_api
+from django.core.cache import cache
 from django.core.urlresolvers import reverse
 from django.conf import settings
+from django.utils.translation import get_language
 from request_cache.middleware import RequestCache
+from xblock.fragment import Fragment
 from lms.djangoapps.lms_xblock.models import XBlockAsidesConfig
 from openedx.core.djangoapps.user_api.course_tag import api as user_course_tag_api
 from xmodule.modulestore.django import modulestore
 from xmodule.services import SettingsService
 from xmodule.library_tools import LibraryToolsService
-from xmodule.x_module import ModuleSystem
+from xmodule.x_module import (
+    ModuleSystem, XMODULE_DURATION_METRIC_NAME, XMODULE_FRAGMENT_CACHE_METRIC_NAME, XMODULE_METRIC_SAMPLE_RATE
+)
 from xmodule.partitions.partitions_service import PartitionService
 
+# How long the fragments of user independent views are cached
+FRAGMENT_CACHE_TIMEOUT = 60 * 60 * 24
+
 
 def _quote_slashes(match):
     """
@@ -211,6 +221,89 @@ class LmsModuleSystem(LmsHandlerUrls, ModuleSystem):  # pylint: disable=abstract
         self.request_token = kwargs.pop('request_token', None)
         super(LmsModuleSystem, self).__init__(**kwargs)
 
+    def render(self, block, view_name, context=None):
+        """
+        Render a block by invoking its view, or from the fragment cache.
+
+        If FEATURES['ENABLE_XBLOCK_FRAGMENT_CACHE'] is set, the fragments of the
+        views which blocks declare to be the same for every user (see
+        `has_user_independent_view`) are cached for each version of the block and
+        language. Only the view is cached: the wrappers, which identify the
+        request and the user, are applied to the cached fragment every time.
+        """
+        cache_key = self._fragment_cache_key(block, view_name)
+        if cache_key is None:
+            return super(LmsModuleSystem, self).render(block, view_name, context=context)
+
+        start_time = time.time()
+        cache_result = "miss"
+        # Set the active view so that render_child can use it as a default, as Runtime.render does
+        old_view_name = self._view_name
+        self._view_name = view_name
+        try:
+            status = "success"
+            cached_fragment = cache.get(cache_key)
+            if cached_fragment is not None:
+                cache_result = "hit"
+                fragment = Fragment.from_pods(cached_fragment)
+            else:
+                fragment = getattr(block, view_name)(context)
+                cache.set(cache_key, fragment.to_pods(), FRAGMENT_CACHE_TIMEOUT)
+            fragment = self.wrap_xblock(block, view_name, fragment, context)
+            return self.render_asides(block, view_name, fragment, context)
+
+        except:
+            status = "failure"
+            raise
+
+        finally:
+            self._view_name = old_view_name
+            end_time = time.time()
+            tags = [
+                u'view_name:{}'.format(view_name),
+                u'action:render',
+                u'action_status:{}'.format(status),
+                u'course_id:{}'.format(self.course_id),
+                u'block_type:{}'.format(block.scope_ids.block_type),
+                u'block_family:{}'.format(block.entry_point),
+            ]
+            dog_stats_api.increment(
+                XMODULE_FRAGMENT_CACHE_METRIC_NAME,
+                tags=tags + [u'result:{}'.format(cache_result)],
+                sample_rate=XMODULE_METRIC_SAMPLE_RATE,
+            )
+            dog_stats_api.histogram(
+                XMODULE_DURATION_METRIC_NAME,
+                end_time - start_time,
+                tags=tags,
+                sample_rate=XMODULE_METRIC_SAMPLE_RATE,
+            )
+
+    def _fragment_cache_key(self, block, view_name):
+        """
+        Return the key of the cached fragment of the view `view_name` of `block`,
+        or None if it can't be cached.
+        """
+        if not settings.FEATURES.get('ENABLE_XBLOCK_FRAGMENT_CACHE', False):
+            return None
+
+        has_user_independent_view = getattr(block, 'has_user_independent_view', None)
+        if has_user_independent_view is None or not has_user_independent_view(view_name):
+            return None
+
+        # The edit time of the block changes each time it is published
+        try:
+            edited_on = getattr(block, 'descriptor', block).edited_on
+        except AttributeError:
+            # Blocks from the XML modulestore don't record edit info
+            edited_on = None
+        if edited_on is None:
+            return None
+
+        return u'xblock_fragment.{}.{}.{}.{}'.format(
+            block.scope_ids.usage_id, edited_on.isoformat(), view_name, get_language()
+        )
+
     def wrap_aside(self, block, aside, view, frag, context):
         """
         Creates a div which identifies the aside, points to the original block,
@@ -2,15 +2,19 @@
 Tests of the LMS XBlock Runtime and associated utilities
 """
 
+from datetime import datetime
+
 from django.contrib.auth.models import User
 from django.conf import settings
+from django.core.cache import cache
 from ddt import ddt, data
-from mock import Mock
+from mock import Mock, patch
 from unittest import TestCase
 from urlparse import urlparse
 from opaque_keys.edx.locations import SlashSeparatedCourseKey
 from lms.djangoapps.lms_xblock.runtime import quote_slashes, unquote_slashes, LmsModuleSystem
 from xblock.fields import ScopeIds
+from xblock.fragment import Fragment
 from xmodule.x_module import DescriptorSystem
 
 TEST_STRINGS = [
@@ -105,6 +109,56 @@ class TestHandlerUrl(TestCase):
         self.assertIsNone(parsed_fq_url.hostname)
 
 
+@patch.dict(settings.FEATURES, {'ENABLE_XBLOCK_FRAGMENT_CACHE': True})
+@patch.object(LmsModuleSystem, 'applicable_aside_types', Mock(return_value=[]))
+class TestFragmentCache(TestCase):
+    """Test that the LMS runtime caches the fragments of user independent views"""
+
+    def setUp(self):
+        super(TestFragmentCache, self).setUp()
+        self.course_key = SlashSeparatedCourseKey("org", "course", "run")
+        self.block = Mock(
+            name='block',
+            scope_ids=ScopeIds(None, 'html', None, self.course_key.make_usage_key('html', 'block')),
+            entry_point='xmodule.v1',
+        )
+        self.block.descriptor.edited_on = datetime(2015, 1, 1)
+        self.block.student_view.return_value = Fragment(u'<p>Content</p>')
+        self.wrapper = Mock(name='wrapper', side_effect=lambda block, view, frag, context: frag)
+        self.runtime = LmsModuleSystem(
+            static_url='/static',
+            track_function=Mock(name='track_function'),
+            get_module=Mock(name='get_module'),
+            render_template=Mock(name='render_template'),
+            replace_urls=str,
+            course_id=self.course_key,
+            descriptor_runtime=Mock(spec=DescriptorSystem, name='descriptor_runtime'),
+            wrappers=[self.wrapper],
+        )
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+    def test_user_independent_view_cached(self):
+        self.block.has_user_independent_view.return_value = True
+        for __ in range(2):
+            fragment = self.runtime.render(self.block, 'student_view')
+            self.assertEqual(fragment.content, u'<p>Content</p>')
+        self.assertEqual(self.block.student_view.call_count, 1)
+        # The wrappers are applied every time
+        self.assertEqual(self.wrapper.call_count, 2)
+
+        # Editing the block renders it again
+        self.block.descriptor.edited_on = datetime(2015, 1, 2)
+        self.runtime.render(self.block, 'student_view')
+        self.assertEqual(self.block.student_view.call_count, 2)
+
+    def test_user_dependent_view_not_cached(self):
+        self.block.has_user_independent_view.return_value = False
+        for __ in range(2):
+            self.runtime.render(self.block, 'student_view')
+        self.assertEqual(self.block.student_view.call_count, 2)
+
+
 class TestUserServiceAPI(TestCase):
     """Test the user service interface"""
 
@@ -15,7 +15,7 @@ from xmodule.video_module import transcripts_utils
 from xmodule.modulestore.django import modulestore
 from xmodule.partitions.partitions import Group, UserPartition
 
-from openedx.core.djangoapps.course_groups.tests.helpers import CohortFactory
+from openedx.core.djangoapps.course_groups.tests.helpers import CohortFactory, clear_cohort_caches
 from openedx.core.djangoapps.course_groups.models import CourseUserGroupPartitionGroup
 
 from ..testutils import MobileAPITestCase, MobileAuthTestMixin, MobileEnrolledCourseAccessTestMixin
@@ -27,6 +27,7 @@ class TestVideoAPITestCase(MobileAPITestCase):
     """
     def setUp(self):
         super(TestVideoAPITestCase, self).setUp()
+        self.addCleanup(clear_cohort_caches)
         self.section = ItemFactory.create(
             parent=self.course,
             category="chapter",
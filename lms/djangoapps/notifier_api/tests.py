@@ -6,6 +6,7 @@ from django.test.client import RequestFactory
 from django.test.utils import override_settings
 
 from openedx.core.djangoapps.course_groups.models import CourseUserGroup
+from openedx.core.djangoapps.course_groups.tests.helpers import clear_cohort_caches
 from django_comment_common.models import Role, Permission
 from lang_pref import LANGUAGE_KEY
 from notification_prefs import NOTIFICATION_PREF_KEY
@@ -25,6 +26,7 @@ from xmodule.modulestore.tests.factories import CourseFactory
 class NotifierUsersViewSetTest(UrlResetMixin, ModuleStoreTestCase):
     def setUp(self):
         super(NotifierUsersViewSetTest, self).setUp()
+        self.addCleanup(clear_cohort_caches)
         self.courses = []
         self.cohorts = []
         self.user = UserFactory()
@@ -1187,11 +1187,14 @@ def midcourse_reverify_dash(request):
     """
     user = request.user
     course_enrollment_pairs = []
-    for enrollment in CourseEnrollment.enrollments_for_user(user):
-        try:
-            course_enrollment_pairs.append((modulestore().get_course(enrollment.course_id), enrollment))
-        except ItemNotFoundError:
+    enrollments = list(CourseEnrollment.enrollments_for_user(user))
+    courses = modulestore().get_courses_by_keys([enrollment.course_id for enrollment in enrollments])
+    for enrollment in enrollments:
+        course = courses.get(enrollment.course_id)
+        if course is None:
             log.error(u"User %s enrolled in non-existent course %s", user.username, enrollment.course_id)
+        else:
+            course_enrollment_pairs.append((course, enrollment))
 
     statuses = ["approved", "pending", "must_reverify", "denied"]
 
@@ -317,6 +317,11 @@ FEATURES = {
     # Set to True to change the course sorting behavior by their start dates, latest first.
     'ENABLE_COURSE_SORTING_BY_START_DATE': True,
 
+    # List the courses on the homepage and in the course catalog from their overviews,
+    # kept in SQL, instead of loading every course from the modulestore. Run the
+    # generate_course_overview management command with --all before turning this on.
+    'ENABLE_COURSE_OVERVIEWS_IN_CATALOG': False,
+
     # Expose Mobile REST API. Note that if you use this, you must also set
     # ENABLE_OAUTH2_PROVIDER to True
     'ENABLE_MOBILE_REST_API': False,
@@ -395,8 +400,24 @@ FEATURES = {
 
     # Teams feature
     'ENABLE_TEAMS': False,
+
+    # Store computed section grades and reuse them until a score changes or the course is published
+    'ENABLE_PERSISTENT_GRADES': False,
+
+    # Grade students in chunks, sharing one grading context, when iterating over a course's grades
+    'ENABLE_BULK_GRADING': False,
+
+    # Cache the fragments of the XBlock views which are the same for every user
+    'ENABLE_XBLOCK_FRAGMENT_CACHE': False,
+
+    # Profile the modulestore, SQL and template rendering of sampled requests, and of those
+    # of staff users with the X-Edx-Profile header (see REQUEST_PROFILER_SAMPLE_RATE)
+    'ENABLE_REQUEST_PROFILER': False,
 }
 
+# The fraction of the requests which are profiled when ENABLE_REQUEST_PROFILER is on
+REQUEST_PROFILER_SAMPLE_RATE = 0.0
+
 # Ignore static asset files on import which match this pattern
 ASSET_IGNORE_REGEX = r"(^\._.*$)|(^\.DS_Store$)|(^.*~$)"
 
@@ -695,6 +716,11 @@ XBLOCK_SELECT_FUNCTION = prefer_xmodules
 
 MODULESTORE_BRANCH = 'published-only'
 CONTENTSTORE = None
+
+# Assets too large for the content cache are kept in this directory, if set,
+# up to STATIC_CONTENT_DISK_CACHE_MAX_BYTES in total.
+STATIC_CONTENT_DISK_CACHE_DIR = None
+STATIC_CONTENT_DISK_CACHE_MAX_BYTES = 10 * 1024 * 1024 * 1024
 DOC_STORE_CONFIG = {
     'host': 'localhost',
     'db': 'xmodule',
@@ -755,6 +781,17 @@ CODE_JAIL = {
         # How many CPU seconds can jailed code use?
         'CPU': 1,
     },
+
+    # Run jailed code in a pool of warm sandbox processes, rather than starting
+    # a new one for every execution. See capa.safe_exec.sandbox_pool.
+    'pool': {
+        # How many sandbox processes each LMS process may run. 0 means don't use a pool.
+        'size': 0,
+        # How many executions a sandbox process runs before it is replaced.
+        'max_executions': 100,
+        # How many executions may wait for a free sandbox process before more are refused.
+        'max_waiting': 10,
+    },
 }
 
 # Some courses are allowed to run unsafe code. This is a list of regexes, one
@@ -767,6 +804,10 @@ CODE_JAIL = {
 #   ]
 COURSES_WITH_UNSAFE_CODE = []
 
+# The results of sandboxed code are cached in the 'safe_exec' cache (or the
+# default cache), and up to this many bytes of them are also kept in process.
+SAFE_EXEC_CACHE_MAX_BYTES = 64 * 1024 * 1024
+
 ############################### DJANGO BUILT-INS ###############################
 # Change DEBUG/TEMPLATE_DEBUG in your environment settings files, not here
 DEBUG = False
@@ -1076,6 +1117,7 @@ MIDDLEWARE_CLASSES = (
     'student.middleware.UserStandingMiddleware',
     'contentserver.middleware.StaticContentServer',
     'crum.CurrentRequestUserMiddleware',
+    'performance.middleware.RequestProfilerMiddleware',
 
     # Adds user tags to tracking events
     # Must go before TrackMiddleware, to get the context set up
@@ -1752,6 +1794,7 @@ INSTALLED_APPS = (
     'lms.djangoapps.lms_xblock',
 
     'openedx.core.djangoapps.content.course_structures',
+    'openedx.core.djangoapps.content.course_overviews',
     'course_structure_api',
 
     # Mailchimp Syncing
@@ -1900,8 +1943,10 @@ VERIFY_STUDENT = {
 
 ### This enables the Metrics tab for the Instructor dashboard ###########
 FEATURES['CLASS_DASHBOARD'] = False
-if FEATURES.get('CLASS_DASHBOARD'):
-    INSTALLED_APPS += ('class_dashboard',)
+
+# The app is installed even when the tab is disabled, since the feature can be enabled by the
+# environment settings after this point, and the tables of its aggregates must exist for it.
+INSTALLED_APPS += ('class_dashboard',)
 
 ######################## CAS authentication ###########################
 
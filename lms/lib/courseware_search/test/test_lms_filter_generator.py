@@ -11,7 +11,9 @@ from student.models import CourseEnrollment
 
 from xmodule.partitions.partitions import Group, UserPartition
 from openedx.core.djangoapps.course_groups.partition_scheme import CohortPartitionScheme
-from openedx.core.djangoapps.course_groups.tests.helpers import CohortFactory, config_course_cohorts
+from openedx.core.djangoapps.course_groups.tests.helpers import (
+    CohortFactory, config_course_cohorts, clear_cohort_caches
+)
 from openedx.core.djangoapps.course_groups.cohorts import add_user_to_cohort
 from openedx.core.djangoapps.course_groups.views import link_cohort_to_partition_group
 from opaque_keys import InvalidKeyError
@@ -55,6 +57,7 @@ class LmsSearchFilterGeneratorTestCase(ModuleStoreTestCase):
 
     def setUp(self):
         super(LmsSearchFilterGeneratorTestCase, self).setUp()
+        self.addCleanup(clear_cohort_caches)
         self.build_courses()
         self.user_partition = None
         self.first_cohort = None
@@ -38,12 +38,23 @@ def run():
     if settings.FEATURES.get('ENABLE_THIRD_PARTY_AUTH', False):
         enable_third_party_auth()
 
+    if settings.CODE_JAIL.get('pool', {}).get('size'):
+        enable_sandbox_pool()
+
     # Initialize Segment.io analytics module. Flushes first time a message is received and
     # every 50 messages thereafter, or if 10 seconds have passed since last flush
     if settings.FEATURES.get('SEGMENT_IO_LMS') and hasattr(settings, 'SEGMENT_IO_LMS_KEY'):
         analytics.init(settings.SEGMENT_IO_LMS_KEY, flush_at=50)
 
 
+def enable_sandbox_pool():
+    """
+    Run problems' sandboxed code in a pool of warm sandbox processes, as configured by CODE_JAIL['pool'].
+    """
+    from capa.safe_exec import configure_sandbox_pool
+    configure_sandbox_pool(**settings.CODE_JAIL['pool'])
+
+
 def add_mimetypes():
     """
     Add extra mimetypes. Used in xblock_resource.
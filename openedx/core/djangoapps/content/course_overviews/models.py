@@ -0,0 +1,216 @@
+"""
+Declaration of the CourseOverview model.
+"""
+import logging
+
+from django.db import IntegrityError
+from django.db.models.fields import BooleanField, DateTimeField, FloatField, NullBooleanField, TextField
+from django.utils.translation import ugettext
+from model_utils.models import TimeStampedModel
+
+from openedx.core.lib.courses import course_image_url as get_course_image_url
+from util.date_utils import strftime_localized
+from xmodule import course_metadata_utils
+from xmodule.error_module import ErrorDescriptor
+from xmodule.modulestore.django import modulestore
+from xmodule_django.models import CourseKeyField, UsageKeyField
+
+
+log = logging.getLogger(__name__)
+
+
+class CourseOverview(TimeStampedModel):
+    """
+    A summary of a course's metadata, kept in SQL so that the pages which list
+    many courses (the home page, the course catalog) can get them with one
+    query instead of loading every course from the modulestore.
+
+    An overview has the attributes and methods of CourseDescriptor which those
+    pages use, so either can be given to them. Overviews are brought up to date
+    each time their course is published, and are created from the modulestore
+    the first time `get_from_id` is asked for one which doesn't exist yet. The
+    `generate_course_overview` command creates them for all the courses at once.
+    """
+    # Course identification
+    id = CourseKeyField(db_index=True, primary_key=True, max_length=255)  # pylint: disable=invalid-name
+    _location = UsageKeyField(max_length=255)
+    org = TextField()
+    display_name = TextField(null=True)
+    display_number_with_default = TextField()
+    display_org_with_default = TextField()
+
+    # Dates
+    start = DateTimeField(null=True)
+    end = DateTimeField(null=True)
+    advertised_start = TextField(null=True)
+    announcement = DateTimeField(null=True)
+    enrollment_start = DateTimeField(null=True)
+    enrollment_end = DateTimeField(null=True)
+
+    # Catalog information
+    course_image_url = TextField()
+    catalog_visibility = TextField(null=True)
+
+    # Access
+    days_early_for_beta = FloatField(null=True)
+    visible_to_staff_only = BooleanField(default=False)
+    mobile_available = BooleanField(default=False)
+    ispublic = NullBooleanField()
+    invitation_only = BooleanField(default=False)
+    enrollment_domain = TextField(null=True)
+
+    @classmethod
+    def _create_from_course(cls, course):
+        """
+        Return a new, unsaved, CourseOverview of `course` (a CourseDescriptor).
+        """
+        return cls(
+            id=course.id,
+            _location=course.location,
+            org=course.location.org,
+            display_name=course.display_name,
+            display_number_with_default=course.display_number_with_default,
+            display_org_with_default=course.display_org_with_default,
+
+            start=course.start,
+            end=course.end,
+            advertised_start=course.advertised_start,
+            announcement=course.announcement,
+            enrollment_start=course.enrollment_start,
+            enrollment_end=course.enrollment_end,
+
+            course_image_url=get_course_image_url(course),
+            catalog_visibility=course.catalog_visibility,
+
+            days_early_for_beta=course.days_early_for_beta,
+            visible_to_staff_only=course.visible_to_staff_only,
+            mobile_available=course.mobile_available,
+            ispublic=course.ispublic,
+            invitation_only=course.invitation_only,
+            enrollment_domain=course.enrollment_domain,
+        )
+
+    @classmethod
+    def load_from_module_store(cls, course_id):
+        """
+        Create or update the CourseOverview of the course with id `course_id` from the
+        modulestore, and return it. Returns None, and deletes any existing overview,
+        if there is no such course or it can't be loaded.
+        """
+        store = modulestore()
+        with store.bulk_operations(course_id):
+            course = store.get_course(course_id)
+
+        if course is None or isinstance(course, ErrorDescriptor):
+            cls.objects.filter(id=course_id).delete()
+            return None
+
+        course_overview = cls._create_from_course(course)
+        try:
+            course_overview.save()
+        except IntegrityError:
+            # Another process created it at the same time; theirs is as good as ours.
+            pass
+        return course_overview
+
+    @classmethod
+    def get_from_id(cls, course_id):
+        """
+        Return the CourseOverview of the course with id `course_id`, creating it
+        from the modulestore if it doesn't exist yet, or None if there's no such course.
+        """
+        try:
+            return cls.objects.get(id=course_id)
+        except cls.DoesNotExist:
+            return cls.load_from_module_store(course_id)
+
+    @classmethod
+    def get_all_courses(cls, org=None):
+        """
+        Return the CourseOverviews of all the courses, or only of those of
+        organization `org` if it is given.
+        """
+        course_overviews = cls.objects.all()
+        if org:
+            course_overviews = course_overviews.filter(org=org)
+        return list(course_overviews)
+
+    @property
+    def location(self):
+        """
+        Return the usage key of the course block.
+        """
+        # Deprecated keys are stored without their run, which the course id has
+        return self._location.map_into_course(self.id)
+
+    @property
+    def number(self):
+        """
+        Return the course number, as in the course id.
+        """
+        return self.location.course
+
+    @property
+    def url_name(self):
+        """
+        Return the url name of the course block.
+        """
+        return self.location.name
+
+    @property
+    def display_name_with_default(self):
+        """
+        Return the display name of the course if it has one, otherwise its converted url name.
+        """
+        name = self.display_name
+        if name is None:
+            name = self.url_name.replace('_', ' ')
+        return name.replace('<', '&lt;').replace('>', '&gt;')
+
+    def has_started(self):
+        """
+        Returns whether the course has started.
+        """
+        return course_metadata_utils.has_course_started(self.start)
+
+    def has_ended(self):
+        """
+        Returns whether the course has ended; courses without an end date never do.
+        """
+        return course_metadata_utils.has_course_ended(self.end)
+
+    @property
+    def start_date_is_still_default(self):
+        """
+        Returns whether neither start nor advertised_start have been set for the course.
+        """
+        return course_metadata_utils.course_start_date_is_default(self.start, self.advertised_start)
+
+    @property
+    def sorting_score(self):
+        """
+        Returns a number to sort courses by how new they are, the newest first.
+        """
+        return course_metadata_utils.course_sorting_score(self.start, self.advertised_start, self.announcement)
+
+    def start_datetime_text(self, format_string="SHORT_DATE"):
+        """
+        Returns the text of the course's start date and time in UTC, preferring advertised_start to start.
+        """
+        return course_metadata_utils.course_start_datetime_text(
+            self.start, self.advertised_start, format_string, ugettext, strftime_localized
+        )
+
+    def end_datetime_text(self, format_string="SHORT_DATE"):
+        """
+        Returns the text of the course's end date, or an empty string if it has none.
+        """
+        return course_metadata_utils.course_end_datetime_text(self.end, format_string, strftime_localized)
+
+    def __unicode__(self):
+        return unicode(self.id)
+
+
+# Signals must be imported in a file that is automatically loaded at app startup (e.g. models.py). We import them
+# at the end of this file to avoid circular dependencies.
+import signals  # pylint: disable=unused-import
@@ -0,0 +1,27 @@
+"""
+Signal handler for keeping course overviews up to date.
+"""
+import logging
+
+from django.dispatch.dispatcher import receiver
+
+from xmodule.modulestore.django import SignalHandler
+
+
+log = logging.getLogger(__name__)
+
+
+@receiver(SignalHandler.course_published)
+def _listen_for_course_publish(sender, course_key, **kwargs):  # pylint: disable=unused-argument
+    """
+    Update the overview of the course which was just published.
+    """
+    # Import the model here to avoid a circular import.
+    from .models import CourseOverview
+
+    try:
+        CourseOverview.load_from_module_store(course_key)
+    except Exception:  # pylint: disable=broad-except
+        # Don't fail the publish; a stale overview is rebuilt the next time it's asked for.
+        log.exception(u"Unable to update the course overview of %s", course_key)
+        CourseOverview.objects.filter(id=course_key).delete()
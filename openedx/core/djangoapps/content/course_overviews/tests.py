@@ -0,0 +1,105 @@
+"""
+Tests for course_overviews app.
+"""
+import datetime
+
+import ddt
+import pytz
+
+from opaque_keys.edx.locator import CourseLocator
+from xmodule.modulestore import ModuleStoreEnum
+from xmodule.modulestore.django import modulestore
+from xmodule.modulestore.tests.django_utils import ModuleStoreTestCase
+from xmodule.modulestore.tests.factories import CourseFactory
+
+from openedx.core.djangoapps.content.course_overviews.models import CourseOverview
+
+
+@ddt.ddt
+class CourseOverviewTestCase(ModuleStoreTestCase):
+    """
+    Tests that CourseOverviews summarize their courses, and are kept up to date.
+    """
+    NOW = datetime.datetime.now(pytz.UTC)
+    LAST_MONTH = NOW - datetime.timedelta(days=30)
+    NEXT_MONTH = NOW + datetime.timedelta(days=30)
+
+    def check_course_overview_against_course(self, course):
+        """
+        Check that the overview of course has the same attributes as the course itself.
+        """
+        course_overview = CourseOverview.get_from_id(course.id)
+        self.assertIsNotNone(course_overview)
+
+        for attribute in (
+                'id', 'location', 'number', 'org', 'url_name', 'display_name', 'display_name_with_default',
+                'display_number_with_default', 'display_org_with_default', 'start', 'end', 'announcement',
+                'enrollment_start', 'enrollment_end', 'catalog_visibility', 'days_early_for_beta',
+                'visible_to_staff_only', 'mobile_available', 'ispublic', 'invitation_only',
+                'enrollment_domain', 'start_date_is_still_default', 'sorting_score',
+        ):
+            self.assertEqual(getattr(course, attribute), getattr(course_overview, attribute), attribute)
+
+        self.assertEqual(course.has_started(), course_overview.has_started())
+        self.assertEqual(course.has_ended(), course_overview.has_ended())
+        self.assertEqual(course.start_datetime_text(), course_overview.start_datetime_text())
+        self.assertEqual(course.start_datetime_text("DATE_TIME"), course_overview.start_datetime_text("DATE_TIME"))
+        self.assertEqual(course.end_datetime_text(), course_overview.end_datetime_text())
+
+        # The overview read back from the database is the same
+        self.assertEqual(
+            CourseOverview.objects.get(id=course.id).start_datetime_text(),
+            course_overview.start_datetime_text()
+        )
+
+    @ddt.data(
+        (ModuleStoreEnum.Type.mongo, {}),
+        (ModuleStoreEnum.Type.split, {}),
+        (ModuleStoreEnum.Type.mongo, {
+            'display_name': 'Test Course',
+            'start': LAST_MONTH,
+            'end': NEXT_MONTH,
+            'advertised_start': 'Spring 2015',
+            'announcement': LAST_MONTH,
+            'enrollment_start': LAST_MONTH,
+            'enrollment_end': NEXT_MONTH,
+            'days_early_for_beta': 10.0,
+            'mobile_available': True,
+            'invitation_only': True,
+        }),
+        (ModuleStoreEnum.Type.split, {
+            'display_name': 'Test Course',
+            'start': NEXT_MONTH,
+            'advertised_start': NEXT_MONTH.isoformat(),
+            'catalog_visibility': 'about',
+            'visible_to_staff_only': True,
+        }),
+    )
+    @ddt.unpack
+    def test_course_overview_matches_course(self, modulestore_type, course_fields):
+        with self.store.default_store(modulestore_type):
+            course = CourseFactory.create(**course_fields)
+        self.check_course_overview_against_course(modulestore().get_course(course.id))
+
+    def test_course_overview_updated_on_publish(self):
+        course = CourseFactory.create(display_name='Before')
+        self.assertEqual(CourseOverview.get_from_id(course.id).display_name, 'Before')
+
+        course.display_name = 'After'
+        self.store.update_item(course, self.user.id)
+        self.assertEqual(CourseOverview.objects.get(id=course.id).display_name, 'After')
+
+    def test_missing_course(self):
+        self.assertIsNone(CourseOverview.get_from_id(CourseLocator('no', 'such', 'course')))
+
+    def test_get_all_courses(self):
+        first_course = CourseFactory.create(org='first')
+        second_course = CourseFactory.create(org='second')
+        for course in (first_course, second_course):
+            CourseOverview.get_from_id(course.id)
+
+        self.assertEqual(
+            set(overview.id for overview in CourseOverview.get_all_courses()),
+            {first_course.id, second_course.id}
+        )
+        self.assertEqual([overview.id for overview in CourseOverview.get_all_courses(org='second')], [second_course.id])
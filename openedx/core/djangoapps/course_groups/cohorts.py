@@ -5,9 +5,13 @@ forums, and to the cohort admin views.
 
 import logging
 import random
+import threading
 
+from crum import get_current_request
+from django.core.cache import cache
+from django.core.signals import request_finished
 from django.db import transaction
-from django.db.models.signals import post_save, m2m_changed
+from django.db.models.signals import post_delete, post_save, m2m_changed
 from django.dispatch import receiver
 from django.http import Http404
 from django.utils.translation import ugettext as _
@@ -22,6 +26,29 @@ from .models import CourseUserGroup, CourseCohort, CourseCohortsSettings, Course
 
 log = logging.getLogger(__name__)
 
+# How long the cohorts of a course, and which cohorts its users are in, are cached
+COHORT_CACHE_TIMEOUT = 60 * 60
+
+# How many users' cohorts are looked up with one query
+COHORT_LOOKUP_CHUNK_SIZE = 500
+
+
+def _course_cohorts_cache_key(course_key):
+    """Returns the key the cohorts of the course are cached under"""
+    return u"cohorts.course_cohorts.{}".format(course_key)
+
+
+def _cohort_membership_cache_key(course_key, user_id):
+    """Returns the key the id of the user's cohort in the course is cached under"""
+    return u"cohorts.membership.{}.{}".format(course_key, user_id)
+
+
+@receiver(post_save, sender=CourseUserGroup)
+@receiver(post_delete, sender=CourseUserGroup)
+def _cohort_changed(sender, **kwargs):  # pylint: disable=unused-argument
+    """Invalidates the cached cohorts of a course each time one of them is changed"""
+    cache.delete(_course_cohorts_cache_key(kwargs["instance"].course_id))
+
 
 @receiver(post_save, sender=CourseUserGroup)
 def _cohort_added(sender, **kwargs):
@@ -36,7 +63,10 @@ def _cohort_added(sender, **kwargs):
 
 @receiver(m2m_changed, sender=CourseUserGroup.users.through)
 def _cohort_membership_changed(sender, **kwargs):
-    """Emits a tracking log event each time cohort membership is modified"""
+    """
+    Emits a tracking log event, and invalidates the cached cohort of the users,
+    each time cohort membership is modified
+    """
     def get_event_iter(user_id_iter, cohort_iter):
         return (
             {"cohort_id": cohort.id, "cohort_name": cohort.name, "user_id": user_id}
@@ -51,28 +81,71 @@ def _cohort_membership_changed(sender, **kwargs):
 
     if action == "post_add":
         event_name = "edx.cohort.user_added"
-    elif action in ["post_remove", "pre_clear"]:
+    elif action in ["post_remove", "post_clear"]:
         event_name = "edx.cohort.user_removed"
+    elif action == "pre_clear":
+        # The memberships are gone once they are cleared: remember them for post_clear
+        if reverse:
+            instance._cleared_cohort_memberships = (  # pylint: disable=protected-access
+                [instance.id], list(instance.course_groups.filter(group_type=CourseUserGroup.COHORT))
+            )
+        else:
+            instance._cleared_cohort_memberships = (  # pylint: disable=protected-access
+                [user.id for user in instance.users.all()] if instance.group_type == CourseUserGroup.COHORT else [],
+                [instance] if instance.group_type == CourseUserGroup.COHORT else [],
+            )
+        return
     else:
         return
 
-    if reverse:
-        user_id_iter = [instance.id]
-        if action == "pre_clear":
-            cohort_iter = instance.course_groups.filter(group_type=CourseUserGroup.COHORT)
-        else:
-            cohort_iter = CourseUserGroup.objects.filter(pk__in=pk_set, group_type=CourseUserGroup.COHORT)
+    if action == "post_clear":
+        user_ids, cohorts = instance.__dict__.pop('_cleared_cohort_memberships', ([], []))
+    elif reverse:
+        user_ids = [instance.id]
+        cohorts = list(CourseUserGroup.objects.filter(pk__in=pk_set, group_type=CourseUserGroup.COHORT))
     else:
-        cohort_iter = [instance] if instance.group_type == CourseUserGroup.COHORT else []
-        if action == "pre_clear":
-            user_id_iter = (user.id for user in instance.users.all())
-        else:
-            user_id_iter = pk_set
+        cohorts = [instance] if instance.group_type == CourseUserGroup.COHORT else []
+        user_ids = list(pk_set)
+
+    _invalidate_cohort_memberships([
+        _cohort_membership_cache_key(cohort.course_id, user_id) for user_id in user_ids for cohort in cohorts
+    ])
 
-    for event in get_event_iter(user_id_iter, cohort_iter):
+    for event in get_event_iter(user_ids, cohorts):
         tracker.emit(event_name, event)
 
 
+# The membership cache keys to invalidate again once the current request's transaction is committed
+_pending_membership_invalidations = threading.local()  # pylint: disable=invalid-name
+
+
+def _invalidate_cohort_memberships(cache_keys):
+    """
+    Invalidates the cached memberships `cache_keys`.
+
+    Within a request's transaction, a concurrent lookup could cache the memberships
+    as they were until the transaction is committed, so they are invalidated again
+    when the request is finished, after TransactionMiddleware committed it.
+    """
+    if not cache_keys:
+        return
+    cache.delete_many(cache_keys)
+    if transaction.is_managed() and get_current_request() is not None:
+        pending = getattr(_pending_membership_invalidations, 'keys', None)
+        if pending is None:
+            pending = _pending_membership_invalidations.keys = set()
+        pending.update(cache_keys)
+
+
+@receiver(request_finished)
+def _invalidate_pending_cohort_memberships(sender, **kwargs):  # pylint: disable=unused-argument
+    """Invalidates the memberships changed by the request, now that its transaction is committed"""
+    pending = getattr(_pending_membership_invalidations, 'keys', None)
+    if pending:
+        _pending_membership_invalidations.keys = None
+        cache.delete_many(list(pending))
+
+
 # A 'default cohort' is an auto-cohort that is automatically created for a course if no cohort with automatic
 # assignment have been specified. It is intended to be used in a cohorted-course for users who have yet to be assigned
 # to a cohort.
@@ -209,19 +282,15 @@ def get_cohort(user, course_key, assign=True, use_cached=False):
         return request_cache.data.setdefault(cache_key, None)
 
     # If course is cohorted, check if the user already has a cohort.
-    try:
-        cohort = CourseUserGroup.objects.get(
-            course_id=course_key,
-            group_type=CourseUserGroup.COHORT,
-            users__id=user.id,
-        )
+    cohort = _get_cohorts_of_users(course_key, [user.id])[user.id]
+    if cohort is not None:
         return request_cache.data.setdefault(cache_key, cohort)
-    except CourseUserGroup.DoesNotExist:
-        # Didn't find the group. If we do not want to assign, return here.
-        if not assign:
-            # Do not cache the cohort here, because in the next call assign
-            # may be True, and we will have to assign the user a cohort.
-            return None
+
+    # Didn't find the group. If we do not want to assign, return here.
+    if not assign:
+        # Do not cache the cohort here, because in the next call assign
+        # may be True, and we will have to assign the user a cohort.
+        return None
 
     # Otherwise assign the user a cohort.
     course = courses.get_course(course_key)
@@ -240,6 +309,103 @@ def get_cohort(user, course_key, assign=True, use_cached=False):
     return request_cache.data.setdefault(cache_key, cohort)
 
 
+def get_cohorts_for_users(course_key, user_ids):
+    """
+    Returns the cohorts of many users in a course at once, with one query
+    for each COHORT_LOOKUP_CHUNK_SIZE users whose cohort isn't cached.
+
+    Unlike get_cohort, users without a cohort aren't assigned one.
+
+    Arguments:
+        course_key: CourseKey
+        user_ids: the ids of the users
+
+    Returns:
+        A dict mapping each user id to the user's CourseUserGroup, or to None
+        if the course isn't cohorted or the user has no cohort.
+    """
+    if not get_course_cohort_settings(course_key).is_cohorted:
+        return {user_id: None for user_id in user_ids}
+    return _get_cohorts_of_users(course_key, user_ids)
+
+
+def _get_course_cohorts_by_id(course_key):
+    """
+    Returns a dict mapping ids to the cohorts (CourseUserGroups) of the course,
+    which is cached until one of them changes.
+    """
+    cache_key = _course_cohorts_cache_key(course_key)
+    cohorts_by_id = cache.get(cache_key)
+    if cohorts_by_id is None:
+        cohorts_by_id = {
+            cohort.id: cohort
+            for cohort in CourseUserGroup.objects.filter(course_id=course_key, group_type=CourseUserGroup.COHORT)
+        }
+        cache.set(cache_key, cohorts_by_id, COHORT_CACHE_TIMEOUT)
+    return cohorts_by_id
+
+
+def _get_cohorts_of_users(course_key, user_ids):
+    """
+    Returns a dict mapping each of user_ids to the user's cohort in the course
+    (a CourseUserGroup), or None, whether or not the course is cohorted.
+
+    The id of each user's cohort is cached until the user's cohorts change.
+    """
+    user_ids = list(user_ids)
+    cohorts = {}
+    cached_cohort_ids = {}
+    for start in xrange(0, len(user_ids), COHORT_LOOKUP_CHUNK_SIZE):
+        user_ids_by_cache_key = {
+            _cohort_membership_cache_key(course_key, user_id): user_id
+            for user_id in user_ids[start:start + COHORT_LOOKUP_CHUNK_SIZE]
+        }
+        for cache_key, cohort_id in cache.get_many(user_ids_by_cache_key.keys()).iteritems():
+            cached_cohort_ids[user_ids_by_cache_key[cache_key]] = cohort_id
+
+        uncached_user_ids = [
+            user_id for user_id in user_ids_by_cache_key.values() if user_id not in cached_cohort_ids
+        ]
+        if uncached_user_ids:
+            memberships = CourseUserGroup.users.through.objects.filter(
+                courseusergroup__course_id=course_key,
+                courseusergroup__group_type=CourseUserGroup.COHORT,
+                user_id__in=uncached_user_ids,
+            ).select_related('courseusergroup')
+            for membership in memberships:
+                cohorts[membership.user_id] = membership.courseusergroup
+            # Users without a cohort are cached with the cohort id 0
+            cache.set_many(
+                {
+                    _cohort_membership_cache_key(course_key, user_id):
+                        cohorts[user_id].id if user_id in cohorts else 0
+                    for user_id in uncached_user_ids
+                },
+                COHORT_CACHE_TIMEOUT
+            )
+            for user_id in uncached_user_ids:
+                cohorts.setdefault(user_id, None)
+
+    if any(cached_cohort_ids.itervalues()):
+        cohorts_by_id = _get_course_cohorts_by_id(course_key)
+        if set(cached_cohort_ids.itervalues()) - set(cohorts_by_id) - {0}:
+            # The cohorts were cached before some of these were created
+            cache.delete(_course_cohorts_cache_key(course_key))
+            cohorts_by_id = _get_course_cohorts_by_id(course_key)
+            # The users of cohorts which have since been deleted have no cohort anymore
+            cache.delete_many([
+                _cohort_membership_cache_key(course_key, user_id)
+                for user_id, cohort_id in cached_cohort_ids.iteritems()
+                if cohort_id and cohort_id not in cohorts_by_id
+            ])
+    else:
+        cohorts_by_id = {}
+
+    for user_id, cohort_id in cached_cohort_ids.iteritems():
+        cohorts[user_id] = cohorts_by_id.get(cohort_id)
+    return cohorts
+
+
 def migrate_cohort_settings(course):
     """
     Migrate all the cohort settings associated with this course from modulestore to mysql.
@@ -319,6 +485,9 @@ def get_cohort_by_id(course_key, cohort_id):
     Return the CourseUserGroup object for the given cohort.  Raises DoesNotExist
     it isn't present.  Uses the course_key for extra validation.
     """
+    cohort = _get_course_cohorts_by_id(course_key).get(cohort_id)
+    if cohort is not None:
+        return cohort
     return CourseUserGroup.objects.get(
         course_id=course_key,
         group_type=CourseUserGroup.COHORT,
@@ -7,7 +7,7 @@ from django.test.client import RequestFactory
 
 from openedx.core.djangoapps.course_groups.views import cohort_handler
 from openedx.core.djangoapps.course_groups.cohorts import get_cohort, get_cohort_by_name
-from openedx.core.djangoapps.course_groups.tests.helpers import config_course_cohorts
+from openedx.core.djangoapps.course_groups.tests.helpers import clear_cohort_caches, config_course_cohorts
 from student.tests.factories import UserFactory
 from xmodule.modulestore.tests.django_utils import ModuleStoreTestCase
 from xmodule.modulestore.tests.factories import CourseFactory
@@ -22,6 +22,7 @@ class TestMultipleCohortUsers(ModuleStoreTestCase):
         setup course, user and request for tests
         """
         super(TestMultipleCohortUsers, self).setUp()
+        self.addCleanup(clear_cohort_caches)
         self.course1 = CourseFactory.create()
         self.course2 = CourseFactory.create()
         self.user1 = UserFactory(is_staff=True)
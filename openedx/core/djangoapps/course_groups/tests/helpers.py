@@ -6,14 +6,31 @@ from factory import post_generation, Sequence
 from factory.django import DjangoModelFactory
 import json
 
+from django.contrib.auth.models import User
+from django.core.cache import cache
 from opaque_keys.edx.locations import SlashSeparatedCourseKey
 from xmodule.modulestore.django import modulestore
 from xmodule.modulestore import ModuleStoreEnum
 
-from ..cohorts import set_course_cohort_settings
+from ..cohorts import set_course_cohort_settings, _course_cohorts_cache_key, _cohort_membership_cache_key
 from ..models import CourseUserGroup, CourseCohort, CourseCohortsSettings
 
 
+def clear_cohort_caches():
+    """
+    Clears the cached cohorts and cohort memberships of the courses with cohorts.
+
+    Tests creating cohorts add this as a cleanup: the cached entries would otherwise
+    outlive the rolled back test database, whose ids are reused by the next tests.
+    """
+    course_ids = set(CourseUserGroup.objects.values_list('course_id', flat=True))
+    user_ids = list(User.objects.values_list('id', flat=True))
+    cache.delete_many(
+        [_course_cohorts_cache_key(course_id) for course_id in course_ids] +
+        [_cohort_membership_cache_key(course_id, user_id) for course_id in course_ids for user_id in user_ids]
+    )
+
+
 class CohortFactory(DjangoModelFactory):
     """
     Factory for constructing mock cohorts.
@@ -6,6 +6,8 @@ import ddt
 from mock import call, patch
 
 from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.signals import request_finished
 from django.db import IntegrityError
 from django.http import Http404
 from django.test import TestCase
@@ -21,7 +23,7 @@ from ..models import CourseUserGroup, CourseCohort, CourseUserGroupPartitionGrou
 from .. import cohorts
 from ..tests.helpers import (
     topic_name_to_id, config_course_cohorts, config_course_cohorts_legacy,
-    CohortFactory, CourseCohortFactory, CourseCohortSettingsFactory
+    CohortFactory, CourseCohortFactory, CourseCohortSettingsFactory, clear_cohort_caches
 )
 
 
@@ -29,6 +31,7 @@ from ..tests.helpers import (
 class TestCohortSignals(TestCase):
     def setUp(self):
         super(TestCohortSignals, self).setUp()
+        self.addCleanup(clear_cohort_caches)
         self.course_key = SlashSeparatedCourseKey("dummy", "dummy", "dummy")
 
     def test_cohort_added(self, mock_tracker):
@@ -123,6 +126,20 @@ class TestCohortSignals(TestCase):
         self.assertFalse(mock_tracker.emit.called)
 
 
+    def test_membership_invalidated_after_request(self, mock_tracker):  # pylint: disable=unused-argument
+        cohort = CohortFactory(course_id=self.course_key)
+        user = UserFactory()
+        cache_key = cohorts._cohort_membership_cache_key(self.course_key, user.id)  # pylint: disable=protected-access
+
+        with patch("openedx.core.djangoapps.course_groups.cohorts.get_current_request", return_value=object()):
+            cohort.users.add(user)
+        self.assertIsNone(cache.get(cache_key))
+
+        # A lookup made before the request's transaction is committed caches the former membership
+        cache.set(cache_key, 0)
+        request_finished.send(sender=self.__class__)
+        self.assertIsNone(cache.get(cache_key))
+
 @ddt.ddt
 class TestCohorts(ModuleStoreTestCase):
     """
@@ -135,6 +152,7 @@ class TestCohorts(ModuleStoreTestCase):
         Make sure that course is reloaded every time--clear out the modulestore.
         """
         super(TestCohorts, self).setUp()
+        self.addCleanup(clear_cohort_caches)
         self.toy_course_key = SlashSeparatedCourseKey("edX", "toy", "2012_Fall")
 
     def _create_cohort(self, course_id, cohort_name, assignment_type):
@@ -255,7 +273,7 @@ class TestCohorts(ModuleStoreTestCase):
 
     @ddt.data(
         (True, 2),
-        (False, 6),
+        (False, 5),
     )
     @ddt.unpack
     def test_get_cohort_sql_queries(self, use_cached, num_sql_queries):
@@ -273,6 +291,47 @@ class TestCohorts(ModuleStoreTestCase):
             for __ in range(3):
                 cohorts.get_cohort(user, course.id, use_cached=use_cached)
 
+    def test_get_cohorts_for_users(self):
+        """
+        Make sure cohorts.get_cohorts_for_users() returns the cohorts of many users
+        at once, and follows the changes of their cohorts.
+        """
+        course = modulestore().get_course(self.toy_course_key)
+        first_cohort = CohortFactory(course_id=course.id, name="FirstCohort")
+        second_cohort = CohortFactory(course_id=course.id, name="SecondCohort")
+        first_user, second_user, third_user = [UserFactory() for __ in range(3)]
+        first_cohort.users.add(first_user)
+        second_cohort.users.add(second_user)
+        user_ids = [first_user.id, second_user.id, third_user.id]
+
+        self.assertEqual(
+            cohorts.get_cohorts_for_users(course.id, user_ids),
+            {first_user.id: None, second_user.id: None, third_user.id: None},
+            "Course isn't cohorted, so users shouldn't have cohorts"
+        )
+
+        config_course_cohorts(course, is_cohorted=True)
+        expected_cohorts = {first_user.id: first_cohort, second_user.id: second_cohort, third_user.id: None}
+        with self.assertNumQueries(2):
+            self.assertEqual(cohorts.get_cohorts_for_users(course.id, user_ids), expected_cohorts)
+        # The cohorts of the users are cached
+        with self.assertNumQueries(2):
+            self.assertEqual(cohorts.get_cohorts_for_users(course.id, user_ids), expected_cohorts)
+        with self.assertNumQueries(1):
+            self.assertEqual(cohorts.get_cohorts_for_users(course.id, user_ids), expected_cohorts)
+
+        first_cohort.name = "RenamedCohort"
+        first_cohort.save()
+        second_cohort.delete()
+        cohorts.add_user_to_cohort(first_cohort, third_user.username)
+        self.assertEqual(
+            {
+                user_id: (cohort.name if cohort else None)
+                for user_id, cohort in cohorts.get_cohorts_for_users(course.id, user_ids).iteritems()
+            },
+            {first_user.id: "RenamedCohort", second_user.id: None, third_user.id: "RenamedCohort"}
+        )
+
     def test_get_cohort_with_assign(self):
         """
         Make sure cohorts.get_cohort() returns None if no group is already
@@ -785,6 +844,7 @@ class TestCohortsAndPartitionGroups(ModuleStoreTestCase):
         Regenerate a test course and cohorts for each test
         """
         super(TestCohortsAndPartitionGroups, self).setUp()
+        self.addCleanup(clear_cohort_caches)
 
         self.test_course_key = SlashSeparatedCourseKey("edX", "toy", "2012_Fall")
         self.course = modulestore().get_course(self.test_course_key)
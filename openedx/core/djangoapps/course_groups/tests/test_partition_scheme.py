@@ -23,7 +23,7 @@ from ..partition_scheme import CohortPartitionScheme, get_cohorted_user_partitio
 from ..models import CourseUserGroupPartitionGroup
 from ..views import link_cohort_to_partition_group, unlink_cohort_partition_group
 from ..cohorts import add_user_to_cohort, get_course_cohorts
-from .helpers import CohortFactory, config_course_cohorts
+from .helpers import CohortFactory, clear_cohort_caches, config_course_cohorts
 
 
 class TestCohortPartitionScheme(ModuleStoreTestCase):
@@ -38,6 +38,7 @@ class TestCohortPartitionScheme(ModuleStoreTestCase):
         and a student for each test.
         """
         super(TestCohortPartitionScheme, self).setUp()
+        self.addCleanup(clear_cohort_caches)
 
         self.course_key = SlashSeparatedCourseKey("edX", "toy", "2012_Fall")
         self.course = modulestore().get_course(self.course_key)
@@ -283,6 +284,7 @@ class TestGetCohortedUserPartition(ModuleStoreTestCase):
         and a student for each test.
         """
         super(TestGetCohortedUserPartition, self).setUp()
+        self.addCleanup(clear_cohort_caches)
         self.course_key = SlashSeparatedCourseKey("edX", "toy", "2012_Fall")
         self.course = modulestore().get_course(self.course_key)
         self.student = UserFactory.create()
@@ -334,6 +336,7 @@ class TestMasqueradedGroup(StaffMasqueradeTestCase):
     """
     def setUp(self):
         super(TestMasqueradedGroup, self).setUp()
+        self.addCleanup(clear_cohort_caches)
         self.user_partition = UserPartition(
             0, 'Test User Partition', '',
             [Group(0, 'Group 1'), Group(1, 'Group 2')],
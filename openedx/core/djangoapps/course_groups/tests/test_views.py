@@ -34,7 +34,8 @@ from ..cohorts import (
     DEFAULT_COHORT_NAME, get_group_info_for_cohort
 )
 from .helpers import (
-    config_course_cohorts, config_course_cohorts_legacy, CohortFactory, CourseCohortFactory, topic_name_to_id
+    config_course_cohorts, config_course_cohorts_legacy, CohortFactory, CourseCohortFactory, topic_name_to_id,
+    clear_cohort_caches
 )
 
 
@@ -44,6 +45,7 @@ class CohortViewsTestCase(ModuleStoreTestCase):
     """
     def setUp(self):
         super(CohortViewsTestCase, self).setUp()
+        self.addCleanup(clear_cohort_caches)
         self.course = CourseFactory.create()
         self.staff_user = UserFactory(is_staff=True, username="staff")
         self.non_staff_user = UserFactory(username="nonstaff")
@@ -4,7 +4,7 @@ from datetime import datetime
 from pytz import UTC
 
 from openedx.core.djangoapps.course_groups.models import CourseUserGroupPartitionGroup
-from openedx.core.djangoapps.course_groups.tests.helpers import CohortFactory
+from openedx.core.djangoapps.course_groups.tests.helpers import CohortFactory, clear_cohort_caches
 from openedx.core.djangoapps.user_api.tests.factories import UserCourseTagFactory
 from xmodule.modulestore.tests.factories import CourseFactory, ItemFactory
 from xmodule.modulestore.tests.django_utils import ModuleStoreTestCase
@@ -21,6 +21,7 @@ class ContentGroupTestCase(ModuleStoreTestCase):
     """
     def setUp(self):
         super(ContentGroupTestCase, self).setUp()
+        self.addCleanup(clear_cohort_caches)
 
         self.course = CourseFactory.create(
             org='org', number='number', run='run',